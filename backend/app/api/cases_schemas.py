@@ -0,0 +1,33 @@
+from typing import Any, Dict, List, Literal, Optional
+from pydantic import BaseModel, Field
+
+
+class BulkDecisionRequest(BaseModel):
+    case_ids: List[str] = Field(..., min_length=1)
+    decision: Literal["approved", "denied", "more_info_requested"]
+    notes: Optional[str] = None
+    # Finalize the updated cases in the same request (as POST /cases/finalize/bulk)
+    finalize: bool = False
+    concurrency: Optional[int] = Field(None, ge=1)
+
+
+class BulkFinalizeRequest(BaseModel):
+    case_ids: List[str] = Field(..., min_length=1)
+    # Parallel finalize runs; capped by FINALIZE_BULK_CONCURRENCY
+    concurrency: Optional[int] = Field(None, ge=1)
+
+
+class BulkCaseResult(BaseModel):
+    case_id: str
+    ok: bool
+    status: Optional[str] = None
+    status_code: int = 200
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+
+
+class BulkCasesResponse(BaseModel):
+    results: List[BulkCaseResult]
+    succeeded: int
+    failed: int
+    elapsed_ms: float
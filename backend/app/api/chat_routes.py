@@ -1,15 +1,18 @@
+import time
+
 from fastapi import APIRouter, HTTPException
 from datetime import datetime
 
 from app.api.chat_schemas import ChatStartResponse, ChatMessageRequest, ChatMessageResponse
+from app.core.keywords import match_categories
+from app.core.ledger import summarize as summarize_audit
+from app.core.profiler import ProfiledRoute
 from app.chat.repo import create_session, add_message, get_messages
-from app.graph.returns_graph import build_graph
+from app.graph.registry import get_returns_graph
 from app.tools.order_lookup import get_order, enrich_order, normalize_order_id
-from app.cases.repo import create_case, get_active_case_for_session, get_closed_case_for_session
-from app.rag.retriever import retrieve_policy_chunks_strict
+from app.cases.repo import create_case, get_session_case
 
-router = APIRouter(prefix="/chat", tags=["chat"])
-_graph = build_graph()
+router = APIRouter(prefix="/chat", tags=["chat"], route_class=ProfiledRoute)
 
 
 def _is_status_inquiry(message: str) -> bool:
@@ -18,41 +21,9 @@ def _is_status_inquiry(message: str) -> bool:
     This includes non-receipt claims - all delivery-related queries get direct responses.
     These should NOT create a case for human review.
     """
-    msg_lower = message.lower()
-    
-    # Keywords that indicate a status/tracking/delivery inquiry
-    status_keywords = [
-        "status", "track", "tracking", "where is", "where's", "when will",
-        "when does", "when is", "delivery date", "estimated", "eta",
-        "shipped", "shipping status", "check status", "order status",
-        "has it shipped", "has my order", "when can i expect",
-        "how long", "arriving", "arrive", "delivery status",
-        "check the status", "delivery update", "shipping update",
-        "isn't delivered", "isnt delivered", "not delivered yet",
-        "hasn't arrived yet", "hasnt arrived yet", "hasn't shipped",
-        "when will it arrive", "when does it arrive", "expected delivery",
-        # Non-receipt / delivery claim keywords - respond with status, don't create case
-        "didn't receive", "did not receive", "haven't received", "not received",
-        "never received", "didn't get", "did not get", "haven't got", "never got",
-        "wasn't delivered", "never arrived", "didn't arrive",
-        "never came", "didn't come", "still waiting",
-        "hasn't arrived", "has not arrived", "haven't gotten", "didn't show",
-        "package is missing", "order is missing", "where is my package",
-        "i never got", "lost", "missing"
-    ]
-    
-    # Keywords that indicate an actual ISSUE requiring case creation (product problems)
-    issue_keywords = [
-        "damage", "damaged", "broken", "defect", "defective", "wrong item",
-        "quality", "ripped", "torn", "stain", "fading", "pilling",
-        "zipper", "seam", "fell apart", "doesn't work", "malfunction",
-        "return", "refund", "exchange", "warranty", "claim", "complaint",
-        "doesn't fit", "too small", "too big", "wrong size", "wrong color",
-        "not what i ordered", "received wrong"
-    ]
-    
-    has_status_keyword = any(kw in msg_lower for kw in status_keywords)
-    has_issue_keyword = any(kw in msg_lower for kw in issue_keywords)
+    hits = match_categories(message)
+    has_status_keyword = "chat.status" in hits
+    has_issue_keyword = "chat.issue" in hits
     
     # It's a status inquiry if it has status keywords but NO issue keywords
     return has_status_keyword and not has_issue_keyword
@@ -63,38 +34,12 @@ def _needs_issue_details(message: str) -> bool:
     Detect generic issue statements that lack actionable details.
     These should prompt for clarification instead of creating a case.
     """
-    msg_lower = message.lower().strip()
-
-    # Generic signals without specifics
-    generic_issue_keywords = [
-        "issue",
-        "problem",
-        "something wrong",
-        "not working",
-        "help",
-        "there is a problem",
-        "there's a problem",
-        "there is an issue",
-        "there's an issue",
-        "theres an issue",
-        "theres a issue",
-    ]
-
-    # Specific issue keywords (if present, we have enough to proceed)
-    specific_issue_keywords = [
-        "damage", "damaged", "broken", "defect", "defective", "wrong item",
-        "quality", "ripped", "torn", "stain", "fading", "pilling",
-        "zipper", "seam", "fell apart", "doesn't work", "malfunction",
-        "return", "refund", "exchange", "warranty", "claim", "complaint",
-        "doesn't fit", "too small", "too big", "wrong size", "wrong color",
-        "not what i ordered", "received wrong", "missing parts",
-    ]
-
-    has_generic = any(k in msg_lower for k in generic_issue_keywords)
-    has_specific = any(k in msg_lower for k in specific_issue_keywords)
+    hits = match_categories(message)
+    has_generic = "chat.generic_issue" in hits
+    has_specific = "chat.specific_issue" in hits
 
     # Also treat very short messages as needing details
-    is_too_short = len(msg_lower.split()) <= 3
+    is_too_short = len(message.split()) <= 3
 
     return (has_generic or is_too_short) and not has_specific
 
@@ -184,6 +129,9 @@ def _answer_general_query(query: str) -> str:
     Answer general policy-related queries using RAG retrieval.
     Returns a helpful answer or a formal fallback message.
     """
+    # Imported here: the retriever pulls in LangChain, which app startup shouldn't pay for
+    from app.rag.retriever import retrieve_policy_chunks_strict
+
     # Try to retrieve relevant policy chunks
     try:
         docs = retrieve_policy_chunks_strict(query)
@@ -191,15 +139,8 @@ def _answer_general_query(query: str) -> str:
         docs = []
     
     # Check if query is relevant to our policies (returns, warranty, refunds, shipping)
-    query_lower = query.lower()
-    policy_keywords = [
-        "return", "refund", "exchange", "warranty", "shipping", "delivery",
-        "replacement", "defect", "damaged", "lost", "policy", "policies",
-        "credit", "cancel", "order", "product", "item", "money back",
-        "how long", "how do", "what is", "what are", "can i", "do you"
-    ]
-    
-    is_relevant = any(keyword in query_lower for keyword in policy_keywords)
+    hits = match_categories(query)
+    is_relevant = "chat.policy_relevant" in hits
     
     if not is_relevant and not docs:
         return (
@@ -209,7 +150,7 @@ def _answer_general_query(query: str) -> str:
         )
     
     # Return a summary based on the query type
-    if "return" in query_lower or "exchange" in query_lower:
+    if "answer.returns" in hits:
         return (
             "Here's our **Return Policy**:\n\n"
             "✅ **30-Day Return Window** - Most items can be returned within 30 days of delivery.\n"
@@ -219,7 +160,7 @@ def _answer_general_query(query: str) -> str:
             "❌ **Personalized Items** - Custom/personalized items are non-returnable.\n\n"
             "Would you like to start a return? Please provide your **Order ID** and I'll check eligibility."
         )
-    elif "warranty" in query_lower or "defect" in query_lower or "quality" in query_lower:
+    elif "answer.warranty" in hits:
         return (
             "Here's our **Warranty Policy**:\n\n"
             "🛡️ **Apparel** - 90-day warranty against manufacturing defects.\n"
@@ -229,7 +170,7 @@ def _answer_general_query(query: str) -> str:
             "❌ **Not Covered** - Normal wear and tear, misuse, or accidental damage.\n\n"
             "To file a warranty claim, please provide your **Order ID** and describe the issue."
         )
-    elif "refund" in query_lower or "credit" in query_lower or "money" in query_lower:
+    elif "answer.refund" in hits:
         return (
             "Here's our **Refund Policy**:\n\n"
             "⏱️ **Processing Time** - Refunds are processed within 3-5 business days after approval.\n"
@@ -239,7 +180,7 @@ def _answer_general_query(query: str) -> str:
             "🔄 **Exchanges** - We can exchange for a different size/color if available.\n\n"
             "For a specific refund inquiry, please provide your **Order ID**."
         )
-    elif "shipping" in query_lower or "delivery" in query_lower or "lost" in query_lower or "track" in query_lower:
+    elif "answer.shipping" in hits:
         return (
             "Here's our **Shipping Policy**:\n\n"
             "📦 **Standard Shipping** - 5-7 business days.\n"
@@ -267,8 +208,12 @@ def chat_start():
 
 @router.post("/{session_id}", response_model=ChatMessageResponse)
 def chat_send(session_id: str, req: ChatMessageRequest):
+    # One lookup for the session's latest case: an open one takes precedence over closed ones
+    session_case = get_session_case(session_id, columns=("case_id", "status"))
+    is_closed = bool(session_case) and session_case.get("status") == "closed"
+
     # Guard: prevent new case creation if an active case already exists for this session
-    active_case = get_active_case_for_session(session_id)
+    active_case = session_case if session_case and not is_closed else None
     if active_case:
         status = active_case.get("status")
         msg = (
@@ -284,7 +229,7 @@ def chat_send(session_id: str, req: ChatMessageRequest):
         )
     
     # Check if session has a closed case - no new cases allowed, only general queries
-    closed_case = get_closed_case_for_session(session_id)
+    closed_case = session_case if is_closed else None
     if closed_case:
         # Save user message
         add_message(session_id, "user", req.message)
@@ -321,15 +266,8 @@ def chat_send(session_id: str, req: ChatMessageRequest):
     raw_order_id = req.order_id
     if not raw_order_id:
         # Check if user is asking a general policy question
-        query_lower = req.message.lower()
-        policy_keywords = [
-            "return", "refund", "exchange", "warranty", "shipping", "delivery",
-            "replacement", "defect", "damaged", "lost", "policy", "policies",
-            "credit", "cancel", "how long", "how do", "what is", "what are",
-            "can i", "do you", "is there"
-        ]
-        
-        is_policy_question = any(keyword in query_lower for keyword in policy_keywords)
+        hits = match_categories(req.message)
+        is_policy_question = "chat.policy_question" in hits
         
         if is_policy_question:
             # Answer the general policy question using RAG
@@ -338,8 +276,7 @@ def chat_send(session_id: str, req: ChatMessageRequest):
             return ChatMessageResponse(session_id=session_id, assistant_message=answer)
         else:
             # Check if it's a greeting or irrelevant query
-            greeting_keywords = ["hi", "hello", "hey", "wsup", "sup", "what's up", "howdy", "good morning", "good afternoon", "good evening"]
-            is_greeting = any(keyword in query_lower for keyword in greeting_keywords)
+            is_greeting = "chat.greeting" in hits
             
             if is_greeting and len(req.message.split()) < 10:
                 # It's just a greeting, respond friendly and ask how to help
@@ -396,12 +333,12 @@ def chat_send(session_id: str, req: ChatMessageRequest):
     # If reason not provided, we do a lightweight inference (keywords)
     inferred_reason = (req.reason or "").strip()
     if not inferred_reason:
-        txt = req.message.lower()
-        if any(k in txt for k in ["doesn't fit", "too small", "too big", "wrong size", "changed my mind"]):
+        hits = match_categories(req.message)
+        if "chat.reason_fit" in hits:
             inferred_reason = "Doesn't fit"
-        elif any(k in txt for k in ["lost", "missing", "not arrived", "label created", "in transit"]):
+        elif "chat.reason_shipping" in hits:
             inferred_reason = "Shipping issue"
-        elif any(k in txt for k in ["defect", "broke", "broken", "fading", "pilling", "zipper", "seam", "quality"]):
+        elif "chat.reason_quality" in hits:
             inferred_reason = "Quality issue"
         else:
             inferred_reason = "General inquiry"
@@ -416,7 +353,9 @@ def chat_send(session_id: str, req: ChatMessageRequest):
         "errors": [],
     }
 
-    out = _graph.invoke(state)
+    t0 = time.perf_counter()
+    out = get_returns_graph().invoke(state)
+    graph_ms = (time.perf_counter() - t0) * 1000
     assistant_message = out.get("customer_reply", "").strip() or "Thanks—our team will review this."
 
     case_id = None
@@ -439,7 +378,7 @@ def chat_send(session_id: str, req: ChatMessageRequest):
                 "photos_required": photos_required,
                 "status": status,
                 "ai_decision": decision,
-                "ai_audit": out.get("audit") or {},
+                "ai_audit": summarize_audit(out.get("audit"), wall_ms=graph_ms),
                 "policy_citations": [
                     {
                         "source": str(d.metadata.get("source")),
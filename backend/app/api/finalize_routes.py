@@ -1,13 +1,25 @@
+import contextvars
 import json
-from typing import Any, Dict
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Literal, Optional
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import JSONResponse
 
-from app.cases.repo import get_case, set_final_outcome
-from app.graph.finalize_graph import build_finalize_graph
+from app.api.cases_schemas import BulkCaseResult, BulkCasesResponse, BulkFinalizeRequest
+from app.cases.finalize_queue import FinalizeJobQueue
+from app.cases.repo import get_case, get_finalize_job, set_final_outcome
+from app.core.ledger import merge_audit, summarize as summarize_audit
+from app.core.profiler import ProfiledRoute, sampled
+from app.graph.registry import get_finalize_graph
 from app.security.basic_auth import require_reviewer_basic_auth
 
-router = APIRouter(prefix="/cases", tags=["cases"])
-_finalize_graph = build_finalize_graph()
+router = APIRouter(prefix="/cases", tags=["cases"], route_class=ProfiledRoute)
+
+# Upper bound on parallel finalize runs per bulk request (each mostly waits on the LLM)
+FINALIZE_BULK_CONCURRENCY = int(os.getenv("FINALIZE_BULK_CONCURRENCY", "4"))
+CASES_BULK_MAX_ITEMS = int(os.getenv("CASES_BULK_MAX_ITEMS", "500"))
 
 
 def _parse_json(raw: str) -> dict:
@@ -124,23 +136,140 @@ def _fallback_finalize_payload(case: Dict[str, Any]) -> Dict[str, Any]:
     return {"customer_reply": reply, "next_actions": next_actions}
 
 
-@router.post("/{case_id}/finalize", dependencies=[Depends(require_reviewer_basic_auth)])
-def finalize_case(case_id: str):
-    case = get_case(case_id)
+def _closed_result(case: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "case_id": case["case_id"],
+        "status": "closed",
+        "customer_reply": case.get("final_customer_reply"),
+        "next_actions": case.get("next_actions_json") or [],
+    }
+
+
+# What the finalizable/closed checks and _closed_result() read
+_CHECK_COLUMNS = ("status", "human_decision", "final_customer_reply", "next_actions_json")
+
+
+class _CaseArchived(HTTPException):
+    """The 409 for an archived case, told apart from other errors in bulk results."""
+
+    def __init__(self) -> None:
+        super().__init__(status_code=409, detail="Case is archived")
+
+
+def _check_finalizable(case_id: str) -> Dict[str, Any]:
+    case = get_case(case_id, columns=_CHECK_COLUMNS)
     if not case:
         raise HTTPException(status_code=404, detail="Case not found")
+    if case.get("archived"):
+        raise _CaseArchived()
+    if not case.get("human_decision") and not _is_closed(case):
+        raise HTTPException(status_code=400, detail="Human decision is required before finalizing")
+    return case
+
+
+def _is_closed(case: Dict[str, Any]) -> bool:
+    return case.get("status") == "closed" and bool(case.get("final_customer_reply"))
+
+
+@router.post("/{case_id}/finalize", dependencies=[Depends(require_reviewer_basic_auth)])
+def finalize_case(case_id: str, mode: Literal["sync", "job"] = "sync"):
+    """
+    mode=sync runs finalize in the request. mode=job queues it and returns 202
+    with a job id to poll at GET /cases/finalize/jobs/{job_id}.
+    """
+    if mode == "sync":
+        return _run_finalize(case_id)
+
+    case = _check_finalizable(case_id)
+    # Idempotency: a closed case needs no job, return the stored result
+    if _is_closed(case):
+        return _closed_result(case)
+    job = finalize_jobs.submit(case_id)
+    return JSONResponse(status_code=202, content=_job_payload(job))
+
+
+@router.post("/finalize/bulk", response_model=BulkCasesResponse, dependencies=[Depends(require_reviewer_basic_auth)])
+def finalize_bulk(req: BulkFinalizeRequest):
+    """Finalize many cases with bounded parallelism; one result per case, failures don't stop the rest."""
+    check_bulk_size(req.case_ids)
+    t0 = time.perf_counter()
+    results = finalize_many(list(dict.fromkeys(req.case_ids)), req.concurrency)
+    return bulk_response(results, t0)
+
+
+def check_bulk_size(case_ids: List[str]) -> None:
+    if len(case_ids) > CASES_BULK_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"Too many cases (max {CASES_BULK_MAX_ITEMS})")
+
+
+def finalize_many(case_ids: List[str], concurrency: Optional[int] = None) -> List[BulkCaseResult]:
+    """Run _run_finalize over case_ids on a bounded pool; results keep the input order."""
+    if not case_ids:
+        return []
+    workers = max(1, min(concurrency or FINALIZE_BULK_CONCURRENCY, FINALIZE_BULK_CONCURRENCY, len(case_ids)))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="finalize-bulk") as pool:
+        # One context copy per case so the request ID reaches the workers
+        futures = [pool.submit(contextvars.copy_context().run, _finalize_bulk_item, case_id) for case_id in case_ids]
+        return [f.result() for f in futures]
+
+
+@sampled
+def _finalize_bulk_item(case_id: str) -> BulkCaseResult:
+    try:
+        result = _run_finalize(case_id)
+        return BulkCaseResult(case_id=case_id, ok=True, status=result["status"], result=result)
+    except _CaseArchived as e:
+        return BulkCaseResult(case_id=case_id, ok=False, status="archived", status_code=e.status_code, error=str(e.detail))
+    except HTTPException as e:
+        return BulkCaseResult(case_id=case_id, ok=False, status_code=e.status_code, error=str(e.detail))
+    except Exception as e:
+        return BulkCaseResult(case_id=case_id, ok=False, status_code=500, error=f"{type(e).__name__}: {e}")
+
+
+def bulk_response(results: List[BulkCaseResult], t0: float) -> BulkCasesResponse:
+    succeeded = sum(1 for r in results if r.ok)
+    return BulkCasesResponse(
+        results=results,
+        succeeded=succeeded,
+        failed=len(results) - succeeded,
+        elapsed_ms=round((time.perf_counter() - t0) * 1000, 3),
+    )
+
+
+@router.get("/finalize/jobs/{job_id}", dependencies=[Depends(require_reviewer_basic_auth)])
+def finalize_job_status(job_id: str):
+    job = get_finalize_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return _job_payload(job)
+
+
+def _job_payload(job: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "job_id": job["job_id"],
+        "case_id": job["case_id"],
+        "status": job["status"],
+        "attempts": job["attempts"],
+        "created_at": job["created_at"],
+        "started_at": job.get("started_at"),
+        "finished_at": job.get("finished_at"),
+        "result": job.get("result"),
+        "error": job.get("error"),
+        "status_code": job.get("status_code"),
+    }
+
+
+def _run_finalize(case_id: str) -> Dict[str, Any]:
+    """Finalize one case (shared by the sync endpoint and the job workers)."""
+    case = _check_finalizable(case_id)
 
     # Idempotency: if already closed with final reply, return stored result
-    if case.get("status") == "closed" and case.get("final_customer_reply"):
-        return {
-            "case_id": case_id,
-            "status": "closed",
-            "customer_reply": case.get("final_customer_reply"),
-            "next_actions": case.get("next_actions_json") or [],
-        }
-
-    if not case.get("human_decision"):
-        raise HTTPException(status_code=400, detail="Human decision is required before finalizing")
+    if _is_closed(case):
+        return _closed_result(case)
+    # Only an actual finalize run needs the order facts, AI decision and photos
+    case = get_case(case_id)
+    if not case:
+        raise HTTPException(status_code=404, detail="Case not found")
 
     # Build state
     state = {
@@ -157,7 +286,9 @@ def finalize_case(case_id: str):
         "llm_profile": "finalize",
     }
 
-    out = _finalize_graph.invoke(state)
+    t0 = time.perf_counter()
+    out = get_finalize_graph().invoke(state)
+    audit = out.get("audit") or {}
     raw = out.get("finalize_output_raw") or ""
 
     if not raw.strip():
@@ -165,7 +296,8 @@ def finalize_case(case_id: str):
         retry_state["llm_profile"] = "repair"
         retry_state["force_json_only"] = True
         retry_state["force_minimal_prompt"] = True
-        out = _finalize_graph.invoke(retry_state)
+        out = get_finalize_graph().invoke(retry_state)
+        audit = merge_audit(audit, {**(out.get("audit") or {}), "retries": 1})
         raw = out.get("finalize_output_raw") or ""
 
     try:
@@ -176,7 +308,8 @@ def finalize_case(case_id: str):
         retry_state["llm_profile"] = "repair"
         retry_state["force_json_only"] = True
         retry_state["force_minimal_prompt"] = True
-        out = _finalize_graph.invoke(retry_state)
+        out = get_finalize_graph().invoke(retry_state)
+        audit = merge_audit(audit, {**(out.get("audit") or {}), "retries": 1})
         raw = out.get("finalize_output_raw") or ""
 
         try:
@@ -197,7 +330,8 @@ def finalize_case(case_id: str):
     if not isinstance(next_actions, list):
         raise HTTPException(status_code=500, detail="Finalize output next_actions must be a list")
 
-    set_final_outcome(case_id, customer_reply, next_actions)
+    finalize_audit = summarize_audit(audit, wall_ms=(time.perf_counter() - t0) * 1000)
+    set_final_outcome(case_id, customer_reply, next_actions, finalize_audit=finalize_audit)
 
     return {
         "case_id": case_id,
@@ -205,3 +339,7 @@ def finalize_case(case_id: str):
         "customer_reply": customer_reply,
         "next_actions": next_actions,
     }
+
+
+# Started/stopped by the app lifespan in app.main
+finalize_jobs = FinalizeJobQueue(_run_finalize)
@@ -0,0 +1,39 @@
+from typing import Any, Dict
+
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import PlainTextResponse
+
+from app.core.metrics import render as render_metrics
+from app.core.profiler import ProfiledRoute, get_profile, list_profiles
+from app.core.tracing import trace_summary, tracing_enabled
+from app.security.basic_auth import require_reviewer_basic_auth
+
+router = APIRouter(tags=["ops"], route_class=ProfiledRoute)
+
+
+@router.get("/debug/traces", dependencies=[Depends(require_reviewer_basic_auth)])
+def debug_traces() -> Dict[str, Any]:
+    """Per-node span aggregate since process start (empty unless TRACING_ENABLED=1)."""
+    return {"enabled": tracing_enabled(), "nodes": trace_summary()}
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def metrics() -> PlainTextResponse:
+    """Prometheus scrape endpoint."""
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+@router.get("/debug/profiles", dependencies=[Depends(require_reviewer_basic_auth)])
+def debug_profiles() -> Dict[str, Any]:
+    return {"profiles": list_profiles()}
+
+
+@router.get("/debug/profiles/{profile_id}", dependencies=[Depends(require_reviewer_basic_auth)])
+def debug_profile(profile_id: str, format: str = "json"):
+    """`format=collapsed` returns plain collapsed stacks (flamegraph.pl / speedscope input)."""
+    profile = get_profile(profile_id)
+    if not profile:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    if format == "collapsed":
+        return PlainTextResponse("\n".join(profile["collapsed"]) + "\n")
+    return profile
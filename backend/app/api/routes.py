@@ -1,11 +1,37 @@
-from fastapi import APIRouter, HTTPException
+import asyncio
+import contextvars
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, List
 
-from app.api.schemas import ResolveRequest, ResolveResponse, Decision, InternalAudit, Citation
-from app.graph.returns_graph import build_graph
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import ValidationError
+from starlette.requests import ClientDisconnect
+
+from app.api.schemas import (
+    Citation,
+    Decision,
+    InternalAudit,
+    ResolveBatchItem,
+    ResolveBatchRequest,
+    ResolveBatchResponse,
+    ResolveRequest,
+    ResolveResponse,
+)
+from app.core import warmup
+from app.core.profiler import ProfiledRoute, sampled
+from app.graph.registry import get_returns_graph
 from app.tools.order_lookup import get_order, enrich_order
 
-router = APIRouter()
-_graph = build_graph()
+router = APIRouter(route_class=ProfiledRoute)
+
+# Upper bound on parallel graph runs per batch (each run mostly waits on the LLM)
+RESOLVE_BATCH_CONCURRENCY = int(os.getenv("RESOLVE_BATCH_CONCURRENCY", "8"))
+RESOLVE_BATCH_MAX_ITEMS = int(os.getenv("RESOLVE_BATCH_MAX_ITEMS", "1000"))
+# Longest accepted NDJSON input line for /resolve/stream
+RESOLVE_STREAM_MAX_LINE_BYTES = 64 * 1024
 
 
 @router.get("/health")
@@ -13,8 +39,172 @@ def health():
     return {"status": "ok"}
 
 
+@router.get("/ready")
+def ready():
+    """Readiness for the load balancer: 503 until the startup warm-up has run, and while shutting down."""
+    state = warmup.readiness()
+    return JSONResponse(status_code=200 if state["ready"] else 503, content=state)
+
+
 @router.post("/resolve", response_model=ResolveResponse)
 def resolve(req: ResolveRequest):
+    return _resolve_one(req)
+
+
+@router.post("/resolve/batch", response_model=ResolveBatchResponse)
+def resolve_batch(req: ResolveBatchRequest):
+    """
+    Resolve many orders in one call. Items run through the returns graph on a
+    bounded thread pool and share the process-wide order index and retrieval
+    cache; a failing item is reported in its slot instead of failing the batch.
+    """
+    if len(req.items) > RESOLVE_BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"Batch too large (max {RESOLVE_BATCH_MAX_ITEMS} items)")
+
+    workers = max(1, min(req.concurrency or RESOLVE_BATCH_CONCURRENCY, RESOLVE_BATCH_CONCURRENCY, len(req.items)))
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="resolve-batch") as pool:
+        # One context copy per item so request-scoped context (request ID) reaches the workers
+        futures = [
+            pool.submit(contextvars.copy_context().run, _resolve_batch_item, i, item)
+            for i, item in enumerate(req.items)
+        ]
+        results: List[ResolveBatchItem] = [f.result() for f in futures]
+
+    failed = sum(1 for r in results if not r.ok)
+    return ResolveBatchResponse(
+        results=results,
+        succeeded=len(results) - failed,
+        failed=failed,
+        elapsed_ms=round((time.perf_counter() - t0) * 1000, 3),
+    )
+
+
+@router.post("/resolve/stream")
+async def resolve_stream(request: Request, concurrency: int | None = None):
+    """
+    NDJSON in, NDJSON out: one ResolveRequest per input line, one ResolveBatchItem
+    per output line, written as soon as that item's graph run finishes (so out of
+    order; match on `index`, the 0-based input line number; blank lines are
+    skipped but counted).
+
+    At most `concurrency` items are in flight, and the body is read only when a
+    slot frees up, so memory stays flat however long the input is. A slow reader
+    stalls the response, which in turn stops intake.
+    """
+    workers = max(1, min(concurrency or RESOLVE_BATCH_CONCURRENCY, RESOLVE_BATCH_CONCURRENCY))
+    return _DuplexStreamingResponse(_resolve_ndjson(request, workers), media_type="application/x-ndjson")
+
+
+class _DuplexStreamingResponse(StreamingResponse):
+    """
+    StreamingResponse that keeps reading the request body while it streams.
+
+    On ASGI spec < 2.4 (uvicorn) Starlette's StreamingResponse runs a disconnect
+    listener that consumes and discards `http.request` messages, which would eat
+    the NDJSON input. Here only the body reader calls receive(); a disconnect
+    surfaces there as ClientDisconnect.
+    """
+
+    async def __call__(self, scope, receive, send) -> None:
+        await self.stream_response(send)
+
+
+async def _ndjson_lines(request: Request) -> AsyncIterator[bytes]:
+    """
+    Split the body into lines. A line over RESOLVE_STREAM_MAX_LINE_BYTES is
+    yielded once, cut to one byte past the limit (so _stream_item rejects it),
+    and the rest of it is dropped chunk by chunk as it arrives, never buffered.
+    """
+    buf = bytearray()
+    scanned = 0  # buf[:scanned] holds no newline
+    skipping = False  # inside the tail of a rejected line
+    async for chunk in request.stream():
+        if skipping:
+            nl = chunk.find(b"\n")
+            if nl == -1:
+                continue
+            chunk = chunk[nl + 1 :]
+            skipping = False
+        buf += chunk
+        start = 0
+        while True:
+            nl = buf.find(b"\n", scanned)
+            if nl == -1:
+                break
+            yield bytes(buf[start:nl])
+            start = scanned = nl + 1
+        del buf[:start]
+        scanned = len(buf)
+        if len(buf) > RESOLVE_STREAM_MAX_LINE_BYTES:
+            yield bytes(buf[: RESOLVE_STREAM_MAX_LINE_BYTES + 1])
+            buf.clear()
+            scanned = 0
+            skipping = True
+    if buf:
+        yield bytes(buf)
+
+
+@sampled
+def _stream_item(index: int, line: bytes) -> ResolveBatchItem:
+    if len(line) > RESOLVE_STREAM_MAX_LINE_BYTES:
+        return ResolveBatchItem(index=index, order_id="", ok=False, status_code=413, error="Line too long")
+    try:
+        req = ResolveRequest.model_validate_json(line)
+    except ValidationError as e:
+        return ResolveBatchItem(index=index, order_id="", ok=False, status_code=422, error=str(e))
+    return _resolve_batch_item(index, req)
+
+
+async def _resolve_ndjson(request: Request, workers: int) -> AsyncIterator[bytes]:
+    loop = asyncio.get_running_loop()
+    lines = _ndjson_lines(request)
+    pending: set = set()
+    index = 0
+    exhausted = False
+    # Not a with-block: its exit would shutdown(wait=True) on the event loop and
+    # stall the whole server until every in-flight graph run finished
+    pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="resolve-stream")
+    try:
+        while pending or not exhausted:
+            while not exhausted and len(pending) < workers:
+                try:
+                    line = await lines.__anext__()
+                except StopAsyncIteration:
+                    exhausted = True
+                    break
+                # index is the 0-based input line number, blank lines included
+                line_no, index = index, index + 1
+                if not line.strip():
+                    continue
+                ctx = contextvars.copy_context()
+                pending.add(loop.run_in_executor(pool, ctx.run, _stream_item, line_no, line))
+            if not pending:
+                break
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for fut in done:
+                yield fut.result().model_dump_json().encode("utf-8") + b"\n"
+    except ClientDisconnect:
+        return
+    finally:
+        # Client went away (or we're done): drop queued items; running ones
+        # finish in the background without holding up the event loop
+        for fut in pending:
+            fut.cancel()
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+@sampled
+def _resolve_batch_item(index: int, req: ResolveRequest) -> ResolveBatchItem:
+    try:
+        return ResolveBatchItem(index=index, order_id=req.order_id, ok=True, result=_resolve_one(req))
+    except HTTPException as e:
+        return ResolveBatchItem(index=index, order_id=req.order_id, ok=False, status_code=e.status_code, error=str(e.detail))
+    except Exception as e:
+        return ResolveBatchItem(index=index, order_id=req.order_id, ok=False, status_code=500, error=f"{type(e).__name__}: {e}")
+
+
+def _resolve_one(req: ResolveRequest) -> ResolveResponse:
     order = get_order(req.order_id)
     if not order:
         raise HTTPException(status_code=404, detail="Order not found")
@@ -31,7 +221,7 @@ def resolve(req: ResolveRequest):
         "errors": [],
     }
 
-    out = _graph.invoke(state)
+    out = get_returns_graph().invoke(state)
 
     # Build citations from retrieved docs (simple MVP)
     citations = []
@@ -59,4 +59,26 @@ class InternalAudit(BaseModel):
 class ResolveResponse(BaseModel):
     decision: Decision
     customer_reply: str
-    internal_audit: InternalAudit
\ No newline at end of file
+    internal_audit: InternalAudit
+
+
+class ResolveBatchRequest(BaseModel):
+    items: List[ResolveRequest] = Field(..., min_length=1)
+    # Parallel graph runs for this batch; capped by RESOLVE_BATCH_CONCURRENCY
+    concurrency: Optional[int] = Field(None, ge=1)
+
+
+class ResolveBatchItem(BaseModel):
+    index: int
+    order_id: str
+    ok: bool
+    result: Optional[ResolveResponse] = None
+    status_code: int = 200
+    error: Optional[str] = None
+
+
+class ResolveBatchResponse(BaseModel):
+    results: List[ResolveBatchItem]
+    succeeded: int
+    failed: int
+    elapsed_ms: float
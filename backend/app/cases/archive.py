@@ -0,0 +1,248 @@
+"""
+Move closed cases older than a cutoff, with their photos and finalize jobs, and
+chat sessions nobody has used since the cutoff, into the archive database
+(ARCHIVE_DB_PATH), so the hot database stays bounded however long we run.
+
+Archived cases stay readable: get_case / get_case_public / get_case_version
+and get_session_case fall back to the archive (the case comes back with
+"archived": True), so a chat session whose closed case was archived is still
+closed. Listing and writes only see the hot database.
+
+Each batch is two short transactions: copy into the archive and commit, then
+delete from the hot DB and commit. In WAL mode a transaction spanning two
+files isn't atomic, so this order means a crash can at worst leave a row in
+both (the copy is INSERT OR REPLACE and the next run finishes the delete),
+never in neither. A case that changed between the two steps (its version
+moved) is left hot and picked up again next run.
+
+Deleted pages are reused by new writes, so the hot file stops growing;
+--vacuum also shrinks it (briefly locks the database).
+
+Run from backend/ (safe while the app is serving):
+  python -m app.cases.archive --dry-run
+  python -m app.cases.archive --older-than-days 90 --batch 200 --pause-ms 20
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import sqlite3
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Sequence
+
+from app.cases.db import ARCHIVE_DB_PATH, connect, init_db
+from app.cases.search import rebuild
+from app.chat.db import init_chat_db
+
+ARCHIVE_AFTER_DAYS = int(os.getenv("ARCHIVE_AFTER_DAYS", "90"))
+
+# Archived tables; the archive copies each one's schema from the hot DB
+_TABLES = ("cases", "case_photos", "finalize_jobs", "chat_sessions", "chat_messages")
+_ARCHIVE_INDEXES = (
+    "CREATE INDEX IF NOT EXISTS archive.idx_cases_session_created ON cases (session_id, created_at)",
+    "CREATE INDEX IF NOT EXISTS archive.idx_case_photos_case ON case_photos (case_id, id)",
+    "CREATE INDEX IF NOT EXISTS archive.idx_finalize_jobs_case ON finalize_jobs (case_id, created_at)",
+    "CREATE INDEX IF NOT EXISTS archive.idx_chat_messages_session ON chat_messages (session_id, id)",
+)
+
+_CASES_DUE = """
+    SELECT case_id FROM cases
+    WHERE status = 'closed' AND created_at < ?
+    ORDER BY created_at, case_id
+    LIMIT ?
+"""
+# Sessions with no hot case left and no message since the cutoff
+_SESSION_IDLE = """
+    s.created_at < :cutoff
+    AND NOT EXISTS (SELECT 1 FROM cases c WHERE c.session_id = s.session_id)
+    AND NOT EXISTS (SELECT 1 FROM chat_messages m WHERE m.session_id = s.session_id AND m.created_at >= :cutoff)
+"""
+
+
+def cutoff_iso(older_than_days: int) -> str:
+    return (datetime.now(timezone.utc) - timedelta(days=older_than_days)).isoformat()
+
+
+def _open() -> sqlite3.Connection:
+    """Dedicated hot-DB connection with the archive attached and its schema up to date."""
+    init_db()
+    init_chat_db()
+    conn = connect()
+    conn.execute("ATTACH DATABASE ? AS archive", (str(ARCHIVE_DB_PATH),))
+    conn.execute("PRAGMA archive.journal_mode = WAL")
+    with conn:
+        for table in _TABLES:
+            sql = conn.execute("SELECT sql FROM main.sqlite_master WHERE type = 'table' AND name = ?", (table,)).fetchone()[0]
+            conn.execute(sql.replace(f"CREATE TABLE {table}", f"CREATE TABLE IF NOT EXISTS archive.{table}", 1))
+            # Columns added to the hot table since the archive was created
+            have = {r["name"] for r in conn.execute(f"PRAGMA archive.table_info({table})")}
+            for col in conn.execute(f"PRAGMA main.table_info({table})"):
+                if col["name"] not in have:
+                    default = f" DEFAULT {col['dflt_value']}" if col["dflt_value"] is not None else ""
+                    conn.execute(f"ALTER TABLE archive.{table} ADD COLUMN {col['name']} {col['type']}{default}")
+        for sql in _ARCHIVE_INDEXES:
+            conn.execute(sql)
+    return conn
+
+
+def _copy(conn: sqlite3.Connection, table: str, key: str, ids: Sequence[str]) -> None:
+    cols = ", ".join(r["name"] for r in conn.execute(f"PRAGMA main.table_info({table})"))
+    marks = ", ".join("?" * len(ids))
+    conn.execute(
+        f"INSERT OR REPLACE INTO archive.{table} ({cols}) SELECT {cols} FROM main.{table} WHERE {key} IN ({marks})",
+        list(ids),
+    )
+
+
+def _archive_cases(conn: sqlite3.Connection, cutoff: str, batch_size: int, pause_s: float) -> int:
+    moved = 0
+    while True:
+        ids = [r["case_id"] for r in conn.execute(_CASES_DUE, (cutoff, batch_size))]
+        if not ids:
+            return moved
+        marks = ", ".join("?" * len(ids))
+        with conn:
+            for table in ("cases", "case_photos", "finalize_jobs"):
+                _copy(conn, table, "case_id", ids)
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            deleted = conn.execute(
+                f"""
+                DELETE FROM main.cases
+                WHERE case_id IN ({marks})
+                  AND version = (SELECT a.version FROM archive.cases a WHERE a.case_id = main.cases.case_id)
+                """,
+                ids,
+            ).rowcount
+            gone = f"case_id IN ({marks}) AND case_id NOT IN (SELECT case_id FROM main.cases)"
+            conn.execute(f"DELETE FROM main.case_photos WHERE {gone}", ids)
+            conn.execute(f"DELETE FROM main.finalize_jobs WHERE {gone}", ids)
+            if deleted:
+                conn.execute("UPDATE cases_meta SET value = value + 1 WHERE key = 'collection_version'")
+        moved += deleted
+        if deleted < len(ids):
+            # Skipped ones changed mid-batch; stop rather than re-select them forever
+            return moved
+        if pause_s:
+            time.sleep(pause_s)
+
+
+def _archive_sessions(conn: sqlite3.Connection, cutoff: str, batch_size: int, pause_s: float) -> int:
+    moved = 0
+    while True:
+        ids = [
+            r["session_id"]
+            for r in conn.execute(
+                f"SELECT session_id FROM chat_sessions s WHERE {_SESSION_IDLE} LIMIT :limit",
+                {"cutoff": cutoff, "limit": batch_size},
+            )
+        ]
+        if not ids:
+            return moved
+        marks = ", ".join("?" * len(ids))
+        with conn:
+            _copy(conn, "chat_sessions", "session_id", ids)
+            _copy(conn, "chat_messages", "session_id", ids)
+        params: Dict[str, str] = {"cutoff": cutoff, **{f"s{i}": sid for i, sid in enumerate(ids)}}
+        named = ", ".join(f":s{i}" for i in range(len(ids)))
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            deleted = conn.execute(
+                f"DELETE FROM main.chat_sessions AS s WHERE session_id IN ({named}) AND {_SESSION_IDLE}", params
+            ).rowcount
+            conn.execute(
+                f"""
+                DELETE FROM main.chat_messages
+                WHERE session_id IN ({marks}) AND session_id NOT IN (SELECT session_id FROM main.chat_sessions)
+                """,
+                ids,
+            )
+        moved += deleted
+        if deleted < len(ids):
+            return moved
+        if pause_s:
+            time.sleep(pause_s)
+
+
+def archive(older_than_days: int = ARCHIVE_AFTER_DAYS, batch_size: int = 200, pause_s: float = 0.0) -> Dict[str, int]:
+    """Move everything older than the cutoff; returns how many cases and chat sessions moved."""
+    cutoff = cutoff_iso(older_than_days)
+    conn = _open()
+    try:
+        cases = _archive_cases(conn, cutoff, batch_size, pause_s)
+        sessions = _archive_sessions(conn, cutoff, batch_size, pause_s)
+    finally:
+        conn.close()
+    return {"cases": cases, "sessions": sessions}
+
+
+def pending(older_than_days: int = ARCHIVE_AFTER_DAYS) -> Dict[str, int]:
+    """What archive() would move right now."""
+    cutoff = cutoff_iso(older_than_days)
+    init_db()
+    init_chat_db()
+    conn = connect()
+    try:
+        cases = conn.execute(
+            "SELECT COUNT(*) FROM cases WHERE status = 'closed' AND created_at < ?", (cutoff,)
+        ).fetchone()[0]
+        # Count sessions as archive() will see them once the due cases are gone
+        idle = _SESSION_IDLE.replace(
+            "c.session_id = s.session_id",
+            "c.session_id = s.session_id AND NOT (c.status = 'closed' AND c.created_at < :cutoff)",
+        )
+        sessions = conn.execute(f"SELECT COUNT(*) FROM chat_sessions s WHERE {idle}", {"cutoff": cutoff}).fetchone()[0]
+    finally:
+        conn.close()
+    return {"cases": cases, "sessions": sessions}
+
+
+def vacuum() -> None:
+    conn = connect()
+    try:
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        conn.execute("VACUUM")
+        # VACUUM may renumber case rowids, which the search index is keyed on
+        with conn:
+            rebuild(conn)
+    finally:
+        conn.close()
+
+
+def _counts(conn: sqlite3.Connection, schema: str) -> List[str]:
+    return [f"{t}={conn.execute(f'SELECT COUNT(*) FROM {schema}.{t}').fetchone()[0]}" for t in _TABLES]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Move old closed cases and idle chat sessions to the archive DB.")
+    parser.add_argument("--older-than-days", type=int, default=ARCHIVE_AFTER_DAYS)
+    parser.add_argument("--batch", type=int, default=200, help="cases/sessions per transaction pair")
+    parser.add_argument("--pause-ms", type=float, default=0.0, help="sleep between batches")
+    parser.add_argument("--dry-run", action="store_true", help="only count what would move")
+    parser.add_argument("--vacuum", action="store_true", help="VACUUM the hot DB afterwards so the file shrinks")
+    args = parser.parse_args()
+
+    if args.dry_run:
+        due = pending(args.older_than_days)
+        print(f"Would archive {due['cases']} case(s) and {due['sessions']} chat session(s)")
+        return
+
+    t0 = time.perf_counter()
+    moved = archive(args.older_than_days, args.batch, args.pause_ms / 1000)
+    print(
+        f"Archived {moved['cases']} case(s) and {moved['sessions']} chat session(s) "
+        f"in {time.perf_counter() - t0:.1f}s"
+    )
+    if args.vacuum:
+        vacuum()
+    conn = _open()
+    try:
+        print("Hot:     " + " ".join(_counts(conn, "main")))
+        print("Archive: " + " ".join(_counts(conn, "archive")))
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
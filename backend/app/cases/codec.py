@@ -0,0 +1,53 @@
+"""
+Storage encoding for the bulky case JSON columns (order_facts_json,
+policy_citations_json).
+
+Values at least CASE_JSON_COMPRESS_MIN_BYTES long are stored as a BLOB: the
+b"zj1" format marker followed by zlib-compressed compact JSON. Shorter values,
+and everything when CASE_JSON_COMPRESS=0, stay plain JSON text. Reads accept
+both, so rows written before compression (or with it turned off) decode as
+they always did; `python -m app.cases.reencode` rewrites them.
+
+ai_decision_json and ai_audit_json stay plain text: cost_report() and
+set_final_outcome() query and patch them with SQLite's JSON functions.
+"""
+from __future__ import annotations
+
+import json
+import os
+import zlib
+from typing import Any, Optional, Union
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+CASE_JSON_COMPRESS = os.getenv("CASE_JSON_COMPRESS", "1").strip().lower() in {"1", "true", "yes"}
+CASE_JSON_COMPRESS_MIN_BYTES = int(os.getenv("CASE_JSON_COMPRESS_MIN_BYTES", "256"))
+CASE_JSON_COMPRESS_LEVEL = int(os.getenv("CASE_JSON_COMPRESS_LEVEL", "6"))
+
+# Columns stored with encode_json()
+COMPRESSED_COLUMNS = ("order_facts_json", "policy_citations_json")
+
+MARKER = b"zj1"
+
+
+def encode_json(value: Any) -> Union[str, bytes]:
+    text = json.dumps(value)
+    if not CASE_JSON_COMPRESS or len(text) < CASE_JSON_COMPRESS_MIN_BYTES:
+        return text
+    compact = json.dumps(value, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    return MARKER + zlib.compress(compact, CASE_JSON_COMPRESS_LEVEL)
+
+
+def decode_json(raw: Optional[Union[str, bytes]]) -> Any:
+    """Decode a stored value in either format; empty/NULL gives None."""
+    if not raw:
+        return None
+    if is_encoded(raw):
+        return json.loads(zlib.decompress(raw[len(MARKER):]))
+    return json.loads(raw)
+
+
+def is_encoded(raw: Any) -> bool:
+    return isinstance(raw, bytes) and raw.startswith(MARKER)
@@ -1,18 +1,36 @@
 import os
 import sqlite3
 from pathlib import Path
+from typing import Optional
 from dotenv import load_dotenv
 
+from app.cases.search import init_search
+from app.core.sqlite import SQLiteDatabase
+
 load_dotenv()
 
 DB_PATH = Path(os.getenv("DB_PATH", "app/storage/cases.db"))
+# Closed cases moved out by app.cases.archive; read-through only
+ARCHIVE_DB_PATH = Path(os.getenv("ARCHIVE_DB_PATH", "app/storage/cases_archive.db"))
+_db = SQLiteDatabase(DB_PATH, "cases")
+_archive_db = SQLiteDatabase(ARCHIVE_DB_PATH, "archive")
 
 
 def get_conn() -> sqlite3.Connection:
-    DB_PATH.parent.mkdir(parents=True, exist_ok=True)
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    return conn
+    """This thread's persistent connection (see app.core.sqlite)."""
+    return _db.connection()
+
+
+def get_archive_conn() -> Optional[sqlite3.Connection]:
+    """This thread's connection to the archive DB, or None if nothing was ever archived."""
+    if not ARCHIVE_DB_PATH.exists():
+        return None
+    return _archive_db.connection()
+
+
+def connect() -> sqlite3.Connection:
+    """A new dedicated connection (for batch jobs that ATTACH or hold long transactions)."""
+    return _db.connect()
 
 
 def init_db() -> None:
@@ -55,4 +73,78 @@ def init_db() -> None:
         try:
             conn.execute("ALTER TABLE cases ADD COLUMN session_id TEXT")
         except sqlite3.OperationalError:
-            pass
\ No newline at end of file
+            pass
+        # Per-case version (bumped on every write; used as the ETag)
+        try:
+            conn.execute("ALTER TABLE cases ADD COLUMN version INTEGER NOT NULL DEFAULT 1")
+        except sqlite3.OperationalError:
+            pass
+
+        # Small key/value table; collection_version changes whenever any case does
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS cases_meta (
+              key TEXT PRIMARY KEY,
+              value INTEGER NOT NULL
+            );
+            """
+        )
+        conn.execute("INSERT OR IGNORE INTO cases_meta (key, value) VALUES ('collection_version', 1)")
+
+        # Keyset pagination on (created_at, case_id), optionally within a status/order
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_cases_created ON cases (created_at, case_id)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_cases_status_created ON cases (status, created_at, case_id)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_cases_order_created ON cases (order_id, created_at, case_id)")
+        # Chat session -> its latest case (get_session_case, every chat turn)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_cases_session_created ON cases (session_id, created_at)")
+
+        # Photos, one row per upload (append-only, so concurrent uploads can't lose each other).
+        # Replaces cases.photo_urls_json, which is no longer written.
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS case_photos (
+              id INTEGER PRIMARY KEY AUTOINCREMENT,
+              case_id TEXT NOT NULL,
+              url TEXT NOT NULL,
+              created_at TEXT NOT NULL
+            );
+            """
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_case_photos_case ON case_photos (case_id, id)")
+        # One-time move of the JSON arrays into case_photos; the flag commits with the rows
+        migrated = conn.execute("SELECT 1 FROM cases_meta WHERE key = 'photos_migrated'").fetchone()
+        if not migrated:
+            conn.execute(
+                """
+                INSERT INTO case_photos (case_id, url, created_at)
+                SELECT c.case_id, j.value, c.created_at
+                FROM cases c, json_each(c.photo_urls_json) j
+                WHERE json_valid(c.photo_urls_json) AND json_type(c.photo_urls_json) = 'array'
+                ORDER BY c.created_at, c.case_id, j.key
+                """
+            )
+            conn.execute("UPDATE cases SET photo_urls_json = NULL WHERE photo_urls_json IS NOT NULL")
+            conn.execute("INSERT INTO cases_meta (key, value) VALUES ('photos_migrated', 1)")
+
+        # Full-text index for GET /cases/search (app.cases.search)
+        init_search(conn)
+
+        # Background finalize jobs (POST /cases/{id}/finalize?mode=job)
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS finalize_jobs (
+              job_id TEXT PRIMARY KEY,
+              case_id TEXT NOT NULL,
+              status TEXT NOT NULL,          -- queued | running | succeeded | failed
+              created_at TEXT NOT NULL,
+              started_at TEXT,
+              finished_at TEXT,
+              attempts INTEGER NOT NULL DEFAULT 0,
+              result_json TEXT,
+              error TEXT,
+              status_code INTEGER
+            );
+            """
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_finalize_jobs_status ON finalize_jobs (status, created_at)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_finalize_jobs_case ON finalize_jobs (case_id, created_at)")
\ No newline at end of file
@@ -0,0 +1,53 @@
+"""
+In-process pub/sub for case changes, keyed by case_id.
+
+Repo writes that change what a customer sees (decision, status, final reply)
+call publish(); long-poll handlers waiting on that case are woken on their own
+event loop. Subscribers live in this process only: with several workers a waiter
+simply sleeps until its timeout and re-reads, which is still correct.
+"""
+from __future__ import annotations
+
+import asyncio
+import threading
+from typing import Dict, Set, Tuple
+
+_Waiter = Tuple[asyncio.AbstractEventLoop, asyncio.Event]
+
+_lock = threading.Lock()
+_waiters: Dict[str, Set[_Waiter]] = {}
+
+
+def subscribe(case_id: str) -> _Waiter:
+    """Register the calling coroutine's loop for case_id; pair with unsubscribe()."""
+    waiter = (asyncio.get_running_loop(), asyncio.Event())
+    with _lock:
+        _waiters.setdefault(case_id, set()).add(waiter)
+    return waiter
+
+
+def unsubscribe(case_id: str, waiter: _Waiter) -> None:
+    with _lock:
+        waiters = _waiters.get(case_id)
+        if waiters is None:
+            return
+        waiters.discard(waiter)
+        if not waiters:
+            del _waiters[case_id]
+
+
+def publish(case_id: str) -> None:
+    """Wake everyone waiting on case_id. Safe to call from any thread."""
+    with _lock:
+        waiters = list(_waiters.get(case_id, ()))
+    for loop, event in waiters:
+        try:
+            loop.call_soon_threadsafe(event.set)
+        except RuntimeError:
+            # loop already closed; its waiter is gone with it
+            pass
+
+
+def subscriber_count() -> int:
+    with _lock:
+        return sum(len(w) for w in _waiters.values())
@@ -0,0 +1,97 @@
+"""
+Bounded worker pool for finalize jobs.
+
+Jobs live in the finalize_jobs table; this process keeps an in-memory queue of
+job ids and FINALIZE_WORKERS threads that claim (queued -> running) and run them.
+On start, and whenever the workers sit idle for FINALIZE_JOB_LEASE_SECONDS, they
+pick up queued jobs and jobs that have been running longer than that lease (their
+process died), so nothing is lost across restarts. Several processes can share
+the database: a claim is atomic, and a job another process is still within its
+lease on is left to it. Finalize is idempotent on closed cases, so a job re-run
+after a crash just returns the stored outcome.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import queue
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+from dotenv import load_dotenv
+from fastapi import HTTPException
+
+from app.cases.repo import (
+    claim_finalize_job,
+    create_finalize_job,
+    finish_finalize_job,
+    requeue_interrupted_finalize_jobs,
+)
+
+load_dotenv()
+
+FINALIZE_WORKERS = int(os.getenv("FINALIZE_WORKERS", "2"))
+# A running job older than this is taken to have lost its worker; keep it well above the slowest finalize
+FINALIZE_JOB_LEASE_SECONDS = float(os.getenv("FINALIZE_JOB_LEASE_SECONDS", "600"))
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class FinalizeJobQueue:
+    def __init__(self, runner: Callable[[str], Dict[str, Any]], workers: int = FINALIZE_WORKERS):
+        self._runner = runner
+        self._workers = max(1, workers)
+        self._queue: "queue.Queue[Any]" = queue.Queue()
+        self._threads: List[threading.Thread] = []
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        with self._lock:
+            if self._threads:
+                return
+            self._requeue()
+            for i in range(self._workers):
+                t = threading.Thread(target=self._work, name=f"finalize-worker-{i}", daemon=True)
+                t.start()
+                self._threads.append(t)
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Let running jobs finish; anything still queued is resumed on next start()."""
+        with self._lock:
+            threads, self._threads = self._threads, []
+        for _ in threads:
+            self._queue.put(_STOP)
+        for t in threads:
+            t.join(timeout)
+
+    def submit(self, case_id: str) -> Dict[str, Any]:
+        job, created = create_finalize_job(case_id)
+        if created:
+            self._queue.put(job["job_id"])
+        return job
+
+    def _requeue(self) -> None:
+        for job_id in requeue_interrupted_finalize_jobs(FINALIZE_JOB_LEASE_SECONDS):
+            self._queue.put(job_id)
+
+    def _work(self) -> None:
+        while True:
+            try:
+                job_id = self._queue.get(timeout=FINALIZE_JOB_LEASE_SECONDS)
+            except queue.Empty:
+                self._requeue()
+                continue
+            if job_id is _STOP:
+                return
+            case_id = claim_finalize_job(job_id)
+            if case_id is None:
+                continue
+            try:
+                finish_finalize_job(job_id, result=self._runner(case_id))
+            except HTTPException as e:
+                finish_finalize_job(job_id, error=str(e.detail), status_code=e.status_code)
+            except Exception as e:
+                logger.exception("finalize job %s failed", job_id)
+                finish_finalize_job(job_id, error=f"{type(e).__name__}: {e}", status_code=500)
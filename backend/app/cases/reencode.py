@@ -0,0 +1,137 @@
+"""
+Re-encode legacy case rows into the compressed storage format (app.cases.codec)
+and report database size before/after.
+
+Safe to run while the app is serving: rows are rewritten in small batches, each
+its own short write transaction, with an optional pause between batches. Only
+plain-text values of the compressed columns are touched, and each update is
+conditional on the value being unchanged, so re-running is a no-op. Decoded
+content is identical, so case versions (ETags) don't change.
+
+The file only shrinks after VACUUM (freed pages are otherwise reused by later
+writes); --vacuum runs it at the end, which briefly locks the database.
+
+Run from backend/:
+  python -m app.cases.reencode --report-only
+  python -m app.cases.reencode --batch 200 --pause-ms 20 --vacuum
+"""
+from __future__ import annotations
+
+import argparse
+import time
+from typing import Any, Dict
+
+from app.cases.codec import COMPRESSED_COLUMNS, decode_json, encode_json, is_encoded
+from app.cases.db import get_conn, init_db
+from app.cases.search import rebuild
+
+_REPORT_COLUMNS = COMPRESSED_COLUMNS + ("ai_decision_json", "ai_audit_json")
+
+
+def size_report() -> Dict[str, Any]:
+    with get_conn() as conn:
+        page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+        page_count = conn.execute("PRAGMA page_count").fetchone()[0]
+        freelist = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        columns = {}
+        for col in _REPORT_COLUMNS:
+            row = conn.execute(
+                f"""
+                SELECT COALESCE(SUM(length(CAST({col} AS BLOB))), 0) AS bytes,
+                       SUM(typeof({col}) = 'blob') AS encoded_rows,
+                       COUNT({col}) AS rows
+                FROM cases
+                """
+            ).fetchone()
+            columns[col] = {"bytes": row["bytes"], "encoded_rows": row["encoded_rows"] or 0, "rows": row["rows"]}
+    return {
+        "file_bytes": page_size * page_count,
+        "free_bytes": page_size * freelist,
+        "columns": columns,
+    }
+
+
+def reencode(batch_size: int = 200, pause_s: float = 0.0) -> Dict[str, int]:
+    """Rewrite plain-text values of COMPRESSED_COLUMNS that would now be encoded."""
+    stats = {"rows_scanned": 0, "values_rewritten": 0, "bytes_before": 0, "bytes_after": 0}
+    text_filter = " OR ".join(f"typeof({c}) = 'text'" for c in COMPRESSED_COLUMNS)
+    last_rowid = 0
+    while True:
+        with get_conn() as conn:
+            rows = conn.execute(
+                f"""
+                SELECT rowid, {", ".join(COMPRESSED_COLUMNS)}
+                FROM cases
+                WHERE rowid > ? AND ({text_filter})
+                ORDER BY rowid
+                LIMIT ?
+                """,
+                (last_rowid, batch_size),
+            ).fetchall()
+            if not rows:
+                break
+            for row in rows:
+                stats["rows_scanned"] += 1
+                for col in COMPRESSED_COLUMNS:
+                    raw = row[col]
+                    if not raw or is_encoded(raw):
+                        continue
+                    new = encode_json(decode_json(raw))
+                    if not is_encoded(new):
+                        continue  # below the size threshold, stays text
+                    cur = conn.execute(
+                        f"UPDATE cases SET {col} = ? WHERE rowid = ? AND {col} = ?", (new, row["rowid"], raw)
+                    )
+                    if cur.rowcount:
+                        stats["values_rewritten"] += 1
+                        stats["bytes_before"] += len(raw.encode("utf-8"))
+                        stats["bytes_after"] += len(new)
+            last_rowid = rows[-1]["rowid"]
+        if pause_s:
+            time.sleep(pause_s)
+    return stats
+
+
+def vacuum() -> None:
+    with get_conn() as conn:
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    # VACUUM can't run inside a transaction; the with-block above has committed
+    get_conn().execute("VACUUM")
+    # VACUUM may renumber case rowids, which the search index is keyed on
+    with get_conn() as conn:
+        rebuild(conn)
+
+
+def _print_report(label: str, report: Dict[str, Any]) -> None:
+    print(f"{label}: file {report['file_bytes'] / 1024:,.1f} KiB (free {report['free_bytes'] / 1024:,.1f} KiB)")
+    for col, c in report["columns"].items():
+        print(f"  {col:<24} {c['bytes'] / 1024:>10,.1f} KiB  {c['encoded_rows']}/{c['rows']} rows encoded")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Re-encode case JSON columns into the compressed format.")
+    parser.add_argument("--batch", type=int, default=200, help="rows per write transaction")
+    parser.add_argument("--pause-ms", type=float, default=0.0, help="sleep between batches")
+    parser.add_argument("--vacuum", action="store_true", help="VACUUM afterwards so the file shrinks")
+    parser.add_argument("--report-only", action="store_true")
+    args = parser.parse_args()
+
+    init_db()
+    before = size_report()
+    _print_report("Before", before)
+    if args.report_only:
+        return
+
+    t0 = time.perf_counter()
+    stats = reencode(args.batch, args.pause_ms / 1000)
+    print(
+        f"Re-encoded {stats['values_rewritten']} value(s) in {stats['rows_scanned']} row(s) "
+        f"in {time.perf_counter() - t0:.1f}s: {stats['bytes_before'] / 1024:,.1f} KiB -> {stats['bytes_after'] / 1024:,.1f} KiB"
+    )
+    if args.vacuum:
+        vacuum()
+    _print_report("After", size_report())
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,48 @@
 import json
+import sqlite3
 import uuid
-from datetime import datetime, timezone
-from typing import Any, Dict, List, Optional
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
 
-from app.cases.db import get_conn
+from app.cases import events
+from app.cases.codec import COMPRESSED_COLUMNS, decode_json, encode_json
+from app.cases.db import get_archive_conn, get_conn
+from app.cases.search import SEARCH_RANK_WINDOW, SEARCH_WEIGHTS, sku_text, with_status
 
 
 def _now_iso() -> str:
     return datetime.now(timezone.utc).isoformat()
 
 
+def _bump_collection_version(conn) -> None:
+    # Same transaction as the case write, so list ETags never lag behind a change
+    conn.execute("UPDATE cases_meta SET value = value + 1 WHERE key = 'collection_version'")
+
+
+def get_collection_version() -> int:
+    with get_conn() as conn:
+        row = conn.execute("SELECT value FROM cases_meta WHERE key = 'collection_version'").fetchone()
+    return int(row["value"]) if row else 0
+
+
+def _case_dbs() -> Iterator[Tuple[sqlite3.Connection, bool]]:
+    """(conn, archived) to look a case up in: the hot DB, then the archive if there is one."""
+    yield get_conn(), False
+    archive = get_archive_conn()
+    if archive is not None:
+        yield archive, True
+
+
+def get_case_version(case_id: str) -> Optional[int]:
+    """Current version of one case (None if it doesn't exist); cheap enough to run before every GET."""
+    for conn, _ in _case_dbs():
+        with conn:
+            row = conn.execute("SELECT version FROM cases WHERE case_id = ?", (case_id,)).fetchone()
+        if row:
+            return int(row["version"])
+    return None
+
+
 def create_case(payload: Dict[str, Any]) -> str:
     case_id = str(uuid.uuid4())
     with get_conn() as conn:
@@ -18,8 +51,7 @@ def create_case(payload: Dict[str, Any]) -> str:
             INSERT INTO cases (
                             case_id, session_id, order_id, reason, customer_message, wants_store_credit,
               photos_required, status, created_at,
-              ai_decision_json, ai_audit_json, policy_citations_json, order_facts_json,
-              photo_urls_json
+              ai_decision_json, ai_audit_json, policy_citations_json, order_facts_json, skus
             )
                         VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
             """,
@@ -35,94 +67,267 @@ def create_case(payload: Dict[str, Any]) -> str:
                 _now_iso(),
                 json.dumps(payload.get("ai_decision") or {}),
                 json.dumps(payload.get("ai_audit") or {}),
-                json.dumps(payload.get("policy_citations") or []),
-                json.dumps(payload.get("order_facts") or {}),
-                json.dumps(payload.get("photo_urls") or []),
+                encode_json(payload.get("policy_citations") or []),
+                encode_json(payload.get("order_facts") or {}),
+                sku_text(payload.get("order_facts")),
             ),
         )
+        now = _now_iso()
+        conn.executemany(
+            "INSERT INTO case_photos (case_id, url, created_at) VALUES (?, ?, ?)",
+            [(case_id, url, now) for url in payload.get("photo_urls") or []],
+        )
+        _bump_collection_version(conn)
     return case_id
 
 
-def get_active_case_for_session(session_id: str) -> Optional[Dict[str, Any]]:
-    with get_conn() as conn:
-        row = conn.execute(
-            """
-            SELECT case_id
-            FROM cases
-            WHERE session_id = ? AND status != 'closed'
-            ORDER BY created_at DESC
-            LIMIT 1
-            """,
-            (session_id,),
-        ).fetchone()
-        if not row:
-            return None
-        return get_case(row["case_id"])
+# Columns callers may project; photo_urls_json comes from case_photos
+CASE_COLUMNS = (
+    "case_id", "session_id", "order_id", "reason", "customer_message", "wants_store_credit",
+    "photos_required", "status", "created_at", "ai_decision_json", "ai_audit_json",
+    "policy_citations_json", "order_facts_json", "photo_urls_json", "human_decision",
+    "human_notes", "reviewed_at", "final_customer_reply", "next_actions_json", "version",
+)
+_JSON_COLUMNS = ("ai_decision_json", "ai_audit_json", "policy_citations_json", "order_facts_json", "next_actions_json")
 
 
-def get_closed_case_for_session(session_id: str) -> Optional[Dict[str, Any]]:
-    """Get the most recent closed case for a session."""
-    with get_conn() as conn:
-        row = conn.execute(
-            """
-            SELECT case_id
-            FROM cases
-            WHERE session_id = ? AND status = 'closed'
-            ORDER BY created_at DESC
-            LIMIT 1
-            """,
-            (session_id,),
-        ).fetchone()
-        if not row:
-            return None
-        return get_case(row["case_id"])
+def _select_list(columns: Optional[Sequence[str]]) -> str:
+    if columns is None:
+        return "*"
+    unknown = set(columns) - set(CASE_COLUMNS)
+    if unknown:
+        raise ValueError(f"Unknown case columns: {sorted(unknown)}")
+    # case_id is always read (photos are looked up by it); photo_urls_json isn't a real column
+    wanted = ["case_id"] + [c for c in columns if c not in ("case_id", "photo_urls_json")]
+    return ", ".join(dict.fromkeys(wanted))
+
 
+def get_session_case(session_id: str, columns: Optional[Sequence[str]] = None) -> Optional[Dict[str, Any]]:
+    """
+    The case that decides a chat session's state: its most recent open case if
+    it has one, otherwise its most recent closed case. One read on
+    idx_cases_session_created (a session has a handful of cases at most).
+    Open cases are never archived, so the archive is only read when the hot DB
+    has none for the session; a case found there carries `"archived": True`.
+    `columns` as for get_case().
+    """
+    sql = f"""
+        SELECT {_select_list(columns)}
+        FROM cases
+        WHERE session_id = ?
+        ORDER BY status = 'closed', created_at DESC
+        LIMIT 1
+    """
+    for conn, archived in _case_dbs():
+        with conn:
+            row = conn.execute(sql, (session_id,)).fetchone()
+            if row:
+                case = _case_row(conn, row, columns)
+                if archived:
+                    case["archived"] = True
+                return case
+    return None
+
+
+def get_case(case_id: str, columns: Optional[Sequence[str]] = None) -> Optional[Dict[str, Any]]:
+    """
+    The case with its JSON columns decoded. Pass `columns` (from CASE_COLUMNS) to
+    read only those: JSON columns that aren't asked for are neither read nor
+    decoded, and photos are only loaded for "photo_urls_json".
+    Archived cases are read from the archive DB and carry `"archived": True`.
+    """
+    sql = f"SELECT {_select_list(columns)} FROM cases WHERE case_id = ?"
+    for conn, archived in _case_dbs():
+        with conn:
+            row = conn.execute(sql, (case_id,)).fetchone()
+            if row:
+                case = _case_row(conn, row, columns)
+                if archived:
+                    case["archived"] = True
+                return case
+    return None
+
+
+def _case_row(conn, row, columns: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+    d = dict(row)
+    for k in _JSON_COLUMNS:
+        if k in d:
+            d[k] = decode_json(d[k]) if k in COMPRESSED_COLUMNS else (json.loads(d[k]) if d[k] else None)
+    if columns is None or "photo_urls_json" in columns:
+        # Same key and shape as when photos were a JSON column
+        d["photo_urls_json"] = _photo_urls(conn, d["case_id"])
+    return d
+
+
+def _photo_urls(conn, case_id: str) -> List[str]:
+    rows = conn.execute("SELECT url FROM case_photos WHERE case_id = ? ORDER BY id", (case_id,)).fetchall()
+    return [r["url"] for r in rows]
+
+
+def get_case_public(case_id: str) -> Optional[Dict[str, Any]]:
+    """Customer-facing fields only (one JSON decode instead of get_case's six)."""
+    for conn, _ in _case_dbs():
+        with conn:
+            row = conn.execute(
+                "SELECT case_id, status, final_customer_reply, next_actions_json FROM cases WHERE case_id = ?",
+                (case_id,),
+            ).fetchone()
+        if row:
+            break
+    else:
+        return None
+    d = dict(row)
+    d["next_actions_json"] = json.loads(d["next_actions_json"]) if d.get("next_actions_json") else None
+    return d
+
+
+def list_cases(
+    status: Optional[str] = None,
+    *,
+    order_id: Optional[str] = None,
+    created_from: Optional[str] = None,
+    created_to: Optional[str] = None,
+    after: Optional[Tuple[str, str]] = None,
+    limit: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Newest first. `after` is the (created_at, case_id) of the last row already
+    seen (keyset pagination); `created_from` is inclusive, `created_to` exclusive.
+    No limit returns every matching case.
+    """
+    where: List[str] = []
+    params: List[Any] = []
+    if status:
+        where.append("status = ?")
+        params.append(status)
+    if order_id:
+        where.append("order_id = ?")
+        params.append(order_id)
+    if created_from:
+        where.append("created_at >= ?")
+        params.append(created_from)
+    if created_to:
+        where.append("created_at < ?")
+        params.append(created_to)
+    if after:
+        where.append("(created_at, case_id) < (?, ?)")
+        params.extend(after)
+
+    sql = "SELECT case_id, order_id, reason, status, created_at, photos_required FROM cases"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    sql += " ORDER BY created_at DESC, case_id DESC"
+    if limit is not None:
+        sql += " LIMIT ?"
+        params.append(limit)
 
-def get_case(case_id: str) -> Optional[Dict[str, Any]]:
     with get_conn() as conn:
-        row = conn.execute("SELECT * FROM cases WHERE case_id = ?", (case_id,)).fetchone()
-        if not row:
-            return None
-        d = dict(row)
-        for k in [
-            "ai_decision_json",
-            "ai_audit_json",
-            "policy_citations_json",
-            "order_facts_json",
-            "photo_urls_json",
-            "next_actions_json",
-        ]:
-            d[k] = json.loads(d[k]) if d.get(k) else None
-        return d
-
-
-def list_cases(status: Optional[str] = None) -> List[Dict[str, Any]]:
+        rows = conn.execute(sql, params).fetchall()
+        return [dict(r) for r in rows]
+
+
+def search_cases(
+    match: str,
+    *,
+    status: Optional[str] = None,
+    sort: str = "relevance",
+    offset: int = 0,
+    after: Optional[Tuple[str, str]] = None,
+    limit: int = 20,
+) -> Tuple[List[Dict[str, Any]], bool]:
+    """
+    Cases matching an FTS5 query (build it with search.fts_query), with their
+    bm25 `score` (lower is better), and whether the ranking was truncated.
+    sort="relevance" ranks the newest SEARCH_RANK_WINDOW matches (with
+    `status`, if given) and pages by `offset`; truncated means older matches
+    exist that weren't ranked. sort="newest" sees every match and pages by
+    keyset: `after` is the (created_at, case_id) of the last row already seen.
+    """
+    match = with_status(match, status)
+    weights = ", ".join(str(w) for w in SEARCH_WEIGHTS)
+    truncated = False
     with get_conn() as conn:
-        if status:
-            rows = conn.execute(
-                "SELECT case_id, order_id, reason, status, created_at, photos_required FROM cases WHERE status = ? ORDER BY created_at DESC",
-                (status,),
+        if sort == "newest":
+            where = ["cases_fts MATCH ?"]
+            params: List[Any] = [match]
+            if after is not None:
+                where.append("cases_fts.rowid < ?")
+                params.append(_rowid_bound(conn, after))
+            page = conn.execute(
+                f"""
+                SELECT cases_fts.rowid, bm25(cases_fts, {weights}) FROM cases_fts
+                WHERE {" AND ".join(where)}
+                ORDER BY cases_fts.rowid DESC LIMIT ?
+                """,
+                [*params, limit],
             ).fetchall()
         else:
-            rows = conn.execute(
-                "SELECT case_id, order_id, reason, status, created_at, photos_required FROM cases ORDER BY created_at DESC"
-            ).fetchall()
-        return [dict(r) for r in rows]
+            # One pass over the window, scored once; sorting and paging a few
+            # thousand (rowid, score) pairs here is cheaper than asking FTS5 again
+            sql = f"SELECT rowid, bm25(cases_fts, {weights}) FROM cases_fts WHERE cases_fts MATCH ? ORDER BY rowid DESC"
+            params = [match]
+            if SEARCH_RANK_WINDOW > 0:
+                sql += " LIMIT ?"
+                params.append(SEARCH_RANK_WINDOW + 1)
+            ranked = conn.execute(sql, params).fetchall()
+            if SEARCH_RANK_WINDOW > 0 and len(ranked) > SEARCH_RANK_WINDOW:
+                ranked, truncated = ranked[:SEARCH_RANK_WINDOW], True
+            ranked.sort(key=lambda r: (r[1], -r[0]))
+            page = ranked[offset : offset + limit]
+        # Case columns for just the page
+        rows = conn.execute(
+            f"""
+            SELECT rowid, case_id, order_id, reason, customer_message, status, created_at, photos_required
+            FROM cases WHERE rowid IN ({", ".join("?" * len(page))})
+            """,
+            [rowid for rowid, _ in page],
+        ).fetchall()
+    by_rowid = {r["rowid"]: r for r in rows}
+    results = []
+    for rowid, score in page:
+        row = dict(by_rowid[rowid])
+        del row["rowid"]
+        row["score"] = score
+        results.append(row)
+    return results, truncated
+
+
+def _rowid_bound(conn, after: Tuple[str, str]) -> int:
+    """
+    Exclusive rowid bound for rows older than `after`. Cursors carry
+    (created_at, case_id) rather than a rowid because VACUUM renumbers rowids
+    (keeping their order); if that case has since been archived, the next
+    older case still in the table stands in for it.
+    """
+    row = conn.execute("SELECT rowid FROM cases WHERE case_id = ?", (after[1],)).fetchone()
+    if row:
+        return row[0]
+    row = conn.execute(
+        "SELECT rowid FROM cases WHERE (created_at, case_id) < (?, ?) ORDER BY created_at DESC, case_id DESC LIMIT 1",
+        after,
+    ).fetchone()
+    return row[0] + 1 if row else 0
 
 
 def add_photo(case_id: str, photo_url: str) -> None:
-    case = get_case(case_id)
-    if not case:
-        raise KeyError("case_not_found")
-    photos = case.get("photo_urls_json") or []
-    photos.append(photo_url)
+    """Append one photo: a single insert, safe to run concurrently for the same case."""
     with get_conn() as conn:
-        conn.execute("UPDATE cases SET photo_urls_json = ? WHERE case_id = ?", (json.dumps(photos), case_id))
+        # Version bump first: it takes the write lock and tells us whether the case exists
+        cur = conn.execute("UPDATE cases SET version = version + 1 WHERE case_id = ?", (case_id,))
+        if not cur.rowcount:
+            raise KeyError("case_not_found")
+        conn.execute(
+            "INSERT INTO case_photos (case_id, url, created_at) VALUES (?, ?, ?)",
+            (case_id, photo_url, _now_iso()),
+        )
+        _bump_collection_version(conn)
 
 
 def update_status(case_id: str, status: str) -> None:
     with get_conn() as conn:
-        conn.execute("UPDATE cases SET status = ? WHERE case_id = ?", (status, case_id))
+        conn.execute("UPDATE cases SET status = ?, version = version + 1 WHERE case_id = ?", (status, case_id))
+        _bump_collection_version(conn)
+    events.publish(case_id)
 
 
 def set_human_decision(case_id: str, decision: str, notes: str | None) -> None:
@@ -130,23 +335,239 @@ def set_human_decision(case_id: str, decision: str, notes: str | None) -> None:
         conn.execute(
             """
             UPDATE cases
-            SET human_decision = ?, human_notes = ?, reviewed_at = ?, status = ?
+            SET human_decision = ?, human_notes = ?, reviewed_at = ?, status = ?, version = version + 1
             WHERE case_id = ?
             """,
             (decision, notes, _now_iso(), decision, case_id),
         )
+        _bump_collection_version(conn)
+    events.publish(case_id)
+
+
+def set_human_decisions(case_ids: List[str], decision: str, notes: str | None) -> Dict[str, str]:
+    """
+    Apply one reviewer decision to many cases in a single write transaction.
+    Returns {case_id: "updated" | "not_found" | "closed" | "archived"}; closed
+    and archived cases are left alone so a bulk cleanup can't reopen something
+    the customer already got.
+    """
+    outcome: Dict[str, str] = {}
+    reviewed_at = _now_iso()
+    with get_conn() as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        for case_id in dict.fromkeys(case_ids):
+            cur = conn.execute(
+                """
+                UPDATE cases
+                SET human_decision = ?, human_notes = ?, reviewed_at = ?, status = ?, version = version + 1
+                WHERE case_id = ? AND status != 'closed'
+                """,
+                (decision, notes, reviewed_at, decision, case_id),
+            )
+            if cur.rowcount:
+                outcome[case_id] = "updated"
+            else:
+                exists = conn.execute("SELECT 1 FROM cases WHERE case_id = ?", (case_id,)).fetchone()
+                outcome[case_id] = "closed" if exists else "not_found"
+        if "updated" in outcome.values():
+            _bump_collection_version(conn)
+    missing = [case_id for case_id, result in outcome.items() if result == "not_found"]
+    archive = get_archive_conn() if missing else None
+    if archive is not None:
+        with archive:
+            marks = ", ".join("?" * len(missing))
+            for row in archive.execute(f"SELECT case_id FROM cases WHERE case_id IN ({marks})", missing):
+                outcome[row["case_id"]] = "archived"
+    for case_id, result in outcome.items():
+        if result == "updated":
+            events.publish(case_id)
+    return outcome
 
 
-def set_final_outcome(case_id: str, reply: str, next_actions: List[Dict[str, Any]]) -> None:
+def set_final_outcome(
+    case_id: str,
+    reply: str,
+    next_actions: List[Dict[str, Any]],
+    finalize_audit: Optional[Dict[str, Any]] = None,
+) -> None:
     with get_conn() as conn:
         conn.execute(
             """
             UPDATE cases
-            SET final_customer_reply = ?, next_actions_json = ?, status = ?
+            SET final_customer_reply = ?, next_actions_json = ?, status = ?, version = version + 1
             WHERE case_id = ?
             """,
             (reply, json.dumps(next_actions), "closed", case_id),
         )
+        _bump_collection_version(conn)
+        if finalize_audit is not None:
+            # Finalize ledger sits next to the intake one under "finalize"
+            conn.execute(
+                """
+                UPDATE cases
+                SET ai_audit_json = json_set(COALESCE(NULLIF(ai_audit_json, ''), '{}'), '$.finalize', json(?))
+                WHERE case_id = ?
+                """,
+                (json.dumps(finalize_audit), case_id),
+            )
+    events.publish(case_id)
+
+
+def cost_report(since: Optional[str] = None, until: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Cost/latency per AI resolution type, from the ledgers in ai_audit_json
+    (`totals` for the intake run, `finalize.totals` for the finalize run).
+    """
+    where = ["ai_audit_json IS NOT NULL", "json_valid(ai_audit_json)"]
+    params: List[Any] = []
+    if since:
+        where.append("created_at >= ?")
+        params.append(since)
+    if until:
+        where.append("created_at < ?")
+        params.append(until)
+
+    with get_conn() as conn:
+        rows = conn.execute(
+            f"""
+            SELECT
+              COALESCE(json_extract(ai_decision_json, '$.resolution_type'), 'unknown') AS resolution_type,
+              COUNT(*) AS cases,
+              SUM(json_extract(ai_audit_json, '$.totals') IS NOT NULL) AS cases_with_ledger,
+              SUM(json_extract(ai_audit_json, '$.finalize.totals') IS NOT NULL) AS finalized_with_ledger,
+              ROUND(SUM(COALESCE(json_extract(ai_audit_json, '$.totals.cost_usd'), 0)), 6) AS intake_cost_usd,
+              ROUND(SUM(COALESCE(json_extract(ai_audit_json, '$.finalize.totals.cost_usd'), 0)), 6) AS finalize_cost_usd,
+              SUM(COALESCE(json_extract(ai_audit_json, '$.totals.llm_calls'), 0)
+                + COALESCE(json_extract(ai_audit_json, '$.finalize.totals.llm_calls'), 0)) AS llm_calls,
+              SUM(COALESCE(json_extract(ai_audit_json, '$.totals.input_tokens'), 0)
+                + COALESCE(json_extract(ai_audit_json, '$.finalize.totals.input_tokens'), 0)) AS input_tokens,
+              SUM(COALESCE(json_extract(ai_audit_json, '$.totals.output_tokens'), 0)
+                + COALESCE(json_extract(ai_audit_json, '$.finalize.totals.output_tokens'), 0)) AS output_tokens,
+              ROUND(AVG(json_extract(ai_audit_json, '$.totals.wall_ms')), 3) AS avg_intake_ms,
+              ROUND(MAX(json_extract(ai_audit_json, '$.totals.wall_ms')), 3) AS max_intake_ms,
+              ROUND(AVG(json_extract(ai_audit_json, '$.totals.llm_ms')), 3) AS avg_intake_llm_ms,
+              ROUND(AVG(json_extract(ai_audit_json, '$.totals.retrieval_ms')), 3) AS avg_retrieval_ms,
+              ROUND(AVG(json_extract(ai_audit_json, '$.finalize.totals.wall_ms')), 3) AS avg_finalize_ms,
+              SUM(COALESCE(json_extract(ai_audit_json, '$.totals.retries'), 0)
+                + COALESCE(json_extract(ai_audit_json, '$.finalize.totals.retries'), 0)) AS retries
+            FROM cases
+            WHERE {" AND ".join(where)}
+            GROUP BY 1
+            ORDER BY intake_cost_usd + finalize_cost_usd DESC
+            """,
+            params,
+        ).fetchall()
+
+    report = []
+    for r in rows:
+        d = dict(r)
+        d["total_cost_usd"] = round((d["intake_cost_usd"] or 0) + (d["finalize_cost_usd"] or 0), 6)
+        d["avg_cost_usd"] = round(d["total_cost_usd"] / d["cases"], 6) if d["cases"] else 0.0
+        report.append(d)
+    return report
+
+
+# --- finalize jobs ---------------------------------------------------------------
+
+def _job_row(row) -> Dict[str, Any]:
+    d = dict(row)
+    d["result"] = json.loads(d.pop("result_json")) if d.get("result_json") else None
+    return d
+
+
+def create_finalize_job(case_id: str) -> Tuple[Dict[str, Any], bool]:
+    """
+    Queue a finalize job, unless one is already queued/running for the case.
+    Returns (job, created); check and insert happen in one write transaction.
+    """
+    with get_conn() as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        row = conn.execute(
+            """
+            SELECT * FROM finalize_jobs
+            WHERE case_id = ? AND status IN ('queued', 'running')
+            ORDER BY created_at DESC LIMIT 1
+            """,
+            (case_id,),
+        ).fetchone()
+        if row:
+            return _job_row(row), False
+        job_id = str(uuid.uuid4())
+        conn.execute(
+            "INSERT INTO finalize_jobs (job_id, case_id, status, created_at) VALUES (?, ?, 'queued', ?)",
+            (job_id, case_id, _now_iso()),
+        )
+        row = conn.execute("SELECT * FROM finalize_jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return _job_row(row), True
+
+
+def get_finalize_job(job_id: str) -> Optional[Dict[str, Any]]:
+    with get_conn() as conn:
+        row = conn.execute("SELECT * FROM finalize_jobs WHERE job_id = ?", (job_id,)).fetchone()
+    return _job_row(row) if row else None
+
+
+def claim_finalize_job(job_id: str) -> Optional[str]:
+    """Move a queued job to running; returns its case_id, or None if someone else got it."""
+    with get_conn() as conn:
+        cur = conn.execute(
+            """
+            UPDATE finalize_jobs
+            SET status = 'running', started_at = ?, attempts = attempts + 1
+            WHERE job_id = ? AND status = 'queued'
+            """,
+            (_now_iso(), job_id),
+        )
+        if cur.rowcount != 1:
+            return None
+        row = conn.execute("SELECT case_id FROM finalize_jobs WHERE job_id = ?", (job_id,)).fetchone()
+    return row["case_id"]
+
+
+def finish_finalize_job(
+    job_id: str,
+    *,
+    result: Optional[Dict[str, Any]] = None,
+    error: Optional[str] = None,
+    status_code: int = 200,
+) -> None:
+    with get_conn() as conn:
+        conn.execute(
+            """
+            UPDATE finalize_jobs
+            SET status = ?, finished_at = ?, result_json = ?, error = ?, status_code = ?
+            WHERE job_id = ?
+            """,
+            (
+                "failed" if error else "succeeded",
+                _now_iso(),
+                json.dumps(result) if result is not None else None,
+                error,
+                status_code,
+                job_id,
+            ),
+        )
+
+
+def requeue_interrupted_finalize_jobs(lease_seconds: float) -> List[str]:
+    """
+    Jobs 'running' for longer than lease_seconds (their worker died with its
+    process) go back to 'queued'. A younger running job may belong to another
+    live process on the same database, so it's left alone. Returns every
+    queued job id, oldest first.
+    """
+    stale_before = (datetime.now(timezone.utc) - timedelta(seconds=lease_seconds)).isoformat()
+    with get_conn() as conn:
+        conn.execute(
+            "UPDATE finalize_jobs SET status = 'queued' WHERE status = 'running' AND started_at < ?",
+            (stale_before,),
+        )
+        rows = conn.execute(
+            "SELECT job_id FROM finalize_jobs WHERE status = 'queued' ORDER BY created_at"
+        ).fetchall()
+    return [r["job_id"] for r in rows]
+
+
 def set_final_reply(case_id: str, reply: str) -> None:
     # Backward-compatible helper
     set_final_outcome(case_id, reply, next_actions=[])
\ No newline at end of file
@@ -0,0 +1,129 @@
+"""
+Full-text search over cases (GET /cases/search).
+
+cases_fts is an FTS5 index over reason, customer_message, human_notes and the
+order's SKUs, plus the status so a status filter is part of the MATCH (no join
+per match). It's an external-content table: the text lives only in `cases`
+(SKUs in cases.skus, written by create_case because order_facts_json may be
+compressed), and triggers on `cases` keep the index in step with every insert,
+delete and edit of those columns. Version bumps don't touch it. Prefix indexes
+for 2 and 3 characters let a short "zip*" read one doclist instead of merging
+every term it expands to.
+
+The index is keyed by cases.rowid, which VACUUM may renumber, so anything that
+vacuums the database calls rebuild() afterwards.
+"""
+from __future__ import annotations
+
+import os
+import re
+import sqlite3
+from typing import Any, Dict, Optional
+
+from app.cases.codec import decode_json
+
+# bm25 weights, in index column order: a SKU or reason hit outranks a mention in the message;
+# status is only ever a filter
+SEARCH_WEIGHTS = (2.0, 1.0, 1.0, 4.0, 0.0)
+_COLUMNS = "reason, customer_message, human_notes, skus, status"
+# Columns reviewer queries search (not status)
+_TEXT_COLUMNS = "{reason customer_message human_notes skus}"
+# Relevance ranking only scores the newest N matches (0 = all); past that the
+# results say so (`truncated`). bm25 has to score every match before sorting,
+# so a common word over a million cases would otherwise cost a full doclist
+# scan per page.
+SEARCH_RANK_WINDOW = int(os.getenv("SEARCH_RANK_WINDOW", "2000"))
+
+_TRIGGERS = {
+    "cases_fts_ai": f"""
+        CREATE TRIGGER IF NOT EXISTS cases_fts_ai AFTER INSERT ON cases BEGIN
+          INSERT INTO cases_fts (rowid, {_COLUMNS})
+          VALUES (new.rowid, new.reason, new.customer_message, new.human_notes, new.skus, new.status);
+        END
+    """,
+    "cases_fts_ad": f"""
+        CREATE TRIGGER IF NOT EXISTS cases_fts_ad AFTER DELETE ON cases BEGIN
+          INSERT INTO cases_fts (cases_fts, rowid, {_COLUMNS})
+          VALUES ('delete', old.rowid, old.reason, old.customer_message, old.human_notes, old.skus, old.status);
+        END
+    """,
+    "cases_fts_au": f"""
+        CREATE TRIGGER IF NOT EXISTS cases_fts_au
+        AFTER UPDATE OF {_COLUMNS} ON cases BEGIN
+          INSERT INTO cases_fts (cases_fts, rowid, {_COLUMNS})
+          VALUES ('delete', old.rowid, old.reason, old.customer_message, old.human_notes, old.skus, old.status);
+          INSERT INTO cases_fts (rowid, {_COLUMNS})
+          VALUES (new.rowid, new.reason, new.customer_message, new.human_notes, new.skus, new.status);
+        END
+    """,
+}
+
+
+def sku_text(order_facts: Optional[Dict[str, Any]]) -> Optional[str]:
+    """The order's SKUs as one space-separated string (what cases.skus stores)."""
+    skus = [str(item["sku"]) for item in (order_facts or {}).get("items") or [] if item.get("sku")]
+    return " ".join(dict.fromkeys(skus)) or None
+
+
+def init_search(conn: sqlite3.Connection) -> None:
+    """Create the index and triggers; the first run backfills cases.skus and indexes existing rows."""
+    try:
+        conn.execute("ALTER TABLE cases ADD COLUMN skus TEXT")
+    except sqlite3.OperationalError:
+        pass
+    indexed = conn.execute("SELECT 1 FROM cases_meta WHERE key = 'search_indexed'").fetchone()
+    if not indexed:
+        # Triggers off while backfilling, or the skus updates would 'delete' rows never indexed
+        for name in _TRIGGERS:
+            conn.execute(f"DROP TRIGGER IF EXISTS {name}")
+        rows = conn.execute("SELECT rowid, order_facts_json FROM cases WHERE skus IS NULL").fetchall()
+        conn.executemany(
+            "UPDATE cases SET skus = ? WHERE rowid = ?",
+            [(sku_text(decode_json(r["order_facts_json"])), r["rowid"]) for r in rows],
+        )
+        conn.execute(
+            f"""
+            CREATE VIRTUAL TABLE IF NOT EXISTS cases_fts USING fts5(
+              {_COLUMNS},
+              content = 'cases', content_rowid = 'rowid',
+              tokenize = "porter unicode61 remove_diacritics 2 tokenchars '_'",
+              prefix = '2 3'
+            )
+            """
+        )
+        rebuild(conn)
+        conn.execute("INSERT INTO cases_meta (key, value) VALUES ('search_indexed', 1)")
+    for sql in _TRIGGERS.values():
+        conn.execute(sql)
+
+
+def rebuild(conn: sqlite3.Connection) -> None:
+    """Re-index every case from the cases table."""
+    conn.execute("INSERT INTO cases_fts (cases_fts) VALUES ('rebuild')")
+
+
+def _quote(word: str) -> str:
+    return '"' + word.replace('"', '""') + '"'
+
+
+def fts_query(text: str) -> Optional[str]:
+    """
+    Reviewer input -> FTS5 query over the text columns: every word must match
+    (AND), each quoted so punctuation and FTS syntax are taken literally
+    ("ACC-BAG-930" matches that SKU as a phrase). A trailing * keeps prefix
+    matching ("zip*"). None if nothing searchable is left.
+    """
+    terms = []
+    for word in text.split():
+        prefix = word.endswith("*")
+        word = word.rstrip("*")
+        if not re.search(r"\w", word):
+            continue
+        terms.append(_quote(word) + ("*" if prefix else ""))
+    return f"{_TEXT_COLUMNS} : ({' '.join(terms)})" if terms else None
+
+
+def with_status(match: str, status: Optional[str]) -> str:
+    """Narrow an fts_query() result to one case status (inside the index, so still no join)."""
+    return f"{match} AND status : {_quote(status)}" if status else match
+
@@ -3,16 +3,17 @@ import sqlite3
 from pathlib import Path
 from dotenv import load_dotenv
 
+from app.core.sqlite import SQLiteDatabase
+
 load_dotenv()
 
 DB_PATH = Path(os.getenv("DB_PATH", "app/storage/cases.db"))
+_db = SQLiteDatabase(DB_PATH, "chat")
 
 
 def get_conn() -> sqlite3.Connection:
-    DB_PATH.parent.mkdir(parents=True, exist_ok=True)
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    return conn
+    """This thread's persistent connection (see app.core.sqlite)."""
+    return _db.connection()
 
 
 def init_chat_db() -> None:
@@ -37,4 +38,6 @@ def init_chat_db() -> None:
               FOREIGN KEY (session_id) REFERENCES chat_sessions(session_id)
             );
             """
-        )
\ No newline at end of file
+        )
+        # Recent history per session (get_messages)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_chat_messages_session ON chat_messages (session_id, id)")
\ No newline at end of file
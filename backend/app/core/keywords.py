@@ -0,0 +1,259 @@
+"""
+Shared keyword matcher for the text heuristics (intake, decide, retrieval routing, chat).
+
+All phrase sets are compiled once into a single trie-shaped regex. One scan over a
+message returns every category with at least one phrase occurring in it, with the
+same semantics as the old `any(k in text for k in phrases)` checks (case-insensitive
+substring match, no word boundaries).
+"""
+from __future__ import annotations
+
+import re
+from functools import lru_cache
+from typing import Dict, FrozenSet, Iterable, List, Mapping
+
+from app.core.metrics import register_lru_cache
+
+
+# --- decide.py intent flags ---------------------------------------------------
+
+PREFERENCE_KEYWORDS = ["doesn't fit", "does not fit", "changed mind", "wrong size", "buyer remorse", "color looked"]
+
+# Shipping/lost-in-transit family
+SHIPPING_KEYWORDS = ["lost", "not arrived", "missing", "label created", "in transit", "delivered but missing"]
+
+# Warranty/defect family (expanded)
+WARRANTY_KEYWORDS = [
+    "warranty",
+    "defect",
+    "manufacturing",
+    "quality issue",
+    "quality",
+    "fading",
+    "color fades",
+    "colour fades",
+    "color faded",
+    "patch",
+    "hole",
+    "tear",
+    "ripped",
+    "rip",
+    "stain",
+    "frayed",
+    "stitching",
+    "pilling",
+    "seam",
+    "stitch",
+    "zipper",
+    "broken",
+    "hardware",
+]
+
+# Vendor error (wrong/damaged on arrival) - separate from manufacturing defect
+VENDOR_ERROR_KEYWORDS = ["wrong item", "arrived damaged", "damaged on arrival", "item arrived damaged"]
+
+# --- chat_routes.py -------------------------------------------------------------
+
+# Keywords that indicate a status/tracking/delivery inquiry
+STATUS_KEYWORDS = [
+    "status", "track", "tracking", "where is", "where's", "when will",
+    "when does", "when is", "delivery date", "estimated", "eta",
+    "shipped", "shipping status", "check status", "order status",
+    "has it shipped", "has my order", "when can i expect",
+    "how long", "arriving", "arrive", "delivery status",
+    "check the status", "delivery update", "shipping update",
+    "isn't delivered", "isnt delivered", "not delivered yet",
+    "hasn't arrived yet", "hasnt arrived yet", "hasn't shipped",
+    "when will it arrive", "when does it arrive", "expected delivery",
+    # Non-receipt / delivery claim keywords - respond with status, don't create case
+    "didn't receive", "did not receive", "haven't received", "not received",
+    "never received", "didn't get", "did not get", "haven't got", "never got",
+    "wasn't delivered", "never arrived", "didn't arrive",
+    "never came", "didn't come", "still waiting",
+    "hasn't arrived", "has not arrived", "haven't gotten", "didn't show",
+    "package is missing", "order is missing", "where is my package",
+    "i never got", "lost", "missing",
+]
+
+# Keywords that indicate an actual ISSUE requiring case creation (product problems)
+ISSUE_KEYWORDS = [
+    "damage", "damaged", "broken", "defect", "defective", "wrong item",
+    "quality", "ripped", "torn", "stain", "fading", "pilling",
+    "zipper", "seam", "fell apart", "doesn't work", "malfunction",
+    "return", "refund", "exchange", "warranty", "claim", "complaint",
+    "doesn't fit", "too small", "too big", "wrong size", "wrong color",
+    "not what i ordered", "received wrong",
+]
+
+# Generic signals without specifics
+GENERIC_ISSUE_KEYWORDS = [
+    "issue",
+    "problem",
+    "something wrong",
+    "not working",
+    "help",
+    "there is a problem",
+    "there's a problem",
+    "there is an issue",
+    "there's an issue",
+    "theres an issue",
+    "theres a issue",
+]
+
+# Specific issue keywords (if present, we have enough to proceed)
+SPECIFIC_ISSUE_KEYWORDS = ISSUE_KEYWORDS + ["missing parts"]
+
+# Policy question detection when no order ID is given
+POLICY_QUESTION_KEYWORDS = [
+    "return", "refund", "exchange", "warranty", "shipping", "delivery",
+    "replacement", "defect", "damaged", "lost", "policy", "policies",
+    "credit", "cancel", "how long", "how do", "what is", "what are",
+    "can i", "do you", "is there",
+]
+
+# Relevance check for general queries on closed sessions
+POLICY_RELEVANT_KEYWORDS = [
+    "return", "refund", "exchange", "warranty", "shipping", "delivery",
+    "replacement", "defect", "damaged", "lost", "policy", "policies",
+    "credit", "cancel", "order", "product", "item", "money back",
+    "how long", "how do", "what is", "what are", "can i", "do you",
+]
+
+GREETING_KEYWORDS = ["hi", "hello", "hey", "wsup", "sup", "what's up", "howdy", "good morning", "good afternoon", "good evening"]
+
+# Lightweight reason inference when the customer didn't pick one
+REASON_FIT_KEYWORDS = ["doesn't fit", "too small", "too big", "wrong size", "changed my mind"]
+REASON_SHIPPING_KEYWORDS = ["lost", "missing", "not arrived", "label created", "in transit"]
+REASON_QUALITY_KEYWORDS = ["defect", "broke", "broken", "fading", "pilling", "zipper", "seam", "quality"]
+
+# Topic of the canned policy summary in _answer_general_query
+ANSWER_RETURNS_KEYWORDS = ["return", "exchange"]
+ANSWER_WARRANTY_KEYWORDS = ["warranty", "defect", "quality"]
+ANSWER_REFUND_KEYWORDS = ["refund", "credit", "money"]
+ANSWER_SHIPPING_KEYWORDS = ["shipping", "delivery", "lost", "track"]
+
+# --- intake.py complexity ------------------------------------------------------
+
+# harder intents
+HARD_KEYWORDS = [
+    "warranty", "defect", "manufacturing", "pilling", "zipper", "seam",
+    "late", "outside window", "holiday", "investigation", "delivered but missing",
+    "wrong item", "damaged", "carrier", "chargeback",
+]
+RETURN_REFUND_KEYWORDS = ["return", "refund"]
+LOST_MISSING_WARRANTY_KEYWORDS = ["lost", "missing", "warranty"]
+
+# --- retriever.py routing ------------------------------------------------------
+
+ROUTE_WARRANTY_KEYWORDS = ["warranty", "defect", "manufacturing", "photo", "pilling", "zipper", "seam"]
+ROUTE_SHIPPING_KEYWORDS = ["lost", "in transit", "label created", "delivered but missing", "carrier"]
+ROUTE_RETURNS_KEYWORDS = ["return", "exchange", "doesn't fit", "changed mind", "buyer remorse"]
+ROUTE_REFUNDS_KEYWORDS = ["refund", "store credit", "gift", "restocking", "shipping fee", "inspection"]
+EVIDENCE_KEYWORDS = ["photo", "evidence", "proof"]
+
+
+CATEGORIES: Dict[str, List[str]] = {
+    "decide.preference": PREFERENCE_KEYWORDS,
+    "decide.shipping": SHIPPING_KEYWORDS,
+    "decide.warranty": WARRANTY_KEYWORDS,
+    "decide.vendor_error": VENDOR_ERROR_KEYWORDS,
+    "chat.status": STATUS_KEYWORDS,
+    "chat.issue": ISSUE_KEYWORDS,
+    "chat.generic_issue": GENERIC_ISSUE_KEYWORDS,
+    "chat.specific_issue": SPECIFIC_ISSUE_KEYWORDS,
+    "chat.policy_question": POLICY_QUESTION_KEYWORDS,
+    "chat.policy_relevant": POLICY_RELEVANT_KEYWORDS,
+    "chat.greeting": GREETING_KEYWORDS,
+    "chat.reason_fit": REASON_FIT_KEYWORDS,
+    "chat.reason_shipping": REASON_SHIPPING_KEYWORDS,
+    "chat.reason_quality": REASON_QUALITY_KEYWORDS,
+    "answer.returns": ANSWER_RETURNS_KEYWORDS,
+    "answer.warranty": ANSWER_WARRANTY_KEYWORDS,
+    "answer.refund": ANSWER_REFUND_KEYWORDS,
+    "answer.shipping": ANSWER_SHIPPING_KEYWORDS,
+    "intake.hard": HARD_KEYWORDS,
+    "intake.return_refund": RETURN_REFUND_KEYWORDS,
+    "intake.lost_missing_warranty": LOST_MISSING_WARRANTY_KEYWORDS,
+    "route.warranty": ROUTE_WARRANTY_KEYWORDS,
+    "route.shipping": ROUTE_SHIPPING_KEYWORDS,
+    "route.returns": ROUTE_RETURNS_KEYWORDS,
+    "route.refunds": ROUTE_REFUNDS_KEYWORDS,
+    "rerank.evidence": EVIDENCE_KEYWORDS,
+}
+
+
+def _trie_pattern(phrases: Iterable[str]) -> str:
+    """
+    Build a regex from a character trie of the phrases. Branches under a node are
+    disjoint by their first char and "stop here" is a greedy optional group, so the
+    regex always returns the LONGEST phrase starting at a given position.
+    """
+    trie: dict = {}
+    for p in phrases:
+        node = trie
+        for ch in p:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def emit(node: dict) -> str:
+        terminal = "" in node
+        branches = [re.escape(ch) + emit(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if terminal:
+            return f"(?:{body})?"
+        return body
+
+    return emit(trie)
+
+
+class KeywordMatcher:
+    """
+    Multi-category phrase matcher compiled into one regex.
+
+    The pattern is a zero-width lookahead, so finditer visits every position and
+    captures the longest phrase starting there. Any other phrase matching at that
+    position is necessarily a prefix of the longest one, so each phrase carries the
+    categories of all phrases that are its prefixes — the union over positions is
+    exactly the set of categories whose phrases occur anywhere in the text.
+    """
+
+    def __init__(self, categories: Mapping[str, Iterable[str]]):
+        by_phrase: Dict[str, set] = {}
+        for cat, phrases in categories.items():
+            for p in phrases:
+                by_phrase.setdefault(p.lower(), set()).add(cat)
+
+        self._categories: Dict[str, FrozenSet[str]] = {}
+        for phrase in by_phrase:
+            cats = set()
+            for other, other_cats in by_phrase.items():
+                if phrase.startswith(other):
+                    cats |= other_cats
+            self._categories[phrase] = frozenset(cats)
+
+        self._rx = re.compile(f"(?=({_trie_pattern(by_phrase)}))")
+
+    def match(self, text: str) -> FrozenSet[str]:
+        """Return every category with a phrase occurring in `text` (lowercased here)."""
+        phrases = set(self._rx.findall(text.lower()))
+        if not phrases:
+            return frozenset()
+        return frozenset().union(*map(self._categories.__getitem__, phrases))
+
+
+_MATCHER = KeywordMatcher(CATEGORIES)
+
+
+@lru_cache(maxsize=1024)
+def match_categories(text: str) -> FrozenSet[str]:
+    """
+    Cached single-pass scan. A chat turn asks about the same message from several
+    helpers (status inquiry, issue details, reason inference, ...); only the first
+    call pays for the scan.
+    """
+    return _MATCHER.match(text)
+
+
+register_lru_cache("keywords", match_categories)
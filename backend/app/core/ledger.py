@@ -0,0 +1,143 @@
+"""
+Per-request cost/latency ledger, stored as the graph's `audit` output.
+
+trace_node() opens a NodeLedger around every node run; the LLM callback,
+retriever and caches record into whichever ledger is active in the current
+context (LangGraph copies the context into its branch threads). The node's
+entries are returned as an `audit` delta and GraphState merges the deltas with
+merge_audit(), so parallel branches don't overwrite each other.
+
+Cost is estimated from LLM_COST_PER_1K_INPUT / LLM_COST_PER_1K_OUTPUT (USD per
+1K tokens); both default to 0.
+"""
+from __future__ import annotations
+
+import os
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+LLM_COST_PER_1K_INPUT = float(os.getenv("LLM_COST_PER_1K_INPUT", "0"))
+LLM_COST_PER_1K_OUTPUT = float(os.getenv("LLM_COST_PER_1K_OUTPUT", "0"))
+
+
+@dataclass
+class NodeLedger:
+    graph: str
+    node: str
+    llm_calls: List[Dict[str, Any]] = field(default_factory=list)
+    retrieval: List[Dict[str, Any]] = field(default_factory=list)
+    cache_hits: int = 0
+    cache_misses: int = 0
+
+    def delta(self, duration_ms: float, retries: int) -> Dict[str, Any]:
+        out: Dict[str, Any] = {
+            "nodes": [{"graph": self.graph, "node": self.node, "duration_ms": round(duration_ms, 3)}],
+        }
+        if self.llm_calls:
+            out["llm_calls"] = self.llm_calls
+        if self.retrieval:
+            out["retrieval"] = self.retrieval
+        if self.cache_hits or self.cache_misses:
+            out["cache"] = {"hits": self.cache_hits, "misses": self.cache_misses}
+        if retries:
+            out["retries"] = retries
+        return out
+
+
+_current: ContextVar[Optional[NodeLedger]] = ContextVar("node_ledger", default=None)
+
+
+def open_node(graph: str, node: str):
+    """Start collecting for a node run; returns (ledger, token) for close_node()."""
+    ledger = NodeLedger(graph=graph, node=node)
+    return ledger, _current.set(ledger)
+
+
+def close_node(token) -> None:
+    _current.reset(token)
+
+
+def llm_cost_usd(input_tokens: int, output_tokens: int) -> float:
+    return input_tokens / 1000 * LLM_COST_PER_1K_INPUT + output_tokens / 1000 * LLM_COST_PER_1K_OUTPUT
+
+
+def record_llm(*, profile: str, model: str, input_tokens: int, output_tokens: int, latency_ms: float, ok: bool = True) -> None:
+    ledger = _current.get()
+    if ledger is None:
+        return
+    ledger.llm_calls.append(
+        {
+            "node": ledger.node,
+            "profile": profile,
+            "model": model,
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "latency_ms": round(latency_ms, 3),
+            "cost_usd": round(llm_cost_usd(input_tokens, output_tokens), 6),
+            "ok": ok,
+        }
+    )
+
+
+def record_retrieval(path: str, latency_ms: float) -> None:
+    ledger = _current.get()
+    if ledger is not None:
+        ledger.retrieval.append({"node": ledger.node, "path": path, "latency_ms": round(latency_ms, 3)})
+
+
+def record_cache(hit: bool) -> None:
+    ledger = _current.get()
+    if ledger is None:
+        return
+    if hit:
+        ledger.cache_hits += 1
+    else:
+        ledger.cache_misses += 1
+
+
+def merge_audit(left: Optional[Dict[str, Any]], right: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """GraphState reducer: concatenate lists, add numbers, merge nested dicts."""
+    if not left:
+        return dict(right or {})
+    if not right:
+        return left
+    out = dict(left)
+    for k, v in right.items():
+        cur = out.get(k)
+        if isinstance(v, list):
+            out[k] = list(cur or []) + v
+        elif isinstance(v, dict):
+            out[k] = merge_audit(cur if isinstance(cur, dict) else {}, v)
+        elif isinstance(v, (int, float)) and not isinstance(v, bool) and isinstance(cur, (int, float)):
+            out[k] = cur + v
+        else:
+            out[k] = v
+    return out
+
+
+def summarize(audit: Optional[Dict[str, Any]], wall_ms: Optional[float] = None) -> Dict[str, Any]:
+    """Add a `totals` block (tokens, cost, LLM/retrieval time, end-to-end wall time)."""
+    audit = dict(audit or {})
+    calls = audit.get("llm_calls") or []
+    retrieval = audit.get("retrieval") or []
+    cache = audit.get("cache") or {}
+    totals = {
+        "llm_calls": len(calls),
+        "input_tokens": sum(c.get("input_tokens") or 0 for c in calls),
+        "output_tokens": sum(c.get("output_tokens") or 0 for c in calls),
+        "cost_usd": round(sum(c.get("cost_usd") or 0.0 for c in calls), 6),
+        "llm_ms": round(sum(c.get("latency_ms") or 0.0 for c in calls), 3),
+        "retrieval_ms": round(sum(r.get("latency_ms") or 0.0 for r in retrieval), 3),
+        "cache_hits": cache.get("hits", 0),
+        "cache_misses": cache.get("misses", 0),
+        "retries": audit.get("retries", 0),
+    }
+    if wall_ms is not None:
+        totals["wall_ms"] = round(wall_ms, 3)
+    audit["totals"] = totals
+    return audit
@@ -0,0 +1,319 @@
+"""
+In-process metrics exposed at /metrics in the Prometheus text format.
+
+Counters and histograms keep one value dict per thread (the request threadpool,
+the LangGraph branch threads, ...). A writer only ever touches its own shard, so
+the hot path is a dict update with no lock; the scrape sums the shards. A
+thread's shard is folded into a base shard when the thread exits.
+METRICS_ENABLED=0 turns every recording call into a no-op.
+"""
+from __future__ import annotations
+
+import abc
+import os
+import sqlite3
+import threading
+import time
+import weakref
+from bisect import bisect_left
+from functools import lru_cache
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1").strip().lower() in {"1", "true", "yes"}
+
+# Seconds; spans a SQLite point query up to a slow multi-call LLM pipeline
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+FAST_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.5)
+
+Labels = Tuple[str, ...]
+Sample = Tuple[str, Dict[str, str], float]
+
+
+def metrics_enabled() -> bool:
+    return METRICS_ENABLED
+
+
+class _ThreadToken:
+    """Lives in a thread's threading.local, so it's freed when that thread exits."""
+
+    __slots__ = ("__weakref__",)
+
+
+class _Shards:
+    """
+    One dict per thread; registration takes the lock once per thread. When a
+    thread exits its shard is folded into a shared base shard, so short-lived
+    pool threads (LangGraph fan-out, batch/stream pools) don't pile up.
+    """
+
+    def __init__(self, fold: Callable[[dict, dict], None]):
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._fold = fold
+        self._base: dict = {}
+        self._all: List[dict] = []
+
+    def mine(self) -> dict:
+        d = getattr(self._local, "d", None)
+        if d is None:
+            d = self._local.d = {}
+            token = self._local.token = _ThreadToken()
+            weakref.finalize(token, self._retire, d).atexit = False
+            with self._lock:
+                self._all.append(d)
+        return d
+
+    def _retire(self, d: dict) -> None:
+        with self._lock:
+            self._all.remove(d)
+            self._fold(self._base, d)
+
+    def items(self) -> List[Tuple[Labels, object]]:
+        # Under the lock so a shard can't be read both live and after folding into base.
+        # list(d.items()) copies under the GIL, so a concurrent writer can't break iteration.
+        with self._lock:
+            return [kv for d in [self._base, *self._all] for kv in list(d.items())]
+
+
+class _Metric(abc.ABC):
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._shards = _Shards(self._fold)
+        _REGISTRY.append(self)
+
+    def _labels(self, values: Labels) -> Dict[str, str]:
+        return dict(zip(self.labelnames, values))
+
+    @staticmethod
+    @abc.abstractmethod
+    def _fold(base: dict, shard: dict) -> None:
+        """Merge a retired thread's shard into the base shard."""
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    @staticmethod
+    def _fold(base: dict, shard: dict) -> None:
+        for key, v in shard.items():
+            base[key] = base.get(key, 0.0) + v
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        if not METRICS_ENABLED:
+            return
+        d = self._shards.mine()
+        d[labels] = d.get(labels, 0.0) + amount
+
+    def collect(self) -> List[Sample]:
+        totals: Dict[Labels, float] = {}
+        for key, v in self._shards.items():
+            totals[key] = totals.get(key, 0.0) + v
+        return [(self.name, self._labels(k), v) for k, v in sorted(totals.items())]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = (), buckets: Iterable[float] = DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    @staticmethod
+    def _fold(base: dict, shard: dict) -> None:
+        for key, h in shard.items():
+            # New list rather than in-place: a scrape may still hold the old one
+            b = base.get(key)
+            base[key] = list(h) if b is None else [x + y for x, y in zip(b, h)]
+
+    def observe(self, value: float, *labels: str) -> None:
+        if not METRICS_ENABLED:
+            return
+        d = self._shards.mine()
+        h = d.get(labels)
+        if h is None:
+            # per-bucket counts (+Inf last), then sum
+            h = d[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        h[bisect_left(self.buckets, value)] += 1
+        h[-1] += value
+
+    def collect(self) -> List[Sample]:
+        n = len(self.buckets) + 1
+        merged: Dict[Labels, list] = {}
+        for key, h in self._shards.items():
+            m = merged.setdefault(key, [0] * n + [0.0])
+            for i in range(n + 1):
+                m[i] += h[i]
+
+        out: List[Sample] = []
+        for key, m in sorted(merged.items()):
+            base = self._labels(key)
+            cumulative = 0
+            for i, le in enumerate(self.buckets + (float("inf"),)):
+                cumulative += m[i]
+                out.append((f"{self.name}_bucket", {**base, "le": _fmt(le)}, cumulative))
+            out.append((f"{self.name}_sum", base, m[-1]))
+            out.append((f"{self.name}_count", base, cumulative))
+        return out
+
+
+class _Collected:
+    """Metric whose samples are computed at scrape time (e.g. from lru_cache stats)."""
+
+    def __init__(self, name: str, help_text: str, kind: str, fn: Callable[[], List[Sample]]):
+        self.name = name
+        self.help = help_text
+        self.kind = kind
+        self._fn = fn
+        _REGISTRY.append(self)
+
+    def collect(self) -> List[Sample]:
+        return self._fn()
+
+
+_REGISTRY: List[object] = []
+
+
+def _fmt(v: float) -> str:
+    if v == float("inf"):
+        return "+Inf"
+    if float(v).is_integer():
+        return str(int(v))
+    return repr(float(v))
+
+
+def _escape(v: str) -> str:
+    return str(v).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def render() -> str:
+    """Every registered metric in the Prometheus text exposition format (0.0.4)."""
+    lines: List[str] = []
+    for metric in _REGISTRY:
+        samples = metric.collect()
+        lines.append(f"# HELP {metric.name} {metric.help}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        for name, labels, value in samples:
+            if labels:
+                label_str = ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items())
+                lines.append(f"{name}{{{label_str}}} {_fmt(value)}")
+            else:
+                lines.append(f"{name} {_fmt(value)}")
+    return "\n".join(lines) + "\n"
+
+
+# --- metric definitions ------------------------------------------------------------
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template.", ("method", "route", "status")
+)
+GRAPH_NODE_SECONDS = Histogram(
+    "graph_node_duration_seconds", "LangGraph node run time.", ("graph", "node")
+)
+GRAPH_NODE_ERRORS = Counter(
+    "graph_node_errors_total", "LangGraph node runs that raised.", ("graph", "node")
+)
+LLM_CALLS = Counter("llm_calls_total", "LLM calls by profile and outcome (ok|error).", ("profile", "outcome"))
+LLM_CALL_SECONDS = Histogram("llm_call_duration_seconds", "LLM call latency.", ("profile",))
+LLM_TOKENS = Counter("llm_tokens_total", "LLM tokens by profile and direction (input|output).", ("profile", "direction"))
+RETRIEVAL_SECONDS = Histogram(
+    "retrieval_duration_seconds",
+    "Policy retrieval latency; path is vector or fallback (filesystem scan when embeddings fail).",
+    ("path",),
+)
+SQLITE_QUERY_SECONDS = Histogram(
+    "sqlite_query_duration_seconds", "SQLite statement execution time.", ("db", "op"), buckets=FAST_BUCKETS
+)
+CACHE_REQUESTS = Counter("cache_requests_total", "Cache lookups by cache and result (hit|miss).", ("cache", "result"))
+
+
+def record_cache_lookup(cache: str, hit: bool) -> None:
+    CACHE_REQUESTS.inc(cache, "hit" if hit else "miss")
+
+
+_LRU_CACHES: Dict[str, object] = {}
+
+
+def register_lru_cache(cache: str, fn) -> None:
+    """Expose a functools.lru_cache's hit/miss stats as lru_cache_requests_total{cache=...}."""
+    _LRU_CACHES[cache] = fn
+
+
+def _collect_lru() -> List[Sample]:
+    out: List[Sample] = []
+    for cache, fn in sorted(_LRU_CACHES.items()):
+        info = fn.cache_info()
+        out.append(("lru_cache_requests_total", {"cache": cache, "result": "hit"}, float(info.hits)))
+        out.append(("lru_cache_requests_total", {"cache": cache, "result": "miss"}, float(info.misses)))
+    return out
+
+
+_Collected("lru_cache_requests_total", "functools.lru_cache lookups by cache and result (hit|miss).", "counter", _collect_lru)
+
+
+# --- SQLite timing --------------------------------------------------------------------
+
+@lru_cache(maxsize=None)
+def timed_connection(db: str) -> type:
+    """sqlite3.Connection subclass (pass as `factory=`) that times execute/executemany."""
+
+    class TimedConnection(sqlite3.Connection):
+        def execute(self, sql, *args):
+            t0 = time.perf_counter()
+            try:
+                return super().execute(sql, *args)
+            finally:
+                SQLITE_QUERY_SECONDS.observe(time.perf_counter() - t0, db, _sql_op(sql))
+
+        def executemany(self, sql, *args):
+            t0 = time.perf_counter()
+            try:
+                return super().executemany(sql, *args)
+            finally:
+                SQLITE_QUERY_SECONDS.observe(time.perf_counter() - t0, db, _sql_op(sql))
+
+    return TimedConnection
+
+
+def _sql_op(sql: str) -> str:
+    head = sql.lstrip().split(None, 1)
+    return head[0].lower() if head else ""
+
+
+# --- HTTP middleware ---------------------------------------------------------------
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware recording request latency keyed by the matched route
+    template (/cases/{case_id}, not the raw path), so label cardinality stays bounded.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not METRICS_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        t0 = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            template = getattr(route, "path", None) or "<unmatched>"
+            HTTP_REQUEST_SECONDS.observe(time.perf_counter() - t0, scope.get("method", ""), template, str(status["code"]))
@@ -0,0 +1,280 @@
+"""
+On-demand sampling profiler for single requests.
+
+A request is profiled when it carries `X-Profile: 1` together with valid reviewer
+basic auth, or automatically for 1 in PROFILE_SAMPLE_EVERY_N requests. While it
+runs, a sampler thread snapshots the stacks of the threads working on that
+request (sys._current_frames) each PROFILE_INTERVAL_MS and keeps the ones that
+pass through app code. The handler runs in the threadpool and the graph fans out
+to more threads, so a per-thread deterministic profiler would miss most of the
+work; sampling every thread would instead pick up concurrent requests and idle
+background workers. So the sampler is published in a ContextVar, and code that
+runs request work on a thread wraps it in sampled(): sync endpoints (via
+ProfiledRoute), graph nodes (trace_node) and the batch/stream executor items.
+Executors copy the request context, so the ContextVar reaches them. The event
+loop thread is sampled too, for async handlers.
+
+Finished profiles (collapsed stacks + top functions) are kept in an in-memory
+ring buffer and served by /debug/profiles. Requests that aren't profiled only pay
+for a header lookup, a counter increment and a ContextVar read per wrapped call.
+"""
+from __future__ import annotations
+
+import asyncio
+import functools
+import inspect
+import itertools
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, OrderedDict
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from dotenv import load_dotenv
+from fastapi.routing import APIRoute
+
+from app.security.basic_auth import is_reviewer_authorization
+
+load_dotenv()
+
+PROFILE_SAMPLE_EVERY_N = int(os.getenv("PROFILE_SAMPLE_EVERY_N", "0"))
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "5"))
+PROFILE_KEEP = int(os.getenv("PROFILE_KEEP", "50"))
+
+_APP_DIR = str(Path(__file__).resolve().parents[1])
+_MAX_DEPTH = 128
+_TOP_N = 30
+
+
+def _frame_label(code) -> str:
+    filename = code.co_filename
+    if filename.startswith(_APP_DIR):
+        filename = "app" + filename[len(_APP_DIR):]
+    else:
+        filename = os.path.basename(filename)
+    # ';' separates frames in the collapsed format
+    return f"{code.co_name} ({filename}:{code.co_firstlineno})".replace(";", ":")
+
+
+class _Sampler:
+    """Background thread collecting app-code stacks of the tracked threads until stop()."""
+
+    def __init__(self, interval_s: float):
+        self.interval_s = interval_s
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        # ident -> how many sampled() calls are running on it (they nest)
+        self._threads: Dict[int, int] = {}
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+
+    def enter(self, ident: int) -> None:
+        with self._lock:
+            self._threads[ident] = self._threads.get(ident, 0) + 1
+
+    def leave(self, ident: int) -> None:
+        with self._lock:
+            if self._threads[ident] > 1:
+                self._threads[ident] -= 1
+            else:
+                del self._threads[ident]
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop sampling; doesn't wait for the thread (join() does)."""
+        self._stop.set()
+
+    def join(self) -> None:
+        self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval_s):
+            self.samples += 1
+            with self._lock:
+                idents = list(self._threads)
+            frames = sys._current_frames()
+            for ident in idents:
+                frame = frames.get(ident)
+                codes = []
+                in_app = False
+                while frame is not None and len(codes) < _MAX_DEPTH:
+                    code = frame.f_code
+                    codes.append(code)
+                    in_app = in_app or code.co_filename.startswith(_APP_DIR)
+                    frame = frame.f_back
+                if in_app:
+                    # Hash code objects while sampling; format labels once at the end
+                    self.stacks[tuple(reversed(codes))] += 1
+
+
+_active: ContextVar[Optional[_Sampler]] = ContextVar("profiler_sampler", default=None)
+
+
+def sampled(fn: Callable) -> Callable:
+    """Wrap a sync function so the thread running it is sampled while the calling request is profiled."""
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        sampler = _active.get()
+        if sampler is None:
+            return fn(*args, **kwargs)
+        ident = threading.get_ident()
+        sampler.enter(ident)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            sampler.leave(ident)
+
+    wrapper._sampled = True
+    return wrapper
+
+
+class ProfiledRoute(APIRoute):
+    """APIRoute that wraps a sync endpoint in sampled(), so a profiled request's threadpool thread is sampled."""
+
+    def __init__(self, path: str, endpoint: Callable, **kwargs):
+        # FastAPI unwraps decorated endpoints for their signature; include_router re-creates the route
+        if not inspect.iscoroutinefunction(endpoint) and not getattr(endpoint, "_sampled", False):
+            endpoint = sampled(endpoint)
+        super().__init__(path, endpoint, **kwargs)
+
+
+def _build_profile(profile_id: str, method: str, path: str, trigger: str, sampler: _Sampler, wall_ms: float) -> Dict[str, Any]:
+    collapsed: Counter = Counter()
+    self_counts: Counter = Counter()
+    total_counts: Counter = Counter()
+    for codes, n in sampler.stacks.items():
+        labels = [_frame_label(c) for c in codes]
+        collapsed[";".join(labels)] += n
+        self_counts[labels[-1]] += n
+        for label in set(labels):
+            total_counts[label] += n
+
+    stack_samples = sum(collapsed.values()) or 1
+    top = [
+        {
+            "function": label,
+            "self_samples": self_counts.get(label, 0),
+            "total_samples": total,
+            "self_pct": round(100 * self_counts.get(label, 0) / stack_samples, 1),
+            "total_pct": round(100 * total / stack_samples, 1),
+        }
+        for label, total in total_counts.items()
+    ]
+    top.sort(key=lambda r: (r["self_samples"], r["total_samples"]), reverse=True)
+
+    return {
+        "profile_id": profile_id,
+        "method": method,
+        "path": path,
+        "trigger": trigger,
+        "created_at": time.time(),
+        "wall_ms": round(wall_ms, 3),
+        "interval_ms": sampler.interval_s * 1000,
+        "samples": sampler.samples,
+        "top_functions": top[:_TOP_N],
+        "collapsed": [f"{stack} {n}" for stack, n in collapsed.most_common()],
+    }
+
+
+class _ProfileStore:
+    def __init__(self, keep: int):
+        self._keep = keep
+        self._lock = threading.Lock()
+        self._profiles: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+
+    def add(self, profile: Dict[str, Any]) -> None:
+        with self._lock:
+            self._profiles[profile["profile_id"]] = profile
+            while len(self._profiles) > self._keep:
+                self._profiles.popitem(last=False)
+
+    def get(self, profile_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return self._profiles.get(profile_id)
+
+    def list(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            profiles = list(self._profiles.values())
+        return [
+            {k: p[k] for k in ("profile_id", "method", "path", "trigger", "created_at", "wall_ms", "samples")}
+            for p in reversed(profiles)
+        ]
+
+
+_store = _ProfileStore(PROFILE_KEEP)
+
+
+def get_profile(profile_id: str) -> Optional[Dict[str, Any]]:
+    return _store.get(profile_id)
+
+
+def list_profiles() -> List[Dict[str, Any]]:
+    """Most recent first, without the stack payloads."""
+    return _store.list()
+
+
+def _header(scope, name: bytes) -> Optional[str]:
+    for k, v in scope.get("headers") or []:
+        if k == name:
+            return v.decode("latin-1")
+    return None
+
+
+class ProfilerMiddleware:
+    """Pure ASGI middleware; see the module docstring for when a request is profiled."""
+
+    def __init__(self, app):
+        self.app = app
+        self._counter = itertools.count(1)
+
+    def _trigger(self, scope) -> Optional[str]:
+        flag = _header(scope, b"x-profile")
+        if flag and flag.strip().lower() in {"1", "true", "yes"}:
+            if is_reviewer_authorization(_header(scope, b"authorization")):
+                return "header"
+        if PROFILE_SAMPLE_EVERY_N > 0 and next(self._counter) % PROFILE_SAMPLE_EVERY_N == 0:
+            return "sampled"
+        return None
+
+    async def __call__(self, scope, receive, send):
+        trigger = self._trigger(scope) if scope["type"] == "http" else None
+        if trigger is None:
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = uuid.uuid4().hex
+
+        async def send_with_id(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + [(b"x-profile-id", profile_id.encode("latin-1"))]
+            await send(message)
+
+        sampler = _Sampler(PROFILE_INTERVAL_MS / 1000)
+        # The event loop thread is this request's thread while it's in async code
+        sampler.enter(threading.get_ident())
+        token = _active.set(sampler)
+        t0 = time.perf_counter()
+        sampler.start()
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            sampler.stop()
+            wall_ms = (time.perf_counter() - t0) * 1000
+            _active.reset(token)
+            # Joining the sampler and formatting the stacks would block the event loop
+            await asyncio.get_running_loop().run_in_executor(
+                None, self._finish, profile_id, scope.get("method", ""), scope.get("path", ""), trigger, sampler, wall_ms
+            )
+
+    @staticmethod
+    def _finish(profile_id: str, method: str, path: str, trigger: str, sampler: _Sampler, wall_ms: float) -> None:
+        sampler.join()
+        _store.add(_build_profile(profile_id, method, path, trigger, sampler, wall_ms))
@@ -0,0 +1,113 @@
+"""
+Persistent SQLite connections shared by the cases and chat repositories.
+
+Each thread keeps one open connection per database (sqlite3 connections are
+not shareable across threads), so a repository call costs a dict lookup
+instead of connect + schema load + pragma setup, and the connection's
+statement cache means repeated queries skip parsing/planning. Connections are
+created in WAL mode with synchronous=NORMAL: readers no longer block on a
+writer, and commits skip the per-transaction fsync of the rollback journal
+(still durable against application crashes; a power loss can drop the last
+few commits). busy_timeout makes concurrent writers wait instead of failing
+with "database is locked".
+
+`with get_conn() as conn:` keeps its meaning: commit on success, roll back on
+error. It does not close the connection. Blocks nest on the same thread: only
+the outermost one commits or rolls back, and an inner block is a SAVEPOINT, so
+its error undoes just its own writes (and still propagates). A repository call
+made inside a block therefore joins that block's transaction instead of
+committing it early; functions that start with BEGIN IMMEDIATE can't be nested.
+
+Env: SQLITE_JOURNAL_MODE (WAL), SQLITE_SYNCHRONOUS (NORMAL),
+SQLITE_BUSY_TIMEOUT_MS (5000), SQLITE_STATEMENT_CACHE (256).
+"""
+from __future__ import annotations
+
+import os
+import sqlite3
+import threading
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+from app.core.metrics import timed_connection
+
+load_dotenv()
+
+SQLITE_JOURNAL_MODE = os.getenv("SQLITE_JOURNAL_MODE", "WAL").strip().upper()
+SQLITE_SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL").strip().upper()
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+SQLITE_STATEMENT_CACHE = int(os.getenv("SQLITE_STATEMENT_CACHE", "256"))
+
+
+def _nestable(base: type) -> type:
+    """Connection subclass whose `with` blocks nest (see the module docstring)."""
+
+    class NestableConnection(base):
+        _depth = 0
+
+        def __enter__(self):
+            if self._depth:
+                if not self.in_transaction:
+                    # Releasing a savepoint opened outside a transaction would commit
+                    self.execute("BEGIN")
+                self.execute(f"SAVEPOINT nested_{self._depth}")
+            self._depth += 1
+            return self
+
+        def __exit__(self, exc_type, exc, tb):
+            self._depth -= 1
+            if not self._depth:
+                return super().__exit__(exc_type, exc, tb)
+            # SQLite may already have rolled the whole transaction back (e.g. SQLITE_FULL)
+            if self.in_transaction:
+                savepoint = f"nested_{self._depth}"
+                if exc_type is not None:
+                    self.execute(f"ROLLBACK TO {savepoint}")
+                self.execute(f"RELEASE {savepoint}")
+            return False
+
+    return NestableConnection
+
+
+class SQLiteDatabase:
+    """One database file; `db` labels its metrics (sqlite_query_duration_seconds{db=...})."""
+
+    def __init__(self, path: Path, db: str):
+        self.path = Path(path)
+        self.db = db
+        self._local = threading.local()
+        self._dir_ready = False
+        self._factory = _nestable(timed_connection(db))
+
+    def connect(self) -> sqlite3.Connection:
+        """A new configured connection (the per-thread one comes from connection())."""
+        if not self._dir_ready:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._dir_ready = True
+        conn = sqlite3.connect(
+            self.path,
+            timeout=SQLITE_BUSY_TIMEOUT_MS / 1000,
+            factory=self._factory,
+            cached_statements=SQLITE_STATEMENT_CACHE,
+        )
+        conn.row_factory = sqlite3.Row
+        conn.execute(f"PRAGMA busy_timeout = {SQLITE_BUSY_TIMEOUT_MS}")
+        if SQLITE_JOURNAL_MODE:
+            conn.execute(f"PRAGMA journal_mode = {SQLITE_JOURNAL_MODE}")
+        if SQLITE_SYNCHRONOUS:
+            conn.execute(f"PRAGMA synchronous = {SQLITE_SYNCHRONOUS}")
+        return conn
+
+    def connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = self.connect()
+        return conn
+
+    def close(self) -> None:
+        """Close this thread's connection (others close when their thread exits)."""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            self._local.conn = None
+            conn.close()
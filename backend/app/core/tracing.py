@@ -0,0 +1,244 @@
+"""
+Per-node tracing for the LangGraph pipelines.
+
+Every node in returns_graph/finalize_graph is wrapped with trace_node(). The
+wrapper always times the node and collects its cost/latency ledger entries (see
+app.core.ledger), returned as the node's `audit` delta, and feeds the node
+duration histogram in app.core.metrics. When TRACING_ENABLED is on, each run
+also becomes a span (wall time, LLM calls/tokens, retries, cache hits) tagged
+with the request ID, appended to a JSONL trace file and folded into an
+in-process aggregate.
+"""
+from __future__ import annotations
+
+import functools
+import json
+import os
+import threading
+import time
+import uuid
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+from dotenv import load_dotenv
+
+from app.core import ledger
+from app.core.metrics import GRAPH_NODE_ERRORS, GRAPH_NODE_SECONDS, record_cache_lookup
+from app.core.profiler import sampled
+
+load_dotenv()
+
+TRACING_ENABLED = os.getenv("TRACING_ENABLED", "0").strip().lower() in {"1", "true", "yes"}
+TRACE_FILE = Path(os.getenv("TRACE_FILE", "app/storage/traces.jsonl"))
+
+_request_id: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+_current_span: ContextVar[Optional["Span"]] = ContextVar("current_span", default=None)
+
+
+@dataclass
+class Span:
+    graph: str
+    node: str
+    request_id: Optional[str]
+    started_at: float
+    duration_ms: float = 0.0
+    llm_calls: int = 0
+    input_tokens: int = 0
+    output_tokens: int = 0
+    llm_ms: float = 0.0
+    retries: int = 0
+    cache_hits: int = 0
+    cache_misses: int = 0
+    error: Optional[str] = None
+    attrs: Dict[str, Any] = field(default_factory=dict)
+
+
+def tracing_enabled() -> bool:
+    return TRACING_ENABLED
+
+
+def get_request_id() -> Optional[str]:
+    return _request_id.get()
+
+
+def set_request_id(request_id: Optional[str]):
+    """Bind a request ID to the current context; returns a token for reset_request_id()."""
+    return _request_id.set(request_id)
+
+
+def reset_request_id(token) -> None:
+    _request_id.reset(token)
+
+
+# --- recording hooks (no-ops outside a span) ------------------------------------
+
+def record_llm_call(
+    *,
+    profile: str = "",
+    model: str = "",
+    input_tokens: int = 0,
+    output_tokens: int = 0,
+    latency_ms: float = 0.0,
+    ok: bool = True,
+) -> None:
+    ledger.record_llm(
+        profile=profile, model=model, input_tokens=input_tokens, output_tokens=output_tokens, latency_ms=latency_ms, ok=ok
+    )
+    span = _current_span.get()
+    if span is None:
+        return
+    span.llm_calls += 1
+    span.input_tokens += input_tokens
+    span.output_tokens += output_tokens
+    span.llm_ms += latency_ms
+
+
+def record_cache(cache: str, hit: bool) -> None:
+    record_cache_lookup(cache, hit)
+    ledger.record_cache(hit)
+    span = _current_span.get()
+    if span is None:
+        return
+    if hit:
+        span.cache_hits += 1
+    else:
+        span.cache_misses += 1
+
+
+def set_span_attr(key: str, value: Any) -> None:
+    span = _current_span.get()
+    if span is not None:
+        span.attrs[key] = value
+
+
+# --- export: JSONL file + in-process aggregate -----------------------------------
+
+class _Exporter:
+    def __init__(self, path: Path):
+        self._path = path
+        self._lock = threading.Lock()
+        self._fh = None
+        self._agg: Dict[str, Dict[str, float]] = {}
+
+    def export(self, span: Span) -> None:
+        line = json.dumps(asdict(span), default=str)
+        key = f"{span.graph}.{span.node}"
+        with self._lock:
+            if self._fh is None:
+                self._path.parent.mkdir(parents=True, exist_ok=True)
+                self._fh = self._path.open("a", encoding="utf-8", buffering=1)
+            self._fh.write(line + "\n")
+
+            a = self._agg.get(key)
+            if a is None:
+                a = self._agg[key] = {
+                    "count": 0, "errors": 0, "total_ms": 0.0, "max_ms": 0.0,
+                    "llm_calls": 0, "input_tokens": 0, "output_tokens": 0, "cache_hits": 0, "cache_misses": 0,
+                }
+            a["count"] += 1
+            a["errors"] += 1 if span.error else 0
+            a["total_ms"] += span.duration_ms
+            a["max_ms"] = max(a["max_ms"], span.duration_ms)
+            a["llm_calls"] += span.llm_calls
+            a["input_tokens"] += span.input_tokens
+            a["output_tokens"] += span.output_tokens
+            a["cache_hits"] += span.cache_hits
+            a["cache_misses"] += span.cache_misses
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            return {
+                k: {**v, "avg_ms": round(v["total_ms"] / v["count"], 3) if v["count"] else 0.0}
+                for k, v in sorted(self._agg.items())
+            }
+
+
+_exporter = _Exporter(TRACE_FILE)
+
+
+def trace_summary() -> Dict[str, Dict[str, float]]:
+    """Aggregate per graph node since process start."""
+    return _exporter.summary()
+
+
+# --- node wrapper ---------------------------------------------------------------
+
+def trace_node(graph: str, node: str, fn: Callable) -> Callable:
+    """Wrap a LangGraph node: time it, collect its ledger entries as an `audit` delta, optionally trace it."""
+
+    @functools.wraps(fn)
+    def wrapper(state):
+        span = span_token = None
+        if TRACING_ENABLED:
+            span = Span(graph=graph, node=node, request_id=_request_id.get(), started_at=time.time())
+            span_token = _current_span.set(span)
+        node_ledger, ledger_token = ledger.open_node(graph, node)
+        retries_before = int(state.get("retries") or 0)
+        t0 = time.perf_counter()
+        try:
+            result = fn(state)
+        except Exception as e:
+            GRAPH_NODE_ERRORS.inc(graph, node)
+            if span is not None:
+                span.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            elapsed = time.perf_counter() - t0
+            ledger.close_node(ledger_token)
+            GRAPH_NODE_SECONDS.observe(elapsed, graph, node)
+            if span is not None:
+                span.duration_ms = round(elapsed * 1000, 3)
+                _current_span.reset(span_token)
+
+        retries = 0
+        if isinstance(result, dict):
+            if "retries" in result:
+                retries = max(0, int(result.get("retries") or 0) - retries_before)
+            # Nodes that return the whole state would otherwise feed the merged audit
+            # back into its own reducer; only this run's entries go out.
+            result["audit"] = node_ledger.delta(elapsed * 1000, retries)
+        if span is not None:
+            span.retries = retries
+            _exporter.export(span)
+        return result
+
+    # LangGraph runs nodes on its own executor threads; a profiled request samples them
+    return sampled(wrapper)
+
+
+# --- request ID middleware ---------------------------------------------------------
+
+class RequestIdMiddleware:
+    """
+    Pure ASGI middleware: take X-Request-ID from the request (or mint one), bind it
+    for the duration of the request and echo it on the response.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = None
+        for k, v in scope.get("headers") or []:
+            if k == b"x-request-id":
+                request_id = v.decode("latin-1")[:128]
+                break
+        request_id = request_id or uuid.uuid4().hex
+
+        async def send_with_id(message):
+            if message["type"] == "http.response.start":
+                message.setdefault("headers", [])
+                message["headers"] = list(message["headers"]) + [(b"x-request-id", request_id.encode("latin-1"))]
+            await send(message)
+
+        token = _request_id.set(request_id)
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            _request_id.reset(token)
@@ -0,0 +1,161 @@
+"""
+Startup warm-up and readiness.
+
+The app lifespan runs the warm-up in a background thread so /health answers
+right away while the expensive first-use work happens before real traffic:
+
+- catalog:   parse orders.json / products.json into the shared indexes
+- graphs:    compile the returns and finalize graphs (imports LangChain & co.)
+- retrieval: open the Chroma store, reach Ollama, and run one reason-only policy
+             query per WARMUP_QUERIES reason. That pays for the first embedding
+             and index load; the cached results only serve cases sent without
+             a customer_message, since the message is part of the query
+- llm:       open a pooled TLS connection to OpenRouter (a models listing, no tokens)
+
+WARMUP_STEPS picks and orders the steps; WARMUP_ENABLED=0 skips warm-up and
+reports ready immediately. A failed step is logged and reported but doesn't hold
+readiness back: every dependency here has a slower path that still works (cold
+compile, filesystem policy fallback, a new connection). /ready returns 503 until
+the warm-up has finished, and again once shutdown starts.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+WARMUP_ENABLED = os.getenv("WARMUP_ENABLED", "1").strip().lower() in {"1", "true", "yes"}
+WARMUP_STEPS = [s.strip() for s in os.getenv("WARMUP_STEPS", "catalog,graphs,retrieval,llm").split(",") if s.strip()]
+WARMUP_LLM_TIMEOUT = float(os.getenv("WARMUP_LLM_TIMEOUT", "5"))
+
+
+def _warmup_reasons() -> List[str]:
+    raw = os.getenv("WARMUP_QUERIES", "")
+    if raw.strip():
+        return [r.strip() for r in raw.split(",") if r.strip()]
+    # Default to the reason strings the API documents as typical
+    from app.api.schemas import ResolveRequest
+
+    return list(ResolveRequest.model_fields["reason"].examples or [])
+
+
+# --- steps ------------------------------------------------------------------------
+
+def _warm_catalog() -> Dict[str, Any]:
+    from app.tools.order_lookup import preload_catalog
+
+    return preload_catalog()
+
+
+def _warm_graphs() -> Dict[str, Any]:
+    from app.graph.registry import get_finalize_graph, get_returns_graph
+
+    get_returns_graph()
+    get_finalize_graph()
+    return {}
+
+
+def _warm_retrieval() -> Dict[str, Any]:
+    from app.graph.nodes.retrieve_policy import policy_query
+    from app.rag.retriever import get_vectorstore, retrieve_policy_chunks_strict
+
+    # Embedding directly surfaces an unreachable Ollama, which retrieval would hide behind its fallback
+    get_vectorstore().embeddings.embed_query("warm-up")
+    reasons = _warmup_reasons()
+    for reason in reasons:
+        retrieve_policy_chunks_strict(policy_query(reason, None))
+    return {"queries": len(reasons)}
+
+
+def _warm_llm() -> Dict[str, Any]:
+    from app.llm.openrouter import get_llm
+
+    # ChatOpenAI instances share one httpx client per base URL, so this leaves a
+    # live connection in the pool that the first real completion reuses
+    client = get_llm("draft").root_client.with_options(max_retries=0, timeout=WARMUP_LLM_TIMEOUT)
+    client.models.list()
+    return {}
+
+
+_STEPS: Dict[str, Callable[[], Dict[str, Any]]] = {
+    "catalog": _warm_catalog,
+    "graphs": _warm_graphs,
+    "retrieval": _warm_retrieval,
+    "llm": _warm_llm,
+}
+
+
+# --- readiness ----------------------------------------------------------------------
+
+class _Readiness:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.ready = False
+        self.draining = False
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.steps: Dict[str, Dict[str, Any]] = {}
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "ready": self.ready and not self.draining,
+                "draining": self.draining,
+                "started_at": self.started_at,
+                "finished_at": self.finished_at,
+                "steps": {k: dict(v) for k, v in self.steps.items()},
+            }
+
+    def record(self, step: str, result: Dict[str, Any]) -> None:
+        with self._lock:
+            self.steps[step] = result
+
+
+_readiness = _Readiness()
+
+
+def run_warmup(steps: Optional[List[str]] = None) -> None:
+    """Run the warm-up steps in order, then mark the instance ready."""
+    _readiness.started_at = time.time()
+    for step in steps if steps is not None else WARMUP_STEPS:
+        fn = _STEPS.get(step)
+        if fn is None:
+            logger.warning("Unknown warm-up step %r (known: %s)", step, ", ".join(_STEPS))
+            continue
+        t0 = time.perf_counter()
+        try:
+            result = {"ok": True, **(fn() or {})}
+        except Exception as e:
+            logger.warning("Warm-up step %s failed: %s", step, e)
+            result = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+        result["ms"] = round((time.perf_counter() - t0) * 1000, 3)
+        _readiness.record(step, result)
+    _readiness.finished_at = time.time()
+    _readiness.ready = True
+
+
+def start() -> Optional[threading.Thread]:
+    """Kick off warm-up in the background (called from the app lifespan)."""
+    if not WARMUP_ENABLED:
+        _readiness.ready = True
+        return None
+    t = threading.Thread(target=run_warmup, name="warmup", daemon=True)
+    t.start()
+    return t
+
+
+def stop() -> None:
+    """Report not-ready from now on, so the load balancer drains this instance."""
+    _readiness.draining = True
+
+
+def readiness() -> Dict[str, Any]:
+    return _readiness.snapshot()
@@ -0,0 +1,394 @@
+"""
+Vectorized batch evaluation of the deterministic decision rules, for policy backtesting.
+
+Orders are flattened into a columnar NumPy layout once (the only per-item Python
+work), then the rule tree in decide.apply_decision_rules is evaluated for all rows
+at once with boolean masks. Large inputs are split into chunks and spread across a
+process pool.
+
+Usage (from backend/):
+  python -m app.graph.backtest --source sample --return-window-days 45
+  python -m app.graph.backtest --source cases --restocking-rate 0.10 --verify
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, fields
+from datetime import date, datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+
+from app.graph.nodes.decide import (
+    DEFAULT_RULES,
+    DecisionRules,
+    _classify,
+    _money,
+    _parse_dt,
+    _today_utc,
+    apply_decision_rules,
+)
+
+RESOLUTIONS = [
+    "reject",
+    "manual_review",
+    "return_for_refund",
+    "replacement",
+    "carrier_investigation",
+    "warranty_claim_pending",
+]
+_R = {name: i for i, name in enumerate(RESOLUTIONS)}
+
+_US_PER_DAY = 86_400 * 1_000_000
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+# Below this many records the pool costs more than it saves
+PARALLEL_THRESHOLD = int(os.getenv("BACKTEST_PARALLEL_THRESHOLD", "20000"))
+CHUNK_SIZE = int(os.getenv("BACKTEST_CHUNK_SIZE", "10000"))
+
+
+def _utc_us(dt: datetime) -> int:
+    # Exact integer microseconds, so day arithmetic matches timedelta.days
+    delta = dt.astimezone(timezone.utc) - _EPOCH
+    return (delta.days * 86_400 + delta.seconds) * 1_000_000 + delta.microseconds
+
+
+def build_columns(records: Iterable[Dict[str, Any]]) -> Dict[str, np.ndarray]:
+    """
+    Flatten records into per-order columns.
+
+    A record is {"order": enriched order, "reason", "customer_message",
+    "wants_store_credit", "photos_provided"} — the same inputs decide_node sees.
+    Intent comes from the keyword heuristics (no LLM in backtests).
+    Per-item reductions (subtotal, max price/qty, warranty inputs) are folded here
+    in the same order decide.py uses, so float results are bit-identical.
+    """
+    cols: Dict[str, List[Any]] = {k: [] for k in (
+        "is_preference", "is_shipping", "is_warranty", "is_vendor_error",
+        "non_returnable", "tracking_delivered", "has_delivered", "delivered_us", "delivered_ordinal",
+        "store_credit", "photos_provided", "subtotal", "max_unit_price", "max_qty",
+        "explicit_warranty_days", "has_apparel_default", "has_footwear_default",
+    )}
+
+    for rec in records:
+        order = rec.get("order") or {}
+        items = order.get("items", [])
+        cls = _classify(rec.get("reason") or "", rec.get("customer_message") or "")
+        products = [(i.get("product") or {}) for i in items]
+        delivered_at = _parse_dt(order.get("delivered_at"))
+
+        explicit = [p["warranty_days"] for p in products if isinstance(p.get("warranty_days"), int)]
+        defaults = [(p.get("category") or "").lower() for p in products if not isinstance(p.get("warranty_days"), int)]
+
+        cols["is_preference"].append(cls["is_preference"])
+        cols["is_shipping"].append(cls["is_shipping_issue"])
+        cols["is_warranty"].append(cls["is_warranty_issue"])
+        cols["is_vendor_error"].append(cls["is_vendor_error"])
+        cols["non_returnable"].append(any(
+            bool(p.get("is_final_sale")) or p.get("category") in ("gift_card", "custom_personalized") for p in products
+        ))
+        cols["tracking_delivered"].append((order.get("tracking_status") or "").lower() == "delivered")
+        cols["has_delivered"].append(delivered_at is not None)
+        cols["delivered_us"].append(_utc_us(delivered_at) if delivered_at else 0)
+        cols["delivered_ordinal"].append(delivered_at.date().toordinal() if delivered_at else 0)
+        cols["store_credit"].append(bool(order.get("is_gift")) or bool(rec.get("wants_store_credit")))
+        cols["photos_provided"].append(bool(rec.get("photos_provided")))
+        cols["subtotal"].append(sum(float(i.get("unit_price", 0.0)) * int(i.get("qty", 1)) for i in items))
+        cols["max_unit_price"].append(max((float(i.get("unit_price", 0.0)) for i in items), default=float("-inf")))
+        cols["max_qty"].append(max((int(i.get("qty", 1)) for i in items), default=0))
+        cols["explicit_warranty_days"].append(max(explicit) if explicit else -1)
+        cols["has_apparel_default"].append("apparel" in defaults)
+        cols["has_footwear_default"].append("footwear_accessories" in defaults)
+
+    out: Dict[str, np.ndarray] = {}
+    for k, v in cols.items():
+        if k in ("subtotal", "max_unit_price"):
+            out[k] = np.asarray(v, dtype=np.float64)
+        elif k in ("delivered_us", "delivered_ordinal", "max_qty", "explicit_warranty_days"):
+            out[k] = np.asarray(v, dtype=np.int64)
+        else:
+            out[k] = np.asarray(v, dtype=bool)
+    return out
+
+
+def decide_columns(cols: Dict[str, np.ndarray], rules: DecisionRules, today: datetime) -> Dict[str, np.ndarray]:
+    """Evaluate the rule tree for every row at once. Mirrors apply_decision_rules branch by branch."""
+    n = cols["subtotal"].shape[0]
+    days_since = (_utc_us(today) - cols["delivered_us"]) // _US_PER_DAY
+
+    pref, ship = cols["is_preference"], cols["is_shipping"]
+    warr = cols["is_warranty"] | cols["is_vendor_error"]
+    delivered = cols["has_delivered"]
+
+    # 0) reject, 1) shipping, 2) preference, 3) warranty, 4) fallback — first match wins
+    is_reject = pref & cols["non_returnable"]
+    is_ship = ~is_reject & ship
+    is_pref = ~is_reject & ~ship & pref
+    is_warr = ~is_reject & ~ship & ~pref & warr
+
+    pref_ok = is_pref & delivered & (days_since <= rules.return_window_days)
+
+    warranty_days = np.maximum(
+        cols["explicit_warranty_days"],
+        np.maximum(
+            np.where(cols["has_apparel_default"], rules.apparel_warranty_days, -1),
+            np.where(cols["has_footwear_default"], rules.footwear_accessories_warranty_days, -1),
+        ),
+    )
+    warranty_days = np.where(warranty_days < 0, 0, warranty_days)
+    warr_expired = is_warr & delivered & (warranty_days > 0) & (days_since > warranty_days)
+    warr_pending = is_warr & ~warr_expired & ~cols["photos_provided"]
+    warr_review = is_warr & ~warr_expired & cols["photos_provided"]
+
+    resolution = np.full(n, _R["manual_review"], dtype=np.int8)
+    resolution[is_reject] = _R["reject"]
+    resolution[is_ship & cols["tracking_delivered"]] = _R["carrier_investigation"]
+    resolution[is_ship & ~cols["tracking_delivered"]] = _R["replacement"]
+    resolution[pref_ok] = _R["return_for_refund"]
+    resolution[warr_pending] = _R["warranty_claim_pending"]
+
+    eligible = is_ship | pref_ok | warr_pending | warr_review
+    escalate = ~(is_reject | is_ship | pref_ok)
+
+    original_payment = pref_ok & ~cols["store_credit"]
+    return_fee = np.where(original_payment, rules.return_shipping_fee, 0.0)
+    restock_applies = pref_ok & (
+        (cols["max_unit_price"] > rules.high_value_threshold) | (cols["max_qty"] >= rules.bulk_qty)
+    )
+    restock_raw = cols["subtotal"] * rules.restocking_rate
+
+    return {
+        "resolution": resolution,
+        "eligible": eligible,
+        "escalate": escalate,
+        "requires_photos": warr_pending,
+        "requires_return": pref_ok,
+        "store_credit": pref_ok & cols["store_credit"],
+        "pref_ok": pref_ok,
+        "return_fee": return_fee,
+        "restock_applies": restock_applies,
+        "restock_raw": restock_raw,
+        "subtotal": cols["subtotal"],
+        "deadline_ordinal": cols["delivered_ordinal"] + rules.return_window_days,
+    }
+
+
+def _materialize(records: List[Dict[str, Any]], res: Dict[str, np.ndarray], rules: DecisionRules) -> List[Dict[str, Any]]:
+    """
+    Turn result columns back into decision dicts (same shape as decide_node).
+    Money rounding uses Python's round() (like decide._money) on the rows that need
+    it; np.round can differ from round() in the last cent.
+    """
+    out: List[Dict[str, Any]] = []
+    pref_ok = res["pref_ok"].tolist()
+    for i, rec in enumerate(records):
+        currency = (rec.get("order") or {}).get("currency", "USD")
+        d: Dict[str, Any] = {
+            "eligible": bool(res["eligible"][i]),
+            "resolution_type": RESOLUTIONS[res["resolution"][i]],
+            "refund_method": None,
+            "refund_estimate": None,
+            "currency": currency,
+            "requires_photos": bool(res["requires_photos"][i]),
+            "requires_return": bool(res["requires_return"][i]),
+            "deadline": None,
+            "fees": [],
+        }
+        if pref_ok[i]:
+            fees: List[Dict[str, Any]] = []
+            if not res["store_credit"][i]:
+                fees.append({"code": "return_shipping_fee", "amount": rules.return_shipping_fee, "currency": currency, "description": "Return shipping fee (deducted from refund)"})
+            if res["restock_applies"][i]:
+                fees.append({"code": "restocking_fee", "amount": _money(res["restock_raw"][i]), "currency": currency, "description": f"Restocking fee ({rules.restocking_rate:.0%})"})
+            d["refund_method"] = "store_credit" if res["store_credit"][i] else "original_payment"
+            d["fees"] = fees
+            d["refund_estimate"] = _money(max(float(res["subtotal"][i]) - sum(float(f["amount"]) for f in fees), 0.0))
+            d["deadline"] = date.fromordinal(int(res["deadline_ordinal"][i])).isoformat()
+        out.append({"decision": d, "escalate": bool(res["escalate"][i])})
+    return out
+
+
+def _run_chunk(records: List[Dict[str, Any]], rules: DecisionRules, today: datetime) -> List[Dict[str, Any]]:
+    cols = build_columns(records)
+    return _materialize(records, decide_columns(cols, rules, today), rules)
+
+
+def decide_batch(
+    records: List[Dict[str, Any]],
+    rules: DecisionRules = DEFAULT_RULES,
+    *,
+    today: Optional[datetime] = None,
+    workers: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Evaluate many records. Output order matches input order; each entry is
+    {"decision": ..., "escalate": ...}. Inputs over PARALLEL_THRESHOLD are split
+    into CHUNK_SIZE pieces and run on a process pool.
+    """
+    today = today or _today_utc()
+    if len(records) <= PARALLEL_THRESHOLD or workers == 1:
+        return _run_chunk(records, rules, today)
+
+    chunks = [records[i : i + CHUNK_SIZE] for i in range(0, len(records), CHUNK_SIZE)]
+    results: List[Dict[str, Any]] = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for part in pool.map(_run_chunk, chunks, [rules] * len(chunks), [today] * len(chunks)):
+            results.extend(part)
+    return results
+
+
+def diff_summary(baseline: List[Dict[str, Any]], candidate: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Aggregate impact of candidate rules vs baseline rules over the same records."""
+
+    def totals(rows: List[Dict[str, Any]]) -> Dict[str, Any]:
+        return {
+            "by_resolution": dict(Counter(r["decision"]["resolution_type"] for r in rows)),
+            "escalated": sum(1 for r in rows if r["escalate"]),
+            "eligible": sum(1 for r in rows if r["decision"]["eligible"]),
+            "refund_total": _money(sum(r["decision"]["refund_estimate"] or 0.0 for r in rows)),
+            "fees_total": _money(sum(float(f["amount"]) for r in rows for f in r["decision"]["fees"])),
+        }
+
+    transitions = Counter(
+        f'{b["decision"]["resolution_type"]} -> {c["decision"]["resolution_type"]}'
+        for b, c in zip(baseline, candidate)
+        if b["decision"]["resolution_type"] != c["decision"]["resolution_type"]
+    )
+    changed = sum(1 for b, c in zip(baseline, candidate) if b != c)
+    base, cand = totals(baseline), totals(candidate)
+    return {
+        "records": len(baseline),
+        "changed": changed,
+        "transitions": dict(transitions),
+        "baseline": base,
+        "candidate": cand,
+        "refund_total_delta": _money(cand["refund_total"] - base["refund_total"]),
+        "fees_total_delta": _money(cand["fees_total"] - base["fees_total"]),
+        "escalated_delta": cand["escalated"] - base["escalated"],
+    }
+
+
+def verify_against_decide(records: List[Dict[str, Any]], rules: DecisionRules, today: datetime) -> int:
+    """Compare the vectorized engine with the scalar rules decide_node runs. Returns #mismatches."""
+    batch = _run_chunk(records, rules, today)
+    mismatches = 0
+    for rec, got in zip(records, batch):
+        decision, escalate = apply_decision_rules(
+            rec.get("order") or {},
+            _classify(rec.get("reason") or "", rec.get("customer_message") or ""),
+            wants_store_credit=bool(rec.get("wants_store_credit")),
+            photos_provided=bool(rec.get("photos_provided")),
+            rules=rules,
+            today=today,
+        )
+        if got != {"decision": decision, "escalate": escalate}:
+            mismatches += 1
+    return mismatches
+
+
+# --- input sources ----------------------------------------------------------------
+
+SAMPLE_REQUESTS = [
+    # (reason, customer_message) — ResolveRequest examples plus the common chat phrasings
+    ("Doesn't fit", "Wrong size, I need to send it back."),
+    ("Doesn't fit", "Changed mind, can I get store credit?"),
+    ("Arrived damaged", "The box was crushed and the item arrived damaged."),
+    ("Wrong item sent", "You sent the wrong item."),
+    ("Quality issue", "My zipper broke after 2 weeks."),
+    ("Quality issue", "The color faded after one wash."),
+    ("Shipping issue", "Tracking says in transit for ten days, I think it's lost."),
+    ("General inquiry", "Question about my order."),
+]
+
+
+def sample_records() -> List[Dict[str, Any]]:
+    """Every sample order crossed with the canonical requests, with/without photos and store credit."""
+    from app.tools.order_lookup import DATA_DIR, enrich_order
+
+    with (DATA_DIR / "orders.json").open("r", encoding="utf-8") as f:
+        orders = [enrich_order(o) for o in json.load(f)]
+    return [
+        {
+            "order": order,
+            "reason": reason,
+            "customer_message": msg,
+            "wants_store_credit": credit,
+            "photos_provided": photos,
+        }
+        for order in orders
+        for reason, msg in SAMPLE_REQUESTS
+        for credit in (False, True)
+        for photos in (False, True)
+    ]
+
+
+def case_records() -> List[Dict[str, Any]]:
+    """Historical cases (stored enriched order facts + the original request)."""
+    from app.cases.codec import decode_json
+    from app.cases.db import get_conn, init_db
+
+    init_db()  # migrates older DBs (photos moved to case_photos)
+    with get_conn() as conn:
+        rows = conn.execute(
+            """
+            SELECT reason, customer_message, wants_store_credit, order_facts_json,
+                   EXISTS (SELECT 1 FROM case_photos p WHERE p.case_id = cases.case_id) AS has_photos
+            FROM cases
+            """
+        ).fetchall()
+    return [
+        {
+            "order": decode_json(r["order_facts_json"]) or {},
+            "reason": r["reason"],
+            "customer_message": r["customer_message"],
+            "wants_store_credit": bool(r["wants_store_credit"]),
+            "photos_provided": bool(r["has_photos"]),
+        }
+        for r in rows
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Backtest decision rule changes over many orders")
+    parser.add_argument("--source", choices=["sample", "cases"], default="sample")
+    parser.add_argument("--as-of", help="evaluation date (ISO, default now)")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--verify", action="store_true", help="check the engine against decide's scalar rules")
+    parser.add_argument("--out", help="write per-order candidate decisions as JSONL")
+    for f in fields(DecisionRules):
+        parser.add_argument(f"--{f.name.replace('_', '-')}", type=type(f.default), default=None)
+    args = parser.parse_args()
+
+    overrides = {f.name: getattr(args, f.name) for f in fields(DecisionRules) if getattr(args, f.name) is not None}
+    candidate_rules = DecisionRules(**{**asdict(DEFAULT_RULES), **overrides})
+
+    today = _today_utc()
+    if args.as_of:
+        today = datetime.fromisoformat(args.as_of)
+        if today.tzinfo is None:
+            today = today.replace(tzinfo=timezone.utc)
+
+    records = sample_records() if args.source == "sample" else case_records()
+
+    if args.verify:
+        for rules in {DEFAULT_RULES, candidate_rules}:
+            bad = verify_against_decide(records, rules, today)
+            print(f"verify {'default' if rules == DEFAULT_RULES else 'candidate'} rules: {len(records) - bad}/{len(records)} match")
+
+    baseline = decide_batch(records, DEFAULT_RULES, today=today, workers=args.workers)
+    candidate = decide_batch(records, candidate_rules, today=today, workers=args.workers)
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            for rec, row in zip(records, candidate):
+                f.write(json.dumps({"order_id": (rec.get("order") or {}).get("order_id"), **row}) + "\n")
+
+    print(json.dumps({"rules": overrides, **diff_summary(baseline, candidate)}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
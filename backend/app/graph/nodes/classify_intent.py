@@ -0,0 +1,13 @@
+from __future__ import annotations
+
+from app.graph.nodes.decide import classify_intent
+from app.graph.state import GraphState
+
+
+def classify_intent_node(state: GraphState) -> GraphState:
+    """
+    Model-based intent classification (LLM or local model, see decide.classify_intent),
+    split out of decide_node so it runs in parallel with fetch_order/retrieve_policy.
+    decide_node applies the confidence threshold and keyword fallback.
+    """
+    return {"intent": classify_intent(state.get("reason") or "", state.get("customer_message") or "")}
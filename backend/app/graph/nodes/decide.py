@@ -1,10 +1,14 @@
 from __future__ import annotations
 
+from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
 import json
+import os
 from typing import Any, Dict, List, Optional
 
+from app.core.keywords import match_categories
 from app.graph.state import GraphState
+from app.intent.model import local_classify
 from app.llm.openrouter import get_llm
 
 
@@ -26,7 +30,26 @@ def _days_between(a: datetime, b: datetime) -> int:
     return (a.astimezone(timezone.utc) - b.astimezone(timezone.utc)).days
 
 
-def _max_warranty_days(items: list[dict]) -> int:
+@dataclass(frozen=True)
+class DecisionRules:
+    """
+    Tunable numbers behind the deterministic policy rules. The defaults are the
+    live policy; the backtester evaluates alternatives against them.
+    """
+
+    return_window_days: int = 30
+    return_shipping_fee: float = 8.0
+    restocking_rate: float = 0.15
+    high_value_threshold: float = 500.0  # any unit price above this triggers restocking
+    bulk_qty: int = 5                    # any line qty at/above this triggers restocking
+    apparel_warranty_days: int = 90
+    footwear_accessories_warranty_days: int = 180
+
+
+DEFAULT_RULES = DecisionRules()
+
+
+def _max_warranty_days(items: list[dict], rules: DecisionRules = DEFAULT_RULES) -> int:
     """
     Uses enriched product data if present (products.json -> warranty_days).
     Falls back to policy defaults:
@@ -41,61 +64,41 @@ def _max_warranty_days(items: list[dict]) -> int:
         else:
             cat = (product.get("category") or "").lower()
             if cat == "apparel":
-                days.append(90)
+                days.append(rules.apparel_warranty_days)
             elif cat == "footwear_accessories":
-                days.append(180)
+                days.append(rules.footwear_accessories_warranty_days)
     return max(days) if days else 0
 
 
 def _classify(reason: str, msg: str) -> dict:
-    text = f"{reason} {msg}".lower()
-
-    is_preference = any(k in text for k in ["doesn't fit", "does not fit", "changed mind", "wrong size", "buyer remorse", "color looked"])
-
-    # Shipping/lost-in-transit family
-    is_shipping_issue = any(k in text for k in ["lost", "not arrived", "missing", "label created", "in transit", "delivered but missing"])
-
-    # Warranty/defect family (expanded)
-    is_warranty_issue = any(
-        k in text
-        for k in [
-            "warranty",
-            "defect",
-            "manufacturing",
-            "quality issue",
-            "quality",
-            "fading",
-            "color fades",
-            "colour fades",
-            "color faded",
-            "patch",
-            "hole",
-            "tear",
-            "ripped",
-            "rip",
-            "stain",
-            "frayed",
-            "stitching",
-            "pilling",
-            "seam",
-            "stitch",
-            "zipper",
-            "broken",
-            "hardware",
-        ]
-    )
-
-    # Vendor error (wrong/damaged on arrival) - separate from manufacturing defect
-    is_vendor_error = any(k in text for k in ["wrong item", "arrived damaged", "damaged on arrival", "item arrived damaged"])
+    hits = match_categories(f"{reason} {msg}")
 
     return {
-        "is_preference": is_preference,
-        "is_shipping_issue": is_shipping_issue,
-        "is_warranty_issue": is_warranty_issue,
-        "is_vendor_error": is_vendor_error,
+        "is_preference": "decide.preference" in hits,
+        "is_shipping_issue": "decide.shipping" in hits,
+        "is_warranty_issue": "decide.warranty" in hits,
+        "is_vendor_error": "decide.vendor_error" in hits,
     }
 
 
+def keyword_intent(reason: str, msg: str) -> str:
+    """
+    Collapse the keyword flags into a single intent label, in the same priority
+    order decide_node applies them (shipping, preference, warranty/vendor).
+    Used as the weak label when training the local intent model.
+    """
+    cls = _classify(reason, msg)
+    if cls["is_shipping_issue"]:
+        return "shipping_issue"
+    if cls["is_preference"]:
+        return "preference_return"
+    if cls["is_vendor_error"]:
+        return "vendor_error"
+    if cls["is_warranty_issue"]:
+        return "warranty_issue"
+    return "unknown"
+
+
 def _llm_classify(reason: str, msg: str) -> dict | None:
     """
     Use LLM to classify the issue type. Returns None on failure.
@@ -130,19 +133,42 @@ def _llm_classify(reason: str, msg: str) -> dict | None:
     return {"intent": intent, "confidence": confidence}
 
 
-def decide_node(state: GraphState) -> GraphState:
-    order = state.get("order") or {}
+def classify_intent(reason: str, msg: str) -> dict | None:
+    """
+    Pick the intent classifier from INTENT_CLASSIFIER:
+    - "llm" (default): OpenRouter call
+    - "local": NumPy model from app/intent (falls back to the LLM if no artifact)
+    - "keywords": skip model classification, keyword heuristics only
+    """
+    mode = os.getenv("INTENT_CLASSIFIER", "llm").strip().lower()
+    if mode == "keywords":
+        return None
+    if mode == "local":
+        local = local_classify(reason, msg)
+        if local is not None:
+            return local
+    return _llm_classify(reason, msg)
+
+
+def apply_decision_rules(
+    order: Dict[str, Any],
+    cls: Dict[str, bool],
+    *,
+    wants_store_credit: bool = False,
+    photos_provided: bool = False,
+    rules: DecisionRules = DEFAULT_RULES,
+    today: Optional[datetime] = None,
+) -> tuple[Dict[str, Any], bool]:
+    """
+    Deterministic policy rules, given the order and the intent flags.
+    Returns (decision, escalate). decide_node and the batch backtester
+    (app/graph/backtest.py) both go through here.
+    """
     items = order.get("items", [])
     currency = order.get("currency", "USD")
-
-    reason_raw = state.get("reason") or ""
-    msg = state.get("customer_message") or ""
-
-    wants_store_credit = bool(state.get("wants_store_credit"))
-    photos_provided = bool(state.get("photos_provided"))
+    today = today or _today_utc()
 
     delivered_at = _parse_dt(order.get("delivered_at"))
-    placed_at = _parse_dt(order.get("placed_at"))
 
     # computed values
     item_subtotal = sum(float(i.get("unit_price", 0.0)) * int(i.get("qty", 1)) for i in items)
@@ -152,19 +178,6 @@ def decide_node(state: GraphState) -> GraphState:
     any_gift_card = any(((i.get("product") or {}).get("category") == "gift_card") for i in items)
     any_custom = any(((i.get("product") or {}).get("category") == "custom_personalized") for i in items)
 
-    cls = _classify(reason_raw, msg)
-
-    # Try LLM classification first; fall back to keyword heuristics if uncertain
-    llm_cls = _llm_classify(reason_raw, msg)
-    if llm_cls and llm_cls.get("confidence", 0) >= 0.6:
-        intent = llm_cls.get("intent")
-        cls = {
-            "is_preference": intent == "preference_return",
-            "is_shipping_issue": intent == "shipping_issue",
-            "is_warranty_issue": intent == "warranty_issue",
-            "is_vendor_error": intent == "vendor_error",
-        }
-
     decision: Dict[str, Any] = {
         "eligible": False,
         "resolution_type": "manual_review",
@@ -180,9 +193,7 @@ def decide_node(state: GraphState) -> GraphState:
     # 0) Hard non-returnable rejects (only for preference returns)
     if cls["is_preference"] and (any_final_sale or any_gift_card or any_custom):
         decision.update(eligible=False, resolution_type="reject", requires_return=False)
-        state["decision"] = decision
-        state["escalate"] = False
-        return state
+        return decision, False
 
     # 1) Shipping issues
     tracking_status = (order.get("tracking_status") or "").lower()
@@ -191,24 +202,18 @@ def decide_node(state: GraphState) -> GraphState:
             decision.update(eligible=True, resolution_type="carrier_investigation", requires_return=False)
         else:
             decision.update(eligible=True, resolution_type="replacement", requires_return=False)
-        state["decision"] = decision
-        state["escalate"] = False
-        return state
+        return decision, False
 
     # 2) Preference return flow (30 days)
     if cls["is_preference"]:
         if not delivered_at:
             decision.update(eligible=False, resolution_type="manual_review")
-            state["decision"] = decision
-            state["escalate"] = True
-            return state
+            return decision, True
 
-        days_since_delivery = _days_between(_today_utc(), delivered_at)
-        if days_since_delivery > 30:
+        days_since_delivery = _days_between(today, delivered_at)
+        if days_since_delivery > rules.return_window_days:
             decision.update(eligible=False, resolution_type="manual_review")
-            state["decision"] = decision
-            state["escalate"] = True
-            return state
+            return decision, True
 
         decision.update(
             eligible=True,
@@ -219,34 +224,29 @@ def decide_node(state: GraphState) -> GraphState:
 
         fees: List[Dict[str, Any]] = []
         if decision["refund_method"] == "original_payment":
-            fees.append({"code": "return_shipping_fee", "amount": 8.0, "currency": currency, "description": "Return shipping fee (deducted from refund)"})
+            fees.append({"code": "return_shipping_fee", "amount": rules.return_shipping_fee, "currency": currency, "description": "Return shipping fee (deducted from refund)"})
 
-        high_value = any(float(i.get("unit_price", 0.0)) > 500.0 for i in items)
-        bulk = any(int(i.get("qty", 1)) >= 5 for i in items)
+        high_value = any(float(i.get("unit_price", 0.0)) > rules.high_value_threshold for i in items)
+        bulk = any(int(i.get("qty", 1)) >= rules.bulk_qty for i in items)
         if high_value or bulk:
-            fees.append({"code": "restocking_fee", "amount": _money(item_subtotal * 0.15), "currency": currency, "description": "Restocking fee (15%)"})
+            fees.append({"code": "restocking_fee", "amount": _money(item_subtotal * rules.restocking_rate), "currency": currency, "description": f"Restocking fee ({rules.restocking_rate:.0%})"})
 
         decision["fees"] = fees
         decision["refund_estimate"] = _money(max(item_subtotal - sum(float(f["amount"]) for f in fees), 0.0))
-        decision["deadline"] = (delivered_at.date() + timedelta(days=30)).isoformat()
-
-        state["decision"] = decision
-        state["escalate"] = False
-        return state
+        decision["deadline"] = (delivered_at.date() + timedelta(days=rules.return_window_days)).isoformat()
+        return decision, False
 
     # 3) Warranty/quality issues (HITL-friendly)
     if cls["is_warranty_issue"] or cls["is_vendor_error"]:
         # Warranty window check using product metadata
         if delivered_at:
-            warranty_days = _max_warranty_days(items)
+            warranty_days = _max_warranty_days(items, rules)
             if warranty_days > 0:
-                days_since_delivery = _days_between(_today_utc(), delivered_at)
+                days_since_delivery = _days_between(today, delivered_at)
                 if days_since_delivery > warranty_days:
                     # Out of warranty window -> manual review (don’t auto reject; keep it safe)
                     decision.update(eligible=False, resolution_type="manual_review", requires_photos=False, requires_return=False)
-                    state["decision"] = decision
-                    state["escalate"] = True
-                    return state
+                    return decision, True
 
         # If photos missing, open a warranty case and request evidence
         if not photos_provided:
@@ -256,9 +256,7 @@ def decide_node(state: GraphState) -> GraphState:
                 requires_photos=True,
                 requires_return=False,
             )
-            state["decision"] = decision
-            state["escalate"] = True  # create case + wait for photos/human review
-            return state
+            return decision, True  # create case + wait for photos/human review
 
         # Photos provided -> send to human review (do not auto-approve yet)
         decision.update(
@@ -267,12 +265,40 @@ def decide_node(state: GraphState) -> GraphState:
             requires_photos=False,
             requires_return=False,
         )
-        state["decision"] = decision
-        state["escalate"] = True
-        return state
+        return decision, True
 
     # 4) Default fallback
     decision.update(eligible=False, resolution_type="manual_review")
+    return decision, True
+
+
+def decide_node(state: GraphState) -> GraphState:
+    order = state.get("order") or {}
+
+    reason_raw = state.get("reason") or ""
+    msg = state.get("customer_message") or ""
+
+    cls = _classify(reason_raw, msg)
+
+    # Try model classification first; fall back to keyword heuristics if uncertain.
+    # In the returns graph the classify_intent branch has already run in parallel
+    # with fetch_order/retrieve_policy; classify here only when used standalone.
+    llm_cls = state["intent"] if "intent" in state else classify_intent(reason_raw, msg)
+    if llm_cls and llm_cls.get("confidence", 0) >= 0.6:
+        intent = llm_cls.get("intent")
+        cls = {
+            "is_preference": intent == "preference_return",
+            "is_shipping_issue": intent == "shipping_issue",
+            "is_warranty_issue": intent == "warranty_issue",
+            "is_vendor_error": intent == "vendor_error",
+        }
+
+    decision, escalate = apply_decision_rules(
+        order,
+        cls,
+        wants_store_credit=bool(state.get("wants_store_credit")),
+        photos_provided=bool(state.get("photos_provided")),
+    )
     state["decision"] = decision
-    state["escalate"] = True
-    return state
\ No newline at end of file
+    state["escalate"] = escalate
+    return state
@@ -2,6 +2,7 @@ from __future__ import annotations
 from app.llm.openrouter import get_llm
 from langchain_core.messages import SystemMessage, HumanMessage
 
+from app.graph.reply_templates import render_template_reply, template_types
 from app.graph.state import GraphState
 
 
@@ -16,6 +17,15 @@ Hard rules:
 """
 
 def draft_node(state: GraphState) -> GraphState:
+    # Deterministic outcomes: render from a template and skip the LLM entirely
+    decision = state.get("decision", {})
+    if decision.get("resolution_type") in template_types():
+        reply = render_template_reply(state.get("order_id"), decision)
+        if reply:
+            state["customer_reply"] = reply
+            state["reply_source"] = "template"
+            return state
+
     profile = state.get("llm_profile", "draft")
 
     if profile == "repair":
@@ -33,8 +43,6 @@ def draft_node(state: GraphState) -> GraphState:
         [f"SOURCE: {d.metadata.get('source')}\n{d.page_content}" for d in docs]
     )
 
-    decision = state.get("decision", {})
-
     prompt = f"""
 Order ID: {state.get("order_id")}
 Reason: {state.get("reason")}
@@ -51,4 +59,5 @@ Write the customer reply.
 
     resp = llm.invoke([SystemMessage(content=SYSTEM), HumanMessage(content=prompt)])
     state["customer_reply"] = resp.content.strip()
+    state["reply_source"] = "llm"
     return state
\ No newline at end of file
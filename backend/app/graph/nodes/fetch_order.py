@@ -11,19 +11,16 @@ def fetch_order_node(state: GraphState) -> GraphState:
     Why this node exists:
     - Keeps data/tool access out of `decide.py`
     - Makes the graph modular and easier to extend later (real DB/Shopify/etc.)
+
+    Runs as a parallel branch of the returns graph, so it returns only the keys
+    it owns (order/errors/escalate) instead of the whole state.
     """
     order_id = state.get("order_id")
     if not order_id:
-        state.setdefault("errors", []).append("missing_order_id")
-        state["escalate"] = True
-        return state
+        return {"errors": (state.get("errors") or []) + ["missing_order_id"], "escalate": True}
 
     order = get_order(order_id)
     if not order:
-        state.setdefault("errors", []).append("order_not_found")
-        state["escalate"] = True
-        state["order"] = {}
-        return state
+        return {"errors": (state.get("errors") or []) + ["order_not_found"], "escalate": True, "order": {}}
 
-    state["order"] = enrich_order(order)
-    return state
\ No newline at end of file
+    return {"order": enrich_order(order)}
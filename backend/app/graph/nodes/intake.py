@@ -1,5 +1,5 @@
 from __future__ import annotations
-import re
+from app.core.keywords import match_categories
 from app.graph.state import GraphState
 
 
@@ -10,7 +10,8 @@ def _estimate_complexity(reason: str, msg: str) -> int:
     3 = shipping missing / gift logic / fees
     5 = warranty/defect, late return, mixed conditions, policy conflicts
     """
-    text = f"{reason} {msg}".lower()
+    text = f"{reason} {msg}"
+    hits = match_categories(text)
 
     score = 1
 
@@ -19,16 +20,11 @@ def _estimate_complexity(reason: str, msg: str) -> int:
         score += 1
 
     # harder intents
-    hard_keywords = [
-        "warranty", "defect", "manufacturing", "pilling", "zipper", "seam",
-        "late", "outside window", "holiday", "investigation", "delivered but missing",
-        "wrong item", "damaged", "carrier", "chargeback"
-    ]
-    if any(k in text for k in hard_keywords):
+    if "intake.hard" in hits:
         score += 2
 
     # mixed signals (contains both return and shipping/warranty terms)
-    if ("return" in text or "refund" in text) and ("lost" in text or "missing" in text or "warranty" in text):
+    if "intake.return_refund" in hits and "intake.lost_missing_warranty" in hits:
         score += 1
 
     return max(1, min(5, score))
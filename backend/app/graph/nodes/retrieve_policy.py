@@ -2,14 +2,23 @@ from app.rag.retriever import retrieve_policy_chunks_strict
 from app.graph.state import GraphState
 
 
-def retrieve_policy_node(state: GraphState) -> GraphState:
+def policy_query(reason: str, customer_message: str | None) -> str:
+    """
+    Retrieval query for a case. The message is part of it (and of the cache
+    key), so the warm-up's reason-only queries are cache hits only for cases
+    sent without a customer_message.
+    """
     query_parts = [
-        f"Reason: {state.get('reason','')}",
-        f"Customer message: {state.get('customer_message') or ''}",
+        f"Reason: {reason or ''}",
+        f"Customer message: {customer_message or ''}",
         "Task: Determine eligibility and required steps according to policy.",
     ]
-    query = "\n".join([p for p in query_parts if p.strip()])
+    return "\n".join([p for p in query_parts if p.strip()])
+
+
+def retrieve_policy_node(state: GraphState) -> GraphState:
+    query = policy_query(state.get("reason", ""), state.get("customer_message"))
 
     docs = retrieve_policy_chunks_strict(query)
-    state["policy_docs"] = docs
-    return state
\ No newline at end of file
+    # Partial update: this node runs in parallel with fetch_order/classify_intent
+    return {"policy_docs": docs}
\ No newline at end of file
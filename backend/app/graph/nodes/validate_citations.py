@@ -1,24 +1,17 @@
 from __future__ import annotations
+from typing import Any, Dict, List
+
 from app.graph.state import GraphState
 
 
-def validate_citations_node(state: GraphState) -> GraphState:
+def check_reply(decision: Dict[str, Any], reply: str) -> List[str]:
     """
-    Fast validation (no LLM):
-    - Ensure reply aligns with decision flags
-    - Ensure we have at least 1 policy doc cited
-    - If it fails, retry drafting once with quality model
+    Reply-content checks against the decision flags. Shared with the templated
+    reply renderer, which must pass the same checks as an LLM draft.
     """
-    decision = state.get("decision") or {}
-    reply = (state.get("customer_reply") or "").lower()
-    docs = state.get("policy_docs") or []
-
+    reply = reply.lower()
     errors = []
 
-    # Must have some retrieved policy context
-    if len(docs) == 0:
-        errors.append("no_policy_docs")
-
     # If photos required, reply must ask for photos
     if decision.get("requires_photos") is True:
         if "photo" not in reply and "picture" not in reply:
@@ -36,6 +29,28 @@ def validate_citations_node(state: GraphState) -> GraphState:
     if rt == "carrier_investigation" and ("investigation" not in reply and "carrier" not in reply):
         errors.append("missing_investigation_language")
 
+    return errors
+
+
+def validate_citations_node(state: GraphState) -> GraphState:
+    """
+    Fast validation (no LLM):
+    - Ensure reply aligns with decision flags
+    - Ensure we have at least 1 policy doc cited (LLM drafts only: a templated
+      reply doesn't cite policy, and redrafting it can't fix missing docs)
+    - If it fails, retry drafting once with quality model
+    """
+    decision = state.get("decision") or {}
+    docs = state.get("policy_docs") or []
+
+    errors = []
+
+    # Must have some retrieved policy context
+    if len(docs) == 0 and state.get("reply_source") != "template":
+        errors.append("no_policy_docs")
+
+    errors.extend(check_reply(decision, state.get("customer_reply") or ""))
+
     # Retry logic: one retry max
     state.setdefault("retries", 0)
     if errors and state["retries"] < 1:
@@ -44,8 +59,8 @@ def validate_citations_node(state: GraphState) -> GraphState:
         state["llm_profile"] = "draft"
         state["draft_max_tokens"] = 220
         state["errors"] = (state.get("errors") or []) + errors
-        # Signal graph to loop (returns_graph will use this)
-        state["escalate"] = False
+        # Signal graph to loop (returns_graph will use this).
+        # escalate is decide's call and must survive the redraft.
         state["_needs_redraft"] = True  # internal flag
         return state
 
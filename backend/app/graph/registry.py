@@ -0,0 +1,46 @@
+"""
+Compiled graphs shared by every router.
+
+Graphs are built on first use rather than at import: building one imports
+LangGraph, LangChain and the Chroma/Ollama/OpenAI clients, which dominated app
+startup. Each graph is compiled once per process; the lock keeps concurrent
+first requests from compiling it twice.
+"""
+from __future__ import annotations
+
+import threading
+from typing import Any, Callable, Dict
+
+_lock = threading.Lock()
+_graphs: Dict[str, Any] = {}
+
+
+def _get(name: str, build: Callable[[], Any]) -> Any:
+    graph = _graphs.get(name)
+    if graph is None:
+        with _lock:
+            graph = _graphs.get(name)
+            if graph is None:
+                graph = _graphs[name] = build()
+    return graph
+
+
+def _build_returns():
+    from app.graph.returns_graph import build_graph
+
+    return build_graph()
+
+
+def _build_finalize():
+    from app.graph.finalize_graph import build_finalize_graph
+
+    return build_finalize_graph()
+
+
+def get_returns_graph():
+    """Intake -> decide -> draft pipeline used by /resolve and chat."""
+    return _get("returns", _build_returns)
+
+
+def get_finalize_graph():
+    return _get("finalize", _build_finalize)
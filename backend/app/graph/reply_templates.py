@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import os
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from app.graph.nodes.validate_citations import check_reply
+
+# Resolution types whose reply is fully determined by the decision: templated by default
+DEFAULT_TEMPLATE_TYPES = "reject,carrier_investigation,replacement,warranty_claim_pending"
+
+
+def template_types() -> Set[str]:
+    """
+    Resolution types answered from a template instead of the draft LLM.
+    DRAFT_TEMPLATE_TYPES is a comma-separated list; set it empty to always use the LLM.
+    """
+    raw = os.getenv("DRAFT_TEMPLATE_TYPES", DEFAULT_TEMPLATE_TYPES)
+    return {t.strip() for t in raw.split(",") if t.strip()}
+
+
+def _money(amount: Optional[float], currency: str) -> str:
+    if amount is None:
+        return ""
+    return f"${amount:.2f}" if currency == "USD" else f"{amount:.2f} {currency}"
+
+
+def _reject(ctx: Dict[str, Any]) -> List[str]:
+    return [
+        f"Unfortunately, {ctx['order']} includes an item that isn't eligible for a return "
+        "(final sale, gift cards and personalized items can't be returned), so we're unable to accept it back.",
+        "If something is wrong with the item itself, reply here and describe the issue and we'll take a look.",
+    ]
+
+
+def _carrier_investigation(ctx: Dict[str, Any]) -> List[str]:
+    return [
+        f"Sorry your package for {ctx['order']} hasn't turned up. Tracking shows it as delivered, "
+        "so we're opening an investigation with the carrier.",
+        "We'll update you here as soon as we hear back, usually within a few business days.",
+    ]
+
+
+def _replacement(ctx: Dict[str, Any]) -> List[str]:
+    return [
+        f"We're sorry that {ctx['order']} hasn't arrived. We'll send a replacement at no cost to you.",
+        "You'll receive a new tracking number by email once it ships.",
+    ]
+
+
+def _warranty_claim_pending(ctx: Dict[str, Any]) -> List[str]:
+    return [
+        f"Thanks for reporting the issue with {ctx['order']}. We've opened a warranty claim for you.",
+    ]
+
+
+def _return_for_refund(ctx: Dict[str, Any]) -> List[str]:
+    lines = [f"Good news: {ctx['order']} is eligible for a return."]
+    if ctx["deadline"]:
+        lines.append(f"Please send the item(s) back by {ctx['deadline']} using the prepaid return label we'll email you.")
+    if ctx["refund_estimate"] is not None:
+        method = "store credit" if ctx["refund_method"] == "store_credit" else "your original payment method"
+        lines.append(f"Your estimated refund is {_money(ctx['refund_estimate'], ctx['currency'])}, issued to {method} once we receive the return.")
+    return lines
+
+
+def _manual_review(ctx: Dict[str, Any]) -> List[str]:
+    return [
+        f"Thanks for the details on {ctx['order']}. A specialist will review your request "
+        "and follow up here shortly.",
+    ]
+
+
+def _generic(ctx: Dict[str, Any]) -> List[str]:
+    return [f"Thanks for reaching out about {ctx['order']}. We've recorded your request and will follow up here."]
+
+
+_BODIES: Dict[str, Callable[[Dict[str, Any]], List[str]]] = {
+    "reject": _reject,
+    "carrier_investigation": _carrier_investigation,
+    "replacement": _replacement,
+    "warranty_claim_pending": _warranty_claim_pending,
+    "return_for_refund": _return_for_refund,
+    "manual_review": _manual_review,
+    "exchange": _generic,
+    "refund_no_return": _generic,
+}
+
+
+def render_template_reply(order_id: Optional[str], decision: Dict[str, Any]) -> Optional[str]:
+    """
+    Render the customer reply for a decision without calling the LLM.
+
+    Instructions the validator looks for (photo request, return instructions) are
+    appended from the decision flags rather than baked into each template, and the
+    result is run through check_reply; None means "use the LLM instead".
+    """
+    rt = decision.get("resolution_type")
+    body = _BODIES.get(rt or "")
+    if body is None:
+        return None
+
+    currency = decision.get("currency") or "USD"
+    ctx = {
+        # How the templates refer to the order; "your order" when the ID is unknown
+        "order": f"order {order_id}" if order_id else "your order",
+        "currency": currency,
+        "deadline": decision.get("deadline"),
+        "refund_estimate": decision.get("refund_estimate"),
+        "refund_method": decision.get("refund_method"),
+    }
+    lines = ["Hi there,"] + body(ctx)
+
+    for fee in decision.get("fees") or []:
+        label = fee.get("description") or fee.get("code")
+        amount = _money(float(fee.get("amount") or 0.0), fee.get("currency") or currency)
+        suffix = "" if "deducted" in label.lower() else " (deducted from the refund)"
+        lines.append(f"{label}{suffix}: {amount}.")
+
+    if decision.get("requires_photos"):
+        order_ref = f"your order ID ({order_id})" if order_id else "your order ID"
+        lines.append(
+            f"To continue, please upload a clear photo of the defect and include {order_ref} "
+            "and the item SKU. Once we have the photos, our team will review your claim."
+        )
+
+    if decision.get("requires_return") and rt != "return_for_refund":
+        lines.append("Please return the item using the prepaid label we'll email you.")
+
+    reply = "\n".join(lines)
+    if check_reply(decision, reply):
+        return None
+    return reply
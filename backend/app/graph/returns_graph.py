@@ -1,9 +1,11 @@
 from langgraph.graph import StateGraph, END
 
+from app.core.tracing import trace_node
 from app.graph.state import GraphState
 from app.graph.nodes.intake import intake_node
 from app.graph.nodes.fetch_order import fetch_order_node
 from app.graph.nodes.retrieve_policy import retrieve_policy_node
+from app.graph.nodes.classify_intent import classify_intent_node
 from app.graph.nodes.decide import decide_node
 from app.graph.nodes.draft import draft_node
 from app.graph.nodes.validate_citations import validate_citations_node
@@ -12,17 +14,23 @@ from app.graph.nodes.validate_citations import validate_citations_node
 def build_graph():
     g = StateGraph(GraphState)
 
-    g.add_node("intake", intake_node)
-    g.add_node("fetch_order", fetch_order_node)
-    g.add_node("retrieve_policy", retrieve_policy_node)
-    g.add_node("decide", decide_node)
-    g.add_node("draft", draft_node)
-    g.add_node("validate", validate_citations_node)
+    g.add_node("intake", trace_node("returns", "intake", intake_node))
+    g.add_node("fetch_order", trace_node("returns", "fetch_order", fetch_order_node))
+    g.add_node("retrieve_policy", trace_node("returns", "retrieve_policy", retrieve_policy_node))
+    g.add_node("classify_intent", trace_node("returns", "classify_intent", classify_intent_node))
+    g.add_node("decide", trace_node("returns", "decide", decide_node))
+    g.add_node("draft", trace_node("returns", "draft", draft_node))
+    g.add_node("validate", trace_node("returns", "validate", validate_citations_node))
 
     g.set_entry_point("intake")
+
+    # Order lookup, policy retrieval (embedding call) and intent classification
+    # (LLM call) are independent: fan out after intake, join before decide.
     g.add_edge("intake", "fetch_order")
-    g.add_edge("fetch_order", "retrieve_policy")
-    g.add_edge("retrieve_policy", "decide")
+    g.add_edge("intake", "retrieve_policy")
+    g.add_edge("intake", "classify_intent")
+    g.add_edge(["fetch_order", "retrieve_policy", "classify_intent"], "decide")
+
     g.add_edge("decide", "draft")
     g.add_edge("draft", "validate")
 
@@ -1,8 +1,10 @@
 from __future__ import annotations
-from typing import Any, Dict, List, Optional, TypedDict, Literal
+from typing import Annotated, Any, Dict, List, Optional, TypedDict, Literal
 
 from langchain_core.documents import Document
 
+from app.core.ledger import merge_audit
+
 
 LLMProfile = Literal["draft", "finalize", "repair"]
 
@@ -21,6 +23,9 @@ class GraphState(TypedDict, total=False):
     # RAG
     policy_docs: List[Document]
 
+    # Intent classification (LLM/local model); None = not confident, use keywords
+    intent: Optional[Dict[str, Any]]
+
     # Routing / model selection
     complexity: int               # 1..5
     llm_profile: LLMProfile       # draft/finalize/repair
@@ -30,9 +35,20 @@ class GraphState(TypedDict, total=False):
     # Outputs
     decision: Dict[str, Any]
     customer_reply: str
-    audit: Dict[str, Any]
+    reply_source: str             # "template" | "llm"
+    # Cost/latency ledger: each node returns only its own entries, merged here
+    audit: Annotated[Dict[str, Any], merge_audit]
+
+    # Finalize (human-in-the-loop) inputs/outputs
+    human_decision: Optional[str]
+    human_notes: Optional[str]
+    photo_urls: List[str]
+    force_json_only: bool
+    force_minimal_prompt: bool
+    finalize_output_raw: str
 
     # Control
     escalate: bool
     errors: List[str]
-    retries: int
\ No newline at end of file
+    retries: int
+    _needs_redraft: bool          # set by validate to loop back to draft
\ No newline at end of file
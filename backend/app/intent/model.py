@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+import json
+import os
+import re
+import zlib
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+from dotenv import load_dotenv
+
+load_dotenv()
+
+INTENTS = ["preference_return", "shipping_issue", "warranty_issue", "vendor_error", "unknown"]
+
+DEFAULT_MODEL_PATH = "app/storage/intent_model.npz"
+
+_TOKEN_RE = re.compile(r"[a-z0-9']+")
+
+
+def _bucket(feature: str, n_bits: int) -> int:
+    # crc32 is stable across processes (unlike hash()), so artifacts stay valid
+    return zlib.crc32(feature.encode("utf-8")) & ((1 << n_bits) - 1)
+
+
+def featurize(reason: str, msg: str, n_bits: int) -> np.ndarray:
+    """
+    Hashed bag of n-grams for one (reason, message) pair:
+    - word unigrams + bigrams over the combined text (same text decide.py classifies)
+    - char 4-grams inside each word (helps with "faded"/"fading", typos)
+    - reason tokens again with an "r:" prefix (reasons are short categorical strings)
+    """
+    text = f"{reason} {msg}".lower()
+    words = _TOKEN_RE.findall(text)
+
+    feats: List[str] = []
+    feats.extend(f"w:{w}" for w in words)
+    feats.extend(f"b:{a} {b}" for a, b in zip(words, words[1:]))
+    for w in words:
+        padded = f"<{w}>"
+        if len(padded) > 4:
+            feats.extend(f"c:{padded[i:i + 4]}" for i in range(len(padded) - 3))
+    feats.extend(f"r:{w}" for w in _TOKEN_RE.findall((reason or "").lower()))
+
+    if not feats:
+        return np.zeros(0, dtype=np.int64)
+    return np.fromiter((_bucket(f, n_bits) for f in feats), dtype=np.int64, count=len(feats))
+
+
+@dataclass
+class IntentModel:
+    """
+    Multinomial logistic regression over hashed n-gram features.
+    Weights are a dense (2**n_bits, n_labels) matrix; inference sums the rows of
+    the active features, so cost is O(#features) rather than O(vocabulary).
+    """
+
+    weights: np.ndarray
+    bias: np.ndarray
+    labels: List[str]
+    n_bits: int
+    meta: Dict
+
+    def predict_proba(self, reason: str, msg: str) -> np.ndarray:
+        idx = featurize(reason, msg, self.n_bits)
+        logits = self.bias + (self.weights[idx].sum(axis=0) if idx.size else 0.0)
+        logits = logits - logits.max()
+        p = np.exp(logits)
+        return p / p.sum()
+
+    def classify(self, reason: str, msg: str) -> dict:
+        """Same contract as decide._llm_classify: {"intent": ..., "confidence": 0-1}."""
+        p = self.predict_proba(reason, msg)
+        i = int(p.argmax())
+        return {"intent": self.labels[i], "confidence": float(p[i])}
+
+    def save(self, path: str | Path) -> None:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # float16 keeps the artifact small; precision loss is irrelevant for argmax
+        np.savez_compressed(
+            path,
+            weights=self.weights.astype(np.float16),
+            bias=self.bias.astype(np.float32),
+            meta=np.array(json.dumps({**self.meta, "labels": self.labels, "n_bits": self.n_bits})),
+        )
+
+    @classmethod
+    def load(cls, path: str | Path) -> "IntentModel":
+        with np.load(path, allow_pickle=False) as data:
+            meta = json.loads(str(data["meta"]))
+            return cls(
+                weights=data["weights"].astype(np.float32),
+                bias=data["bias"].astype(np.float32),
+                labels=list(meta.pop("labels")),
+                n_bits=int(meta.pop("n_bits")),
+                meta=meta,
+            )
+
+
+def train(
+    examples: Sequence[tuple[str, str]],
+    labels: Sequence[str],
+    *,
+    sample_weight: Optional[Sequence[float]] = None,
+    n_bits: int = 14,
+    epochs: int = 200,
+    lr: float = 0.5,
+    l2: float = 1e-4,
+) -> IntentModel:
+    """
+    Full-batch gradient descent on softmax cross-entropy.
+    The training sets we have are small (hundreds to a few thousand rows), so a
+    plain NumPy loop over a sparse (indices, row-ids) layout is plenty.
+    """
+    label_index = {lab: i for i, lab in enumerate(INTENTS)}
+    n, k, dim = len(examples), len(INTENTS), 1 << n_bits
+
+    feats = [featurize(r, m, n_bits) for (r, m) in examples]
+    cols = np.concatenate(feats) if feats else np.zeros(0, dtype=np.int64)
+    rows = np.repeat(np.arange(n), [f.size for f in feats])
+
+    y = np.zeros((n, k), dtype=np.float32)
+    y[np.arange(n), [label_index[lab] for lab in labels]] = 1.0
+    sw = np.ones(n, dtype=np.float32) if sample_weight is None else np.asarray(sample_weight, dtype=np.float32)
+    sw = sw / sw.sum()
+
+    w = np.zeros((dim, k), dtype=np.float32)
+    b = np.zeros(k, dtype=np.float32)
+
+    for _ in range(epochs):
+        logits = np.zeros((n, k), dtype=np.float32)
+        np.add.at(logits, rows, w[cols])
+        logits += b
+        logits -= logits.max(axis=1, keepdims=True)
+        p = np.exp(logits)
+        p /= p.sum(axis=1, keepdims=True)
+
+        g = (p - y) * sw[:, None]
+        gw = np.zeros_like(w)
+        np.add.at(gw, cols, g[rows])
+        w -= lr * (gw + l2 * w)
+        b -= lr * g.sum(axis=0)
+
+    return IntentModel(weights=w, bias=b, labels=list(INTENTS), n_bits=n_bits, meta={"n_examples": n})
+
+
+def model_path() -> Path:
+    return Path(os.getenv("INTENT_MODEL_PATH", DEFAULT_MODEL_PATH))
+
+
+@lru_cache(maxsize=1)
+def load_intent_model() -> Optional[IntentModel]:
+    """Load the persisted artifact once per process. Returns None if it hasn't been trained yet."""
+    path = model_path()
+    if not path.exists():
+        return None
+    try:
+        return IntentModel.load(path)
+    except Exception:
+        return None
+
+
+def local_classify(reason: str, msg: str) -> dict | None:
+    """Drop-in for decide._llm_classify backed by the local model (None if no artifact)."""
+    model = load_intent_model()
+    if model is None:
+        return None
+    return model.classify(reason, msg)
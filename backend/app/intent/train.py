@@ -0,0 +1,133 @@
+"""
+Train the local intent model from historical cases + keyword seed phrases.
+
+Usage (from backend/):
+  python -m app.intent.train                 # keyword labels only
+  python -m app.intent.train --llm-labels    # also label cases with the LLM and report agreement
+"""
+import argparse
+import random
+import time
+from typing import List, Optional, Tuple
+
+from app.cases.db import get_conn
+from app.core.keywords import (
+    PREFERENCE_KEYWORDS,
+    SHIPPING_KEYWORDS,
+    VENDOR_ERROR_KEYWORDS,
+    WARRANTY_KEYWORDS,
+)
+from app.graph.nodes.decide import _llm_classify, keyword_intent
+from app.intent.model import model_path, train
+
+# Same examples the API advertises for ResolveRequest.reason, plus catch-alls
+SEED_REASONS = ["", "Doesn't fit", "Arrived damaged", "Wrong item sent", "Quality issue", "Shipping issue", "General inquiry"]
+UNKNOWN_SEEDS = ["hello", "question about my order", "can you help me", "i need assistance", "other"]
+
+# Reviewed cases carry more signal than unreviewed ones: a human read them
+HUMAN_DECISION_WEIGHT = {"approved": 1.0, "denied": 1.0, "more_info_requested": 0.75}
+UNREVIEWED_WEIGHT = 0.5
+SEED_WEIGHT = 0.25
+
+
+def _seed_examples() -> List[Tuple[str, str]]:
+    phrases = PREFERENCE_KEYWORDS + SHIPPING_KEYWORDS + WARRANTY_KEYWORDS + VENDOR_ERROR_KEYWORDS + UNKNOWN_SEEDS
+    return [(reason, f"my item {p}".strip()) for p in phrases for reason in SEED_REASONS]
+
+
+def _case_examples() -> List[Tuple[str, str, Optional[str]]]:
+    try:
+        with get_conn() as conn:
+            rows = conn.execute("SELECT reason, customer_message, human_decision FROM cases").fetchall()
+    except Exception:
+        return []
+    return [(r["reason"] or "", r["customer_message"] or "", r["human_decision"]) for r in rows]
+
+
+def _accuracy(model, examples, labels) -> float:
+    if not examples:
+        return float("nan")
+    hits = sum(1 for (r, m), y in zip(examples, labels) if model.classify(r, m)["intent"] == y)
+    return hits / len(examples)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Train the local intent classifier")
+    parser.add_argument("--llm-labels", action="store_true", help="label historical cases with the LLM (costs one call per case)")
+    parser.add_argument("--holdout", type=float, default=0.2, help="fraction of cases held out for evaluation")
+    parser.add_argument("--n-bits", type=int, default=14, help="hashed feature space size (2**n)")
+    parser.add_argument("--epochs", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=13)
+    parser.add_argument("--out", default=str(model_path()))
+    args = parser.parse_args()
+
+    cases = _case_examples()
+    rng = random.Random(args.seed)
+    rng.shuffle(cases)
+    n_holdout = int(len(cases) * args.holdout)
+    holdout, train_cases = cases[:n_holdout], cases[n_holdout:]
+
+    # Optional LLM reference labels (same 0.6 confidence bar decide_node uses)
+    llm_labels = {}
+    if args.llm_labels:
+        for reason, msg, _hd in cases:
+            res = _llm_classify(reason, msg)
+            if res and res["confidence"] >= 0.6:
+                llm_labels[(reason, msg)] = res["intent"]
+
+    examples: List[Tuple[str, str]] = []
+    labels: List[str] = []
+    weights: List[float] = []
+
+    for reason, msg in _seed_examples():
+        examples.append((reason, msg))
+        labels.append(keyword_intent(reason, msg))
+        weights.append(SEED_WEIGHT)
+
+    for reason, msg, human_decision in train_cases:
+        examples.append((reason, msg))
+        labels.append(llm_labels.get((reason, msg)) or keyword_intent(reason, msg))
+        weights.append(HUMAN_DECISION_WEIGHT.get(human_decision or "", UNREVIEWED_WEIGHT))
+
+    t0 = time.perf_counter()
+    model = train(examples, labels, sample_weight=weights, n_bits=args.n_bits, epochs=args.epochs)
+    train_s = time.perf_counter() - t0
+
+    eval_examples = [(r, m) for (r, m, _hd) in holdout] or examples
+    kw_labels = [keyword_intent(r, m) for (r, m) in eval_examples]
+    model.meta.update(
+        trained_at=time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        n_cases=len(cases),
+        holdout_acc_keywords=_accuracy(model, eval_examples, kw_labels),
+    )
+
+    print("✅ Intent model trained")
+    print(f"- Cases: {len(cases)} (train {len(train_cases)}, holdout {len(holdout)})")
+    print(f"- Training examples (incl. seeds): {len(examples)}")
+    print(f"- Training time: {train_s:.2f}s")
+    label_set = "holdout" if holdout else "training set (no holdout cases)"
+    print(f"- Accuracy vs keyword labels on {label_set}: {model.meta['holdout_acc_keywords']:.3f}")
+
+    if args.llm_labels:
+        llm_eval = [((r, m), llm_labels[(r, m)]) for (r, m) in eval_examples if (r, m) in llm_labels]
+        if llm_eval:
+            acc = _accuracy(model, [e for e, _ in llm_eval], [y for _, y in llm_eval])
+            kw_acc = sum(1 for (r, m), y in llm_eval if keyword_intent(r, m) == y) / len(llm_eval)
+            model.meta["holdout_acc_llm"] = acc
+            print(f"- Accuracy vs LLM labels ({len(llm_eval)} confident): {acc:.3f} (keyword baseline {kw_acc:.3f})")
+        else:
+            print("- Accuracy vs LLM labels: n/a (no confident LLM labels in eval set)")
+
+    # Inference latency on the eval set
+    t0 = time.perf_counter()
+    for r, m in eval_examples:
+        model.classify(r, m)
+    per_call_us = (time.perf_counter() - t0) / max(1, len(eval_examples)) * 1e6
+    print(f"- Inference: {per_call_us:.0f} µs/call")
+
+    model.save(args.out)
+    print(f"- Saved to: {args.out}")
+
+
+if __name__ == "__main__":
+    main()
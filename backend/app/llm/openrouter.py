@@ -1,10 +1,19 @@
 from __future__ import annotations
 
 import os
-from typing import Literal, Optional
+import time
+from typing import TYPE_CHECKING, Any, Dict, Literal, Optional
+from uuid import UUID
 
 from dotenv import load_dotenv
-from langchain_openai import ChatOpenAI
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+
+from app.core.metrics import LLM_CALL_SECONDS, LLM_CALLS, LLM_TOKENS
+from app.core.tracing import record_llm_call
+
+if TYPE_CHECKING:
+    from langchain_openai import ChatOpenAI
 
 load_dotenv()
 
@@ -18,12 +27,67 @@ def _require_env(name: str) -> str:
     raise RuntimeError(f"Missing required environment variable: {name}")
 
 
+def _token_usage(response: LLMResult) -> tuple[int, int]:
+    usage = (response.llm_output or {}).get("token_usage") or {}
+    if usage:
+        return int(usage.get("prompt_tokens") or 0), int(usage.get("completion_tokens") or 0)
+    for gens in response.generations:
+        for g in gens:
+            meta = getattr(getattr(g, "message", None), "usage_metadata", None) or {}
+            if meta:
+                return int(meta.get("input_tokens") or 0), int(meta.get("output_tokens") or 0)
+    return 0, 0
+
+
+class LLMUsageCallback(BaseCallbackHandler):
+    """Reports latency and token usage of each LLM call to the audit ledger, trace span and /metrics."""
+
+    run_inline = True
+
+    def __init__(self, profile: str, model: str):
+        self.profile = profile
+        self.model = model
+        self._started: Dict[UUID, float] = {}
+
+    def on_chat_model_start(self, serialized: Dict[str, Any], messages: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        self._started[run_id] = time.perf_counter()
+
+    def on_llm_start(self, serialized: Dict[str, Any], prompts: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        self._started[run_id] = time.perf_counter()
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs: Any) -> None:
+        started = self._started.pop(run_id, None)
+        latency_ms = (time.perf_counter() - started) * 1000 if started else 0.0
+        input_tokens, output_tokens = _token_usage(response)
+        record_llm_call(
+            profile=self.profile,
+            model=self.model,
+            input_tokens=input_tokens,
+            output_tokens=output_tokens,
+            latency_ms=latency_ms,
+        )
+        LLM_CALLS.inc(self.profile, "ok")
+        LLM_CALL_SECONDS.observe(latency_ms / 1000, self.profile)
+        LLM_TOKENS.inc(self.profile, "input", amount=input_tokens)
+        LLM_TOKENS.inc(self.profile, "output", amount=output_tokens)
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        started = self._started.pop(run_id, None)
+        latency_ms = (time.perf_counter() - started) * 1000 if started else 0.0
+        record_llm_call(profile=self.profile, model=self.model, latency_ms=latency_ms, ok=False)
+        LLM_CALLS.inc(self.profile, "error")
+        LLM_CALL_SECONDS.observe(latency_ms / 1000, self.profile)
+
+
 def get_llm(
     profile: LLMProfile,
     *,
     temperature: Optional[float] = None,
     max_tokens: Optional[int] = None,
 ) -> ChatOpenAI:
+    # langchain_openai (and the openai SDK under it) is slow to import; load it on first use
+    from langchain_openai import ChatOpenAI
+
     api_key = _require_env("OPENROUTER_API_KEY")
     base_url = os.getenv("OPENROUTER_BASE_URL", "https://openrouter.ai/api/v1")
     model = os.getenv("OPENROUTER_MODEL", "x-ai/grok-4.1-fast")
@@ -47,4 +111,5 @@ def get_llm(
             "HTTP-Referer": app_url,
             "X-Title": app_name,
         },
+        callbacks=[LLMUsageCallback(profile, model)],
     )
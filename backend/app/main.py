@@ -1,4 +1,6 @@
 import os
+from contextlib import asynccontextmanager
+
 from dotenv import load_dotenv
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
@@ -6,13 +8,30 @@ from fastapi.middleware.cors import CORSMiddleware
 from app.api.routes import router as core_router
 from app.api.cases_routes import router as cases_router
 from app.api.chat_routes import router as chat_router
-from app.api.finalize_routes import router as finalize_router
+from app.api.finalize_routes import finalize_jobs, router as finalize_router
+from app.api.ops_routes import router as ops_router
 from app.cases.db import init_db
 from app.chat.db import init_chat_db
+from app.core.metrics import MetricsMiddleware
+from app.core.profiler import ProfilerMiddleware
+from app.core import warmup
+from app.core.tracing import RequestIdMiddleware
 
 load_dotenv()
 
-app = FastAPI(title="Ecommerce Returns & Refunds Copilot", version="0.1.0")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Resumes finalize jobs a previous process left queued/running
+    finalize_jobs.start()
+    # Background, so /health is up at once; /ready reports 200 when it's done
+    warmup.start()
+    yield
+    warmup.stop()
+    finalize_jobs.stop(timeout=30)
+
+
+app = FastAPI(title="Ecommerce Returns & Refunds Copilot", version="0.1.0", lifespan=lifespan)
 
 origins = os.getenv("CORS_ORIGINS", "")
 allow_origins = [o.strip().rstrip("/") for o in origins.split(",") if o.strip()] or ["*"]
@@ -23,13 +42,24 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Request-ID", "X-Profile-Id", "ETag"],
 )
+app.add_middleware(RequestIdMiddleware)
+app.add_middleware(MetricsMiddleware)
+app.add_middleware(ProfilerMiddleware)
 
 # Init SQLite tables
 init_db()
 init_chat_db()
 
+# Load the local intent model up front so the first request doesn't pay for it
+if os.getenv("INTENT_CLASSIFIER", "llm").strip().lower() == "local":
+    from app.intent.model import load_intent_model
+
+    load_intent_model()
+
 app.include_router(core_router)
 app.include_router(cases_router)
 app.include_router(chat_router)
-app.include_router(finalize_router) 
\ No newline at end of file
+app.include_router(finalize_router)
+app.include_router(ops_router) 
\ No newline at end of file
@@ -1,14 +1,23 @@
 import os
 import re
+import time
 from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Optional, Tuple
+from typing import TYPE_CHECKING, List, Optional, Tuple
 
 from dotenv import load_dotenv
-from langchain_ollama import OllamaEmbeddings
-from langchain_chroma import Chroma
 from langchain_core.documents import Document
 
+from app.core.cache import LRUCache
+from app.core.keywords import match_categories
+from app.core.ledger import record_retrieval
+from app.core.metrics import RETRIEVAL_SECONDS
+from app.core.tracing import record_cache
+
+if TYPE_CHECKING:
+    from langchain_chroma import Chroma
+
 
 @dataclass(frozen=True)
 class RetrieverConfig:
@@ -41,8 +50,16 @@ def load_retriever_config_from_env() -> RetrieverConfig:
     )
 
 
-def get_vectorstore(cfg: Optional[RetrieverConfig] = None) -> Chroma:
-    cfg = cfg or load_retriever_config_from_env()
+def get_vectorstore(cfg: Optional[RetrieverConfig] = None) -> "Chroma":
+    """One client per config, reused across requests (building it opens the store and an HTTP client)."""
+    return _vectorstore(cfg or load_retriever_config_from_env())
+
+
+@lru_cache(maxsize=4)
+def _vectorstore(cfg: RetrieverConfig) -> "Chroma":
+    # chromadb + the Ollama client are slow to import; only load them when a store is built
+    from langchain_chroma import Chroma
+    from langchain_ollama import OllamaEmbeddings
 
     embeddings = OllamaEmbeddings(
         model=cfg.embed_model,
@@ -61,22 +78,22 @@ def _route_source_filter(query: str) -> Optional[str]:
     Very simple rule-based router.
     Returns a regex to match Document.metadata['source'] if we want to restrict.
     """
-    q = query.lower()
+    hits = match_categories(query)
 
     # Warranty-related queries
-    if any(k in q for k in ["warranty", "defect", "manufacturing", "photo", "pilling", "zipper", "seam"]):
+    if "route.warranty" in hits:
         return r"warranty\.md$"
 
     # Shipping / delivery related
-    if any(k in q for k in ["lost", "in transit", "label created", "delivered but missing", "carrier"]):
+    if "route.shipping" in hits:
         return r"shipping_sla\.md$"
 
     # Returns related
-    if any(k in q for k in ["return", "exchange", "doesn't fit", "changed mind", "buyer remorse"]):
+    if "route.returns" in hits:
         return r"returns\.md$"
 
     # Refund/compensation related
-    if any(k in q for k in ["refund", "store credit", "gift", "restocking", "shipping fee", "inspection"]):
+    if "route.refunds" in hits:
         return r"refunds\.md$"
 
     return None
@@ -132,12 +149,11 @@ def _rerank_for_query(query: str, doc: Document, distance: float) -> float:
     We keep it deterministic and cheap.
     """
     text = (doc.page_content or "").lower()
-    q = query.lower()
 
     bonus = 0.0
 
     # If the question is about photos/evidence, prefer chunks containing those words
-    if "photo" in q or "evidence" in q or "proof" in q:
+    if "rerank.evidence" in match_categories(query):
         if "photo" in text:
             bonus -= 0.08
         if "evidence" in text or "verification" in text:
@@ -152,17 +168,43 @@ def _rerank_for_query(query: str, doc: Document, distance: float) -> float:
     return distance + bonus
 
 
+def _observe_retrieval(path: str, elapsed_s: float) -> None:
+    RETRIEVAL_SECONDS.observe(elapsed_s, path)
+    record_retrieval(path, elapsed_s * 1000)
+
+
+# Identical queries (same reason + message) skip the embedding call and vector search.
+# RETRIEVAL_CACHE_SIZE=0 disables it.
+_retrieval_cache = LRUCache(int(os.getenv("RETRIEVAL_CACHE_SIZE", "256")))
+
+
 def retrieve_policy_chunks_strict(
     query: str,
     *,
     cfg: Optional[RetrieverConfig] = None,
 ) -> List[Document]:
     cfg = cfg or load_retriever_config_from_env()
+    hit, docs = _retrieval_cache.get((query, cfg))
+    record_cache("retrieval", hit)
+    if hit:
+        return list(docs)
+
+    docs, path = _retrieve_policy_chunks_uncached(query, cfg)
+    # Fallback results mean the vector store was unreachable; don't pin them
+    if path == "vector":
+        _retrieval_cache.put((query, cfg), docs)
+    return list(docs)
+
+
+def _retrieve_policy_chunks_uncached(query: str, cfg: RetrieverConfig) -> Tuple[List[Document], str]:
+    t0 = time.perf_counter()
     try:
         results = similarity_search_with_scores(query, cfg=cfg)
     except Exception:
         # Fallback to filesystem policy retrieval when embeddings are unavailable
-        return _fallback_retrieve_policy_chunks(query, cfg=cfg)
+        docs = _fallback_retrieve_policy_chunks(query, cfg=cfg)
+        _observe_retrieval("fallback", time.perf_counter() - t0)
+        return docs, "fallback"
 
     # Optional routing: filter candidates to a specific policy file.
     if cfg.enable_routing:
@@ -181,4 +223,5 @@ def retrieve_policy_chunks_strict(
     # Rerank using lexical hints
     reranked = sorted(filtered, key=lambda pair: _rerank_for_query(query, pair[0], pair[1]))
 
-    return [d for (d, _s) in reranked[: cfg.max_results]]
\ No newline at end of file
+    _observe_retrieval("vector", time.perf_counter() - t0)
+    return [d for (d, _s) in reranked[: cfg.max_results]], "vector"
\ No newline at end of file
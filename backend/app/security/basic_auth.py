@@ -1,3 +1,5 @@
+import base64
+import binascii
 import os
 import secrets
 
@@ -31,3 +33,19 @@ def require_reviewer_basic_auth(
             detail="Unauthorized",
             headers={"WWW-Authenticate": "Basic"},
         )
+
+
+def is_reviewer_authorization(header: str | None) -> bool:
+    """Check a raw `Authorization: Basic ...` header value (for middleware, outside FastAPI deps)."""
+    if not header or not REVIEWER_BASIC_USER or not REVIEWER_BASIC_PASS:
+        return False
+    scheme, _, param = header.partition(" ")
+    if scheme.lower() != "basic":
+        return False
+    try:
+        username, _, password = base64.b64decode(param.strip()).decode("utf-8").partition(":")
+    except (binascii.Error, UnicodeDecodeError):
+        return False
+    username_ok = secrets.compare_digest(username, REVIEWER_BASIC_USER)
+    password_ok = secrets.compare_digest(password, REVIEWER_BASIC_PASS)
+    return username_ok and password_ok
@@ -0,0 +1,88 @@
+import json
+
+import pytest
+
+from app.cases import codec, db as cases_db
+from app.cases.codec import CASE_JSON_COMPRESS_MIN_BYTES, MARKER, decode_json, encode_json, is_encoded
+from app.cases.reencode import reencode
+from app.core.sqlite import SQLiteDatabase
+
+SMALL = {"order_id": "ORD-1", "items": [{"sku": "ACC-BAG-930", "qty": 1}]}
+LARGE = {"items": [{"sku": f"ACC-BAG-{i}", "title": "Leather tote", "qty": 1} for i in range(40)]}
+NON_ASCII = {"note": "Größe passt nicht, Zürich → 東京 ✓", "items": LARGE["items"]}
+
+
+def test_small_value_stays_text():
+    assert len(json.dumps(SMALL)) < CASE_JSON_COMPRESS_MIN_BYTES
+    raw = encode_json(SMALL)
+    assert isinstance(raw, str)
+    assert decode_json(raw) == SMALL
+
+
+@pytest.mark.parametrize("value", [LARGE, NON_ASCII])
+def test_large_value_is_compressed(value):
+    raw = encode_json(value)
+    assert isinstance(raw, bytes) and raw.startswith(MARKER)
+    assert len(raw) < len(json.dumps(value))
+    assert decode_json(raw) == value
+
+
+def test_non_ascii_text_below_threshold():
+    value = {"note": "Größe ✓"}
+    assert decode_json(encode_json(value)) == value
+
+
+def test_legacy_text_rows_decode():
+    # Rows written before compression: json.dumps with its defaults, any size
+    for value in (SMALL, LARGE, NON_ASCII):
+        assert decode_json(json.dumps(value)) == value
+    assert decode_json(None) is None
+    assert decode_json("") is None
+
+
+def test_compression_off(monkeypatch):
+    monkeypatch.setattr(codec, "CASE_JSON_COMPRESS", False)
+    raw = encode_json(LARGE)
+    assert isinstance(raw, str)
+    assert decode_json(raw) == LARGE
+
+
+@pytest.fixture
+def cases_conn(tmp_path, monkeypatch):
+    db = SQLiteDatabase(tmp_path / "cases.db", "cases")
+    monkeypatch.setattr(cases_db, "_db", db)
+    cases_db.init_db()
+    yield db.connection()
+    db.close()
+
+
+def _insert(conn, case_id: str, order_facts, citations) -> None:
+    with conn:
+        conn.execute(
+            """
+            INSERT INTO cases (case_id, order_id, reason, status, created_at, order_facts_json, policy_citations_json)
+            VALUES (?, 'ORD-1', 'Quality issue', 'closed', '2025-01-01T00:00:00+00:00', ?, ?)
+            """,
+            (case_id, order_facts, citations),
+        )
+
+
+def _columns(conn) -> list:
+    return [tuple(r) for r in conn.execute("SELECT case_id, order_facts_json, policy_citations_json FROM cases ORDER BY case_id")]
+
+
+def test_reencode_rewrites_legacy_rows_once(cases_conn):
+    _insert(cases_conn, "legacy", json.dumps(LARGE), json.dumps(NON_ASCII))
+    _insert(cases_conn, "small", json.dumps(SMALL), None)
+    _insert(cases_conn, "encoded", encode_json(LARGE), json.dumps(SMALL))
+
+    stats = reencode(batch_size=2)
+    assert stats["values_rewritten"] == 2
+    rows = {case_id: (facts, citations) for case_id, facts, citations in _columns(cases_conn)}
+    assert all(is_encoded(v) for v in rows["legacy"])
+    assert [decode_json(v) for v in rows["legacy"]] == [LARGE, NON_ASCII]
+    assert rows["small"] == (json.dumps(SMALL), None)
+
+    before = _columns(cases_conn)
+    assert reencode(batch_size=2)["values_rewritten"] == 0
+    assert _columns(cases_conn) == before
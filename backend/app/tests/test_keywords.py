@@ -0,0 +1,49 @@
+import random
+
+import pytest
+
+from app.core.keywords import CATEGORIES, KeywordMatcher, match_categories
+
+PHRASES = sorted({p for phrases in CATEGORIES.values() for p in phrases})
+
+
+def _substring_scan(text: str) -> set:
+    """What the per-helper `any(k in text for k in phrases)` checks returned."""
+    low = text.lower()
+    return {cat for cat, phrases in CATEGORIES.items() if any(k in low for k in phrases)}
+
+
+def _texts():
+    yield ""
+    yield "hi"
+    yield "My ZIPPER broke after 2 weeks"
+    yield "Where is my package? Tracking says in transit since Monday"
+    yield "I changed my mind, the shoes are too small"
+    # Every phrase on its own, upper-cased and glued between other words
+    for p in PHRASES:
+        yield p
+        yield f"xx{p.upper()}yy"
+    # Phrases run together, so one can start inside or at the end of another
+    rng = random.Random(27)
+    for _ in range(500):
+        words = rng.sample(PHRASES, rng.randint(2, 6))
+        cut = [w[: rng.randint(1, len(w))] if rng.random() < 0.3 else w for w in words]
+        yield rng.choice(["", " ", "-"]).join(cut)
+
+
+@pytest.mark.parametrize("category", sorted(CATEGORIES))
+def test_each_phrase_finds_its_category(category):
+    for phrase in CATEGORIES[category]:
+        assert category in match_categories(f"so, {phrase.title()}!")
+
+
+def test_matches_substring_scans():
+    for text in _texts():
+        assert match_categories(text) == _substring_scan(text), text
+
+
+def test_phrase_that_prefixes_another():
+    matcher = KeywordMatcher({"short": ["rip"], "long": ["ripped"], "other": ["pedal"]})
+    assert matcher.match("It RIPPED") == {"short", "long"}
+    assert matcher.match("ripedal") == {"short", "other"}
+    assert matcher.match("ri") == frozenset()
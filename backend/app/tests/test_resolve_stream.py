@@ -0,0 +1,54 @@
+import asyncio
+import tracemalloc
+from typing import Iterable, List
+
+from app.api.routes import RESOLVE_STREAM_MAX_LINE_BYTES, _ndjson_lines
+
+CHUNK = 64 * 1024
+
+
+class _Body:
+    """Just enough of a Request for _ndjson_lines: a body delivered in chunks."""
+
+    def __init__(self, chunks: Iterable[bytes]):
+        self._chunks = chunks
+
+    async def stream(self):
+        for chunk in self._chunks:
+            yield chunk
+
+
+def _lines(chunks: Iterable[bytes]) -> List[bytes]:
+    async def collect():
+        return [line async for line in _ndjson_lines(_Body(chunks))]
+
+    return asyncio.run(collect())
+
+
+def test_lines_split_across_chunks():
+    assert _lines([b'{"a":', b'1}\n{"b"', b":2}\n\n", b'{"c":3}']) == [b'{"a":1}', b'{"b":2}', b"", b'{"c":3}']
+
+
+def test_oversized_line_is_cut_and_its_tail_dropped():
+    big = b"x" * (3 * RESOLVE_STREAM_MAX_LINE_BYTES)
+    body = big + b"\n" + b'{"ok":1}\n'
+    lines = _lines(body[i : i + 1000] for i in range(0, len(body), 1000))
+    assert lines == [big[: RESOLVE_STREAM_MAX_LINE_BYTES + 1], b'{"ok":1}']
+
+
+def test_oversized_line_without_newline_stays_flat():
+    total = 32 * 1024 * 1024
+
+    def chunks():
+        for _ in range(total // CHUNK):
+            yield b"x" * CHUNK
+
+    tracemalloc.start()
+    try:
+        lines = _lines(chunks())
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    assert [len(line) for line in lines] == [RESOLVE_STREAM_MAX_LINE_BYTES + 1]
+    # A line's worth of buffer plus a chunk or two, not the 32 MiB input
+    assert peak < 4 * (RESOLVE_STREAM_MAX_LINE_BYTES + CHUNK)
@@ -0,0 +1,55 @@
+import pytest
+
+from app.core.sqlite import SQLiteDatabase
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = SQLiteDatabase(tmp_path / "nest.db", "test")
+    with db.connection() as conn:
+        conn.execute("CREATE TABLE t (x TEXT)")
+    yield db
+    db.close()
+
+
+def _committed(db: SQLiteDatabase) -> list:
+    """Rows another connection can see, i.e. what has been committed."""
+    other = db.connect()
+    try:
+        return [r["x"] for r in other.execute("SELECT x FROM t ORDER BY x")]
+    finally:
+        other.close()
+
+
+def test_inner_block_does_not_commit(db):
+    conn = db.connection()
+    with conn:
+        with conn:
+            conn.execute("INSERT INTO t VALUES ('inner')")
+        assert _committed(db) == []
+    assert _committed(db) == ["inner"]
+
+
+def test_outer_error_rolls_back_inner_writes(db):
+    conn = db.connection()
+    with pytest.raises(RuntimeError):
+        with conn:
+            with conn:
+                conn.execute("INSERT INTO t VALUES ('inner')")
+            raise RuntimeError("outer fails")
+    assert _committed(db) == []
+    assert not conn.in_transaction
+
+
+def test_caught_inner_error_undoes_only_inner_writes(db):
+    conn = db.connection()
+    with conn:
+        conn.execute("INSERT INTO t VALUES ('outer')")
+        try:
+            with conn:
+                conn.execute("INSERT INTO t VALUES ('inner')")
+                raise RuntimeError("inner fails")
+        except RuntimeError:
+            pass
+        conn.execute("INSERT INTO t VALUES ('outer, after')")
+    assert _committed(db) == ["outer", "outer, after"]
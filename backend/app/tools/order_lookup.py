@@ -1,4 +1,6 @@
+import copy
 import json
+from functools import lru_cache
 from pathlib import Path
 from typing import Any, Dict, Optional
 
@@ -13,6 +15,29 @@ def _load_json(path: Path) -> Any:
         return json.load(f)
 
 
+@lru_cache(maxsize=8)
+def _load_index(path: Path, key: str, mtime_ns: int) -> Dict[str, Dict[str, Any]]:
+    # mtime_ns is part of the cache key so edits to the JSON files are picked up
+    index: Dict[str, Dict[str, Any]] = {}
+    for row in _load_json(path):
+        # first occurrence wins, like the linear scans this replaces
+        index.setdefault(row.get(key), row)
+    return index
+
+
+def _index(path: Path, key: str) -> Dict[str, Dict[str, Any]]:
+    """Rows of a JSON list file keyed by `key`, parsed once per file version."""
+    return _load_index(path, key, path.stat().st_mtime_ns)
+
+
+def preload_catalog() -> Dict[str, int]:
+    """Parse both catalog files into the shared indexes ahead of the first lookup."""
+    return {
+        "orders": len(_index(ORDERS_PATH, "order_id")),
+        "products": len(_index(PRODUCTS_PATH, "sku")),
+    }
+
+
 def normalize_order_id(order_id: str) -> str:
     """Normalize order ID to ORD-xxxxx format."""
     raw = (order_id or "").strip()
@@ -29,24 +54,16 @@ def normalize_order_id(order_id: str) -> str:
 
 
 def get_order(order_id: str) -> Optional[Dict[str, Any]]:
-    orders = _load_json(ORDERS_PATH)
-    normalized = normalize_order_id(order_id)
-    for o in orders:
-        if o.get("order_id") == normalized:
-            return o
+    orders = _index(ORDERS_PATH, "order_id")
     # Fallback: try raw input if normalization didn't help
-    for o in orders:
-        if o.get("order_id") == order_id:
-            return o
-    return None
+    o = orders.get(normalize_order_id(order_id)) or orders.get(order_id)
+    # Callers own the returned dict (the index is shared across requests)
+    return copy.deepcopy(o) if o is not None else None
 
 
 def get_product_by_sku(sku: str) -> Optional[Dict[str, Any]]:
-    products = _load_json(PRODUCTS_PATH)
-    for p in products:
-        if p.get("sku") == sku:
-            return p
-    return None
+    p = _index(PRODUCTS_PATH, "sku").get(sku)
+    return copy.deepcopy(p) if p is not None else None
 
 
 def enrich_order(order: Dict[str, Any]) -> Dict[str, Any]:
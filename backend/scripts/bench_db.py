@@ -0,0 +1,145 @@
+"""
+Benchmark: SQLite time of a chat turn, per-call connections vs. persistent ones.
+
+A turn that opens a case makes the same repository calls as POST /chat/{id}:
+session case lookup, user message, history read, create_case, assistant
+message (plus a new session). Both modes run the real repository functions
+against their own temporary database pre-filled with historical cases:
+
+- per-call:   the previous get_conn() (connect + mkdir per call, rollback journal)
+- persistent: app.core.sqlite (thread-local connection, WAL, synchronous=NORMAL)
+
+Run from backend/:
+  python -m scripts.bench_db
+  python -m scripts.bench_db --turns 500 --seed-cases 5000 --threads 8
+"""
+import argparse
+import os
+import sqlite3
+import statistics
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Callable, List
+
+_tmp = tempfile.TemporaryDirectory()
+# Before the app modules read it at import
+os.environ["DB_PATH"] = str(Path(_tmp.name) / "persistent.db")
+
+from app.cases import db as cases_db, repo as cases_repo  # noqa: E402
+from app.chat import db as chat_db, repo as chat_repo  # noqa: E402
+from app.core.metrics import timed_connection  # noqa: E402
+
+LEGACY_PATH = Path(_tmp.name) / "per_call.db"
+
+
+def _per_call_get_conn(db: str) -> Callable[[], sqlite3.Connection]:
+    def get_conn() -> sqlite3.Connection:
+        LEGACY_PATH.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(LEGACY_PATH, factory=timed_connection(db))
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    return get_conn
+
+
+def _use_per_call() -> None:
+    cases_db.get_conn = cases_repo.get_conn = _per_call_get_conn("cases")
+    chat_db.get_conn = chat_repo.get_conn = _per_call_get_conn("chat")
+    with cases_db.get_conn() as conn:
+        conn.execute("PRAGMA journal_mode = DELETE")
+
+
+def _case_payload(session_id: str, i: int, status: str) -> dict:
+    return {
+        "session_id": session_id,
+        "order_id": f"ORD-{10001 + i % 14}",
+        "reason": "Quality issue",
+        "customer_message": "The stitching came apart after a week of normal use.",
+        "status": status,
+        "ai_decision": {"resolution_type": "warranty_claim_pending", "confidence": 0.82, "rationale": "x" * 300},
+        "ai_audit": {"nodes": [{"graph": "returns", "node": n, "duration_ms": 12.5} for n in ("intake", "decide", "draft")]},
+        "policy_citations": [{"source": "warranty.md", "quote": "y" * 200}],
+        "order_facts": {"order_id": f"ORD-{10001 + i % 14}", "items": [{"sku": "SKU-1", "qty": 1, "price": 59.0}]},
+    }
+
+
+def _seed(n: int) -> None:
+    for i in range(n):
+        session_id = chat_repo.create_session()
+        chat_repo.add_message(session_id, "user", "My jacket zipper broke")
+        case_id = cases_repo.create_case(_case_payload(session_id, i, "ready_for_human_review"))
+        chat_repo.add_message(session_id, "assistant", "Thanks, a reviewer will look at it.", case_id=case_id)
+        if i % 2:
+            cases_repo.set_final_outcome(case_id, "Approved.", [])
+
+
+def _turn(i: int) -> None:
+    session_id = chat_repo.create_session()
+    cases_repo.get_session_case(session_id)
+    chat_repo.add_message(session_id, "user", "The sole came off my sneaker, order ORD-10003")
+    chat_repo.get_messages(session_id)
+    case_id = cases_repo.create_case(_case_payload(session_id, i, "needs_customer_photos"))
+    chat_repo.add_message(session_id, "assistant", "Please upload a photo of the defect.", case_id=case_id)
+
+
+def _run(turns: int, threads: int) -> List[float]:
+    timings: List[float] = []
+    lock = threading.Lock()
+    per_thread = max(1, turns // threads)
+
+    def worker(offset: int) -> None:
+        mine = []
+        for i in range(per_thread):
+            t0 = time.perf_counter()
+            _turn(offset + i)
+            mine.append((time.perf_counter() - t0) * 1000)
+        with lock:
+            timings.extend(mine)
+
+    workers = [threading.Thread(target=worker, args=(k * per_thread,)) for k in range(threads)]
+    t0 = time.perf_counter()
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    wall = time.perf_counter() - t0
+    timings.append(wall)  # last element: wall time, popped by the caller
+    return timings
+
+
+def _report(label: str, timings: List[float]) -> float:
+    wall = timings.pop()
+    timings.sort()
+    p95 = timings[int(len(timings) * 0.95) - 1]
+    print(
+        f"{label:<11} mean {statistics.mean(timings):7.3f} ms  p50 {statistics.median(timings):7.3f} ms  "
+        f"p95 {p95:7.3f} ms  throughput {len(timings) / wall:8.1f} turns/s"
+    )
+    return statistics.mean(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--turns", type=int, default=300)
+    parser.add_argument("--seed-cases", type=int, default=2000)
+    parser.add_argument("--threads", type=int, default=1, help="concurrent turns (like the request threadpool)")
+    args = parser.parse_args()
+
+    results = {}
+    for mode in ("persistent", "per-call"):
+        if mode == "per-call":
+            _use_per_call()
+        cases_db.init_db()
+        chat_db.init_chat_db()
+        _seed(args.seed_cases)
+        _run(min(20, args.turns), 1)  # warm caches / connections
+        results[mode] = _report(mode, _run(args.turns, args.threads))
+
+    print(f"Speedup (mean turn DB time): {results['per-call'] / results['persistent']:.1f}x")
+    _tmp.cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+Benchmark: GET /cases/search query time at scale.
+
+Fills a temporary database with synthetic cases (inserted through the real
+schema, so the FTS triggers index them), then times search_cases for a mix of
+queries: a SKU plus a word, a selective phrase, a common word ranked by
+relevance, the same sorted by newest, a prefix, a deep relevance page and
+status filters (on a word and on a prefix).
+
+Run from backend/:
+  python -m scripts.bench_search
+  python -m scripts.bench_search --cases 1000000 --max-ms 50
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+from typing import Optional
+
+_tmp = tempfile.TemporaryDirectory()
+# Before the app modules read it at import
+os.environ["DB_PATH"] = str(Path(_tmp.name) / "search.db")
+
+from app.cases import db as cases_db, repo as cases_repo  # noqa: E402
+from app.cases.search import fts_query, sku_text  # noqa: E402
+
+REASONS = ["Doesn't fit", "Arrived damaged", "Wrong item sent", "Quality issue", "Changed my mind", "Late delivery"]
+PRODUCTS = ["bag", "jacket", "boots", "watch", "lamp", "headphones", "backpack", "kettle", "sneakers", "wallet"]
+PROBLEMS = [
+    "the zipper broke after two days",
+    "strap came loose on the first use",
+    "the color is different from the photos",
+    "it arrived with a cracked case",
+    "the sole is peeling off",
+    "battery does not hold a charge",
+    "stitching is coming apart near the handle",
+    "it is a size too small",
+    "box was crushed and the item scratched",
+    "buckle snapped when I closed it",
+]
+NOTES = ["", "", "", "customer sent clear photos", "repeat issue with this supplier", "approved as goodwill"]
+
+QUERIES = [
+    ("sku + word", "ACC-BAG-930 zipper", "relevance"),
+    ("phrase", "stitching handle", "relevance"),
+    ("common word", "damaged", "relevance"),
+    ("common word, newest", "damaged", "newest"),
+    ("prefix", "zip*", "relevance"),
+]
+
+
+def seed(n: int, batch: int = 20_000) -> None:
+    rng = random.Random(42)
+    cases_db.init_db()
+    t0 = time.perf_counter()
+    conn = cases_db.get_conn()
+    for start in range(0, n, batch):
+        rows = []
+        for i in range(start, min(n, start + batch)):
+            product = rng.choice(PRODUCTS)
+            sku = f"ACC-{product[:3].upper()}-{rng.randint(100, 999)}"
+            rows.append(
+                (
+                    str(uuid.uuid4()),
+                    f"ORD-{i}",
+                    rng.choice(REASONS),
+                    f"My {product} {rng.choice(PROBLEMS)}. Order {i}.",
+                    rng.choice(NOTES) or None,
+                    rng.choice(["closed", "pending_review", "closed", "closed"]),
+                    f"2025-01-01T00:00:00.{i:09d}+00:00",
+                    sku_text({"items": [{"sku": sku}]}),
+                )
+            )
+        with conn:
+            conn.executemany(
+                """
+                INSERT INTO cases (case_id, order_id, reason, customer_message, human_notes, status, created_at, skus)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                rows,
+            )
+        print(f"\rseeded {min(n, start + batch):,}/{n:,}", end="", file=sys.stderr)
+    print(f"\rseeded {n:,} cases in {time.perf_counter() - t0:.1f}s", file=sys.stderr)
+
+
+def bench(label: str, q: str, sort: str, repeats: int, offset: int = 0, status: Optional[str] = None) -> float:
+    match = fts_query(q)
+    timings = []
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        rows, _ = cases_repo.search_cases(match, status=status, sort=sort, offset=offset, limit=21)
+        timings.append((time.perf_counter() - t0) * 1000)
+    p50 = statistics.median(timings)
+    p95 = sorted(timings)[max(0, int(len(timings) * 0.95) - 1)]
+    print(f"{label:<24} {q!r:<24} {sort:<9} rows={len(rows):<3} p50={p50:7.2f}ms  p95={p95:7.2f}ms")
+    return p95
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Time full-text case search on a synthetic database.")
+    parser.add_argument("--cases", type=int, default=200_000)
+    parser.add_argument("--repeats", type=int, default=20)
+    parser.add_argument("--max-ms", type=float, default=None, help="exit 1 if any query's p95 is above this")
+    args = parser.parse_args()
+
+    seed(args.cases)
+    worst = 0.0
+    for label, q, sort in QUERIES:
+        worst = max(worst, bench(label, q, sort, args.repeats))
+    worst = max(worst, bench("deep page (offset 500)", "damaged", "relevance", args.repeats, offset=500))
+    worst = max(worst, bench("status filter", "damaged", "relevance", args.repeats, status="pending_review"))
+    worst = max(worst, bench("prefix + status", "zip*", "relevance", args.repeats, status="pending_review"))
+    if args.max_ms is not None and worst > args.max_ms:
+        print(f"FAIL: slowest p95 {worst:.2f}ms > {args.max_ms}ms", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Startup benchmark: time to `import app.main` and peak RSS, in fresh interpreters.
+
+Each run is a new process, so nothing is warm except the OS page cache. The app
+is imported against a throwaway SQLite file unless DB_PATH is set.
+--graphs also times compiling both graphs (what the first request pays).
+--max-ms / --max-rss-mb exit non-zero when the median exceeds them, so this can
+guard against someone re-introducing an eager heavy import.
+
+Run from backend/:
+  python -m scripts.bench_startup
+  python -m scripts.bench_startup --runs 10 --top 15 --max-ms 1500
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+_CHILD = r"""
+import json, resource, sys, time
+t0 = time.perf_counter()
+import app.main
+import_ms = (time.perf_counter() - t0) * 1000
+out = {"import_ms": import_ms}
+if GRAPHS:
+    from app.graph.registry import get_finalize_graph, get_returns_graph
+    t0 = time.perf_counter()
+    get_returns_graph()
+    get_finalize_graph()
+    out["graphs_ms"] = (time.perf_counter() - t0) * 1000
+rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+# ru_maxrss is KiB on Linux, bytes on macOS
+out["peak_rss_mb"] = rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+print(json.dumps(out))
+"""
+
+HEAVY_MODULES = ("langgraph", "langchain_core", "langchain_openai", "langchain_chroma", "chromadb", "langchain_ollama", "cloudinary")
+
+
+def _env(tmp: str) -> dict:
+    env = dict(os.environ)
+    env.setdefault("DB_PATH", os.path.join(tmp, "cases.db"))
+    return env
+
+
+def _run(env: dict, graphs: bool) -> dict:
+    code = f"GRAPHS = {graphs!r}\n" + _CHILD
+    proc = subprocess.run([sys.executable, "-c", code], env=env, capture_output=True, text=True, check=True)
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def _heavy_loaded(env: dict) -> list:
+    code = f"import sys, app.main; print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    proc = subprocess.run([sys.executable, "-c", code], env=env, capture_output=True, text=True, check=True)
+    out = proc.stdout.strip().splitlines()
+    return [m for m in (out[-1] if out else "").split(",") if m]
+
+
+def _slowest_imports(env: dict, top: int) -> list:
+    """Top-level-ish modules by cumulative import time, from `python -X importtime`."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"], env=env, capture_output=True, text=True, check=True
+    )
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = (p.strip() for p in line[len("import time:"):].split("|"))
+        rows.append((int(cumulative) / 1000, name))
+    rows.sort(reverse=True)
+    return rows[:top]
+
+
+def _fmt(values: list) -> str:
+    return f"median {statistics.median(values):8.1f}  min {min(values):8.1f}  max {max(values):8.1f}"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--graphs", action="store_true", help="also time compiling both graphs")
+    parser.add_argument("--top", type=int, default=0, help="show the N slowest imports")
+    parser.add_argument("--max-ms", type=float, default=None, help="fail if median import time exceeds this")
+    parser.add_argument("--max-rss-mb", type=float, default=None, help="fail if median peak RSS exceeds this")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = _env(tmp)
+        _run(env, False)  # first run creates the SQLite files; don't count it
+        runs = [_run(env, args.graphs) for _ in range(args.runs)]
+        heavy = _heavy_loaded(env)
+        slowest = _slowest_imports(env, args.top) if args.top else []
+
+    import_ms = [r["import_ms"] for r in runs]
+    rss = [r["peak_rss_mb"] for r in runs]
+    print(f"Runs: {args.runs}")
+    print(f"import app.main (ms):   {_fmt(import_ms)}")
+    if args.graphs:
+        print(f"compile graphs (ms):    {_fmt([r['graphs_ms'] for r in runs])}")
+    print(f"peak RSS (MB):          {_fmt(rss)}")
+    print(f"Heavy modules loaded at import: {', '.join(heavy) or 'none'}")
+    for ms, name in slowest:
+        print(f"  {ms:8.1f} ms  {name}")
+
+    failed = []
+    if args.max_ms is not None and statistics.median(import_ms) > args.max_ms:
+        failed.append(f"import time {statistics.median(import_ms):.1f} ms > {args.max_ms} ms")
+    if args.max_rss_mb is not None and statistics.median(rss) > args.max_rss_mb:
+        failed.append(f"peak RSS {statistics.median(rss):.1f} MB > {args.max_rss_mb} MB")
+    if failed:
+        print("FAIL: " + "; ".join(failed))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
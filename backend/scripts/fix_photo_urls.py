@@ -4,7 +4,6 @@ Run this once after setting PUBLIC_BASE_URL on Render.
 """
 import os
 import sqlite3
-import json
 from pathlib import Path
 
 # Get the new production URL from env or pass as argument
@@ -16,30 +15,28 @@ db_path = Path(__file__).parent.parent / "app" / "storage" / "cases.db"
 def fix_photo_urls():
     conn = sqlite3.connect(db_path)
     cursor = conn.cursor()
-    
-    # Get all cases with photos
-    cursor.execute("SELECT case_id, photo_urls_json FROM cases WHERE photo_urls_json IS NOT NULL AND photo_urls_json != '[]'")
+
+    # Photos live in case_photos (created/migrated by init_db on app start)
+    cursor.execute("SELECT id, case_id, url FROM case_photos WHERE url LIKE ? ORDER BY id", (OLD_BASE_URL + "%",))
     rows = cursor.fetchall()
-    
-    updated_count = 0
-    for case_id, photo_urls_json in rows:
-        photo_urls = json.loads(photo_urls_json)
-        
+
+    updated_cases = set()
+    for photo_id, case_id, url in rows:
         # Replace localhost with production URL
-        new_urls = [url.replace(OLD_BASE_URL, NEW_BASE_URL) for url in photo_urls]
-        
-        if new_urls != photo_urls:
-            cursor.execute(
-                "UPDATE cases SET photo_urls_json = ? WHERE case_id = ?",
-                (json.dumps(new_urls), case_id)
-            )
-            updated_count += 1
-            print(f"✓ Updated {case_id}: {photo_urls[0]} → {new_urls[0]}")
-    
+        new_url = url.replace(OLD_BASE_URL, NEW_BASE_URL)
+        cursor.execute("UPDATE case_photos SET url = ? WHERE id = ?", (new_url, photo_id))
+        updated_cases.add(case_id)
+        print(f"✓ Updated {case_id}: {url} → {new_url}")
+
+    # New versions so cached case responses (ETag) are refreshed
+    for case_id in updated_cases:
+        cursor.execute("UPDATE cases SET version = version + 1 WHERE case_id = ?", (case_id,))
+    if updated_cases:
+        cursor.execute("UPDATE cases_meta SET value = value + 1 WHERE key = 'collection_version'")
     conn.commit()
     conn.close()
-    
-    print(f"\n✅ Updated {updated_count} case(s)")
+
+    print(f"\n✅ Updated {len(rows)} photo(s) in {len(updated_cases)} case(s)")
 
 if __name__ == "__main__":
     print(f"Replacing {OLD_BASE_URL} with {NEW_BASE_URL}\n")
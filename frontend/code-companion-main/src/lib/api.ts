@@ -91,6 +91,8 @@ export interface CasePublicStatus {
 
 export interface CasesListResponse {
   data: Case[];
+  // Set when the request passed `limit` and more cases remain
+  next_cursor?: string | null;
 }
 
 export interface PhotoUploadResponse {
@@ -153,6 +155,22 @@ export async function getCasePublic(caseId: string): Promise<CasePublicStatus> {
   return response.json();
 }
 
+// Long-poll: resolves when the case status differs from `knownStatus` (or a final
+// reply exists), or after `timeoutSeconds` with the unchanged status.
+export async function waitCasePublic(
+  caseId: string,
+  knownStatus: string | null | undefined,
+  signal?: AbortSignal,
+  timeoutSeconds = 25
+): Promise<CasePublicStatus> {
+  const url = new URL(`${API_BASE_URL}/cases/${caseId}/public/wait`);
+  if (knownStatus) url.searchParams.set('status', knownStatus);
+  url.searchParams.set('timeout', String(timeoutSeconds));
+  const response = await fetch(url.toString(), { signal });
+  if (!response.ok) throw new Error('Failed to fetch case status');
+  return response.json();
+}
+
 export async function uploadPhoto(caseId: string, file: File): Promise<PhotoUploadResponse> {
   const formData = new FormData();
   formData.append('file', file);
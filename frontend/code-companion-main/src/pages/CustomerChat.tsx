@@ -1,6 +1,6 @@
 import { useState, useEffect, useRef } from "react";
 import { useTypingAnimation } from "@/hooks/useTypingAnimation";
-import { startChat, sendMessage, ChatResponse, getCasePublic, CasePublicStatus } from "@/lib/api";
+import { startChat, sendMessage, ChatResponse, getCasePublic, waitCasePublic, CasePublicStatus } from "@/lib/api";
 import { ChatBubble } from "@/components/chat/ChatBubble";
 import { ChatInput } from "@/components/chat/ChatInput";
 import { PhotoUpload } from "@/components/chat/PhotoUpload";
@@ -9,7 +9,7 @@ import { Button } from "@/components/ui/button";
 import { Card } from "@/components/ui/card";
 import { Loader2, MessageCircle } from "lucide-react";
 import { toast } from "@/hooks/use-toast";
-import { useQuery } from "@tanstack/react-query";
+import { useQuery, useQueryClient } from "@tanstack/react-query";
 
 interface Message {
   id: string;
@@ -138,15 +138,22 @@ export default function CustomerChat() {
     return () => clearTimeout(timer);
   }, [isLoading]);
 
+  const queryClient = useQueryClient();
   const { data: caseStatusData } = useQuery<CasePublicStatus>({
     queryKey: ["case-status", sessionId, caseId],
-    queryFn: () => getCasePublic(caseId as string),
+    // First load reads the status; after that each fetch long-polls until it changes
+    queryFn: ({ queryKey, signal }) => {
+      const known = queryClient.getQueryData<CasePublicStatus>(queryKey);
+      return known
+        ? waitCasePublic(caseId as string, known.status, signal)
+        : getCasePublic(caseId as string);
+    },
     enabled: !!caseId,
     refetchInterval: (query) => {
       const data = query.state.data as CasePublicStatus | undefined;
-      if (!data) return 3000;
-      if (data.status === "closed" || data.final_customer_reply) return false;
-      return 3000;
+      if (data && (data.status === "closed" || data.final_customer_reply)) return false;
+      // In-flight long-polls are deduplicated, so this only re-arms the wait
+      return query.state.status === "error" ? 3000 : 250;
     },
   });
 